@@ -4,37 +4,45 @@
 #   pip install bokeh pandas numpy
 #   bokeh serve --show gyro_dashboard.py --args ./data
 # Or provide a single CSV file path instead of a folder.
+# Every chunk in the folder is one continuous sample index (see chunks.py):
+# Previous/Next page through all of them while only the chunks under the
+# current window are loaded, and the newest chunk is tailed so only lines
+# appended since the last poll are parsed and streamed into the chart.
+# "Overview + detail" view: the whole recording on top, a draggable range
+# below; both draw min/max/mean envelopes from the pyramid (pyramid.py) at the
+# level that matches the plot width, so any zoom ships ~2 points per pixel.
+# Line/Scatter windows longer than RASTER_THRESHOLD are binned into a density
+# image on the server (raster.py) instead of one glyph per sample.
 
 import sys
 from pathlib import Path
 import pandas as pd
 import numpy as np
 
+from bokeh.core.property.descriptors import UnsetValueError
 from bokeh.io import curdoc
 from bokeh.layouts import column, row
-from bokeh.models import ColumnDataSource, Select, MultiSelect, TextInput, Button, Div, DataTable, TableColumn
+from bokeh.models import (ColumnDataSource, Select, MultiSelect, TextInput, Button, Div, DataTable, TableColumn,
+                          Range1d, RangeTool)
+from bokeh.palettes import Category10
 from bokeh.plotting import figure
 
-# ---------- Utility functions ----------
-def csv_files_in_folder(folder: Path):
-    if not folder.exists():
-        return []
-    return sorted(folder.glob("*.csv"), key=lambda f: f.stat().st_mtime)
-
-def newest_csv(folder: Path):
-    files = csv_files_in_folder(folder)
-    return files[-1] if files else None
-
-def read_csv_file(path: Path):
-    try:
-        df = pd.read_csv(path)
-        df.columns = [c.strip() for c in df.columns]
-        if "sample" not in df.columns:
-            df["sample"] = np.arange(len(df))
-        return df, f"Loaded: {path.name} ({len(df)} rows)"
-    except Exception as e:
-        return pd.DataFrame(), f"Failed to read {path}: {e}"
+from chunks import ChunkedDataset, chunk_order
+from winstats import WindowStats
+from pyramid import Pyramid
+from raster import composite, density_grids
+from watcher import FolderWatcher
+
+POLL_MS = 1000           # backstop check; changes normally arrive as inotify events
+MAX_LOADED_CHUNKS = 8    # parsed chunks kept in memory, whatever the folder size
+HIST_BINS = 30           # fixed histogram edges over the whole dataset
+DETAIL_PX = 1000         # fallback plot widths until the browser reports them
+OVERVIEW_PX = 1000
+PLOT_PX_HEIGHT = 300
+RASTER_THRESHOLD = 20000 # Line/Scatter windows longer than this are drawn as a density image
+RASTER_STEP = 20000      # rows loaded at a time while binning (bounded memory)
 
+# ---------- Utility functions ----------
 def numeric_columns(df: pd.DataFrame):
     preferred = [c for c in ["gyro_x", "gyro_y", "gyro_z"] if c in df.columns]
     if preferred:
@@ -44,6 +52,13 @@ def numeric_columns(df: pd.DataFrame):
 def clamp_value(value, low, high):
     return max(low, min(int(value), high))
 
+def pixel_size(fig, attr, fallback):
+    """inner_width / inner_height reported by the browser (unset until the first render)."""
+    try:
+        return getattr(fig, attr) or fallback
+    except UnsetValueError:
+        return fallback
+
 # ---------- App Initialization ----------
 args = sys.argv[1:]
 folder_watch = None
@@ -58,28 +73,40 @@ if args:
 if not folder_watch and not csv_file:
     folder_watch = Path("./data")
 
-# Load initial data
-data_df = pd.DataFrame()
-status_info = "No data loaded."
-
+# Index every chunk (no parsing yet); the watcher keeps the file list current from events
 if csv_file:
-    data_df, status_info = read_csv_file(csv_file)
+    watcher = FolderWatcher(csv_file.parent, pattern=csv_file.name, key=chunk_order)
 else:
-    newest = newest_csv(folder_watch)
-    if newest:
-        data_df, status_info = read_csv_file(newest)
-
-if data_df.empty:
-    data_df = pd.DataFrame({"sample": [], "gyro_x": [], "gyro_y": [], "gyro_z": []})
-
-default_axes = numeric_columns(data_df)
-start_index = 0
-default_window = min(200, len(data_df) or 200)
+    watcher = FolderWatcher(folder_watch, key=chunk_order)
+watcher.start()
+dataset = None
+status_info = "No data loaded."
+try:
+    dataset = ChunkedDataset(csv_file or folder_watch, max_loaded=MAX_LOADED_CHUNKS, watcher=watcher)
+    status_info = f"{len(dataset.paths)} chunks, {len(dataset)} rows"
+except Exception as e:
+    status_info = f"Failed to index {csv_file or folder_watch}: {e}"
+
+def sample_frame():
+    """A few rows to pick the numeric columns from."""
+    if dataset is None or not len(dataset):
+        return pd.DataFrame({"sample": [], "gyro_x": [], "gyro_y": [], "gyro_z": []})
+    return dataset.window(len(dataset) - 10, len(dataset))
+
+default_axes = numeric_columns(sample_frame())
+# prefix sums / sparse table / cumulative bin counts: window summaries cost O(1)
+stats = WindowStats.for_dataset(dataset, default_axes, bins=HIST_BINS) if dataset is not None else None
+# min/max/mean per 2**k samples, saved as .pyramid.npz next to the chunks
+pyramid = Pyramid.for_dataset(dataset, default_axes) if dataset is not None else None
+default_window = min(200, len(dataset)) if dataset is not None and len(dataset) else 200
+# a watched folder opens on its newest rows, so the window follows new data from the start
+start_index = max(0, len(dataset) - default_window) if folder_watch and dataset is not None else 0
 
 # ---------- Widgets ----------
 title_div = Div(text="<h2>Gyroscope Dashboard</h2>")
 data_label = Div(text=f"<b>Data source:</b> {status_info}")
 
+view_select = Select(title="View", value="Window", options=["Window", "Overview + detail"])
 chart_type_select = Select(title="Chart type", value="Line", options=["Line", "Scatter", "Histogram"])
 axes_select = MultiSelect(title="Axes", value=default_axes, options=default_axes, size=4)
 sample_input = TextInput(title="Number of samples", value=str(default_window))
@@ -97,9 +124,31 @@ summary_table = DataTable(
 )
 
 plot = figure(height=350, sizing_mode="stretch_width", x_axis_label="Sample", y_axis_label="Reading")
-active_renderers = []
+# One long-lived source + glyph set per axis; redraws only swap .data / .visible
+axis_glyphs = {}         # axis -> {"line_src", "hist_src", "Line", "Scatter", "Histogram", "legend"}
+line_sources = {}        # axis -> ColumnDataSource of the visible Line/Scatter window
+raster_src = ColumnDataSource(dict(image=[], x=[], y=[], dw=[], dh=[]))
+raster = plot.image_rgba(image="image", x="x", y="y", dw="dw", dh="dh", source=raster_src, visible=False)
+
+# Overview + detail: shared x range between the detail plot and the overview's RangeTool
+detail = figure(height=350, sizing_mode="stretch_width", x_axis_label="Sample", y_axis_label="Reading",
+                x_range=Range1d(0, max(default_window, 1)), tools="xpan,xwheel_zoom,reset", active_scroll="xwheel_zoom")
+overview = figure(height=130, sizing_mode="stretch_width", x_range=Range1d(0, max(len(dataset) if dataset is not None else 0, 1)),
+                  tools="", toolbar_location=None, y_axis_label="Overview")
+range_tool = RangeTool(x_range=detail.x_range)
+overview.add_tools(range_tool)
+envelopes = {}           # axis -> {"detail": src, "overview": src, "renderers": [...]}
+detail_view = column(detail, overview, sizing_mode="stretch_width", visible=False)
 
 # ---------- Logic ----------
+def row_count():
+    return len(dataset) if dataset is not None else 0
+
+def window_data(start, end):
+    if dataset is None:
+        return sample_frame()
+    return dataset.window(start, end)
+
 def get_window_size():
     try:
         return max(10, int(sample_input.value))
@@ -109,64 +158,97 @@ def get_window_size():
 def get_window_indices():
     global start_index
     n = get_window_size()
-    L = len(data_df)
+    L = row_count()
     start = clamp_value(start_index, 0, max(0, L - 1))
     end = clamp_value(start + n, 1, L)
     return start, end
 
 def refresh_axes_options():
-    options = numeric_columns(data_df)
+    options = numeric_columns(sample_frame())
     axes_select.options = options
     if not axes_select.value or any(a not in options for a in axes_select.value):
         axes_select.value = options
 
-def update_summary_table(window_df: pd.DataFrame, axes: list[str]):
-    if window_df.empty or not axes:
+def update_summary_table(start: int, end: int, axes: list[str]):
+    axes = [a for a in axes if stats is not None and a in stats.channels]
+    if end <= start or not axes:
         summary_source.data = dict(axis=[], mean=[], std=[], min=[], max=[])
         return
-    stats = window_df[axes].agg(["mean", "std", "min", "max"]).T.reset_index().rename(columns={"index": "axis"})
+    summary = stats.summary(start, end, axes)
+    table = dict(axis=axes)
     for col in ["mean", "std", "min", "max"]:
-        stats[col] = stats[col].round(4)
-    summary_source.data = stats.to_dict(orient="list")
-
-def clear_renderers():
-    for r in list(active_renderers):
-        try:
-            plot.renderers.remove(r)
-        except Exception:
-            pass
-        active_renderers.remove(r)
+        table[col] = [round(summary[a][col], 4) for a in axes]
+    summary_source.data = table
+
+def glyphs_for(axis):
+    """Create the sources and glyphs for an axis once; later calls return the same set."""
+    if axis not in axis_glyphs:
+        line_src = ColumnDataSource(dict(sample=[], value=[]))
+        hist_src = ColumnDataSource(dict(top=[], left=[], right=[]))
+        g = {
+            "line_src": line_src,
+            "hist_src": hist_src,
+            "Line": plot.line(x="sample", y="value", source=line_src, legend_label=axis, visible=False),
+            "Scatter": plot.scatter(x="sample", y="value", source=line_src, legend_label=axis, size=5, visible=False),
+            "Histogram": plot.quad(top="top", bottom=0, left="left", right="right", alpha=0.5,
+                                   source=hist_src, legend_label=axis, visible=False),
+        }
+        g["legend"] = next(item for item in plot.legend.items if g["Line"] in item.renderers)
+        axis_glyphs[axis] = g
+    return axis_glyphs[axis]
+
+def draw_raster(start, end, axes):
+    """Density image of [start, end): cost in the browser depends on plot size, not sample count."""
+    summary = stats.summary(start, end, axes)
+    y0 = min(summary[a]["min"] for a in axes)
+    y1 = max(summary[a]["max"] for a in axes)
+    shape = (pixel_size(plot, "inner_height", PLOT_PX_HEIGHT), pixel_size(plot, "inner_width", DETAIL_PX))
+    frames = (window_data(lo, min(lo + RASTER_STEP, end)) for lo in range(start, end, RASTER_STEP))
+    grids = density_grids(frames, axes, (start, end), (y0, y1), shape)
+    colors = [Category10[10][axes_select.options.index(a) % 10] for a in axes]
+    raster_src.data = dict(image=[composite(grids, colors)], x=[start], y=[y0], dw=[end - start], dh=[y1 - y0])
 
 def draw_chart():
-    clear_renderers()
     axes = list(axes_select.value)
+    chart = chart_type_select.value
     start, end = get_window_indices()
-    window_df = data_df.iloc[start:end].copy()
-
-    if chart_type_select.value in ("Line", "Scatter"):
-        for axis in axes:
-            src = ColumnDataSource(dict(sample=window_df["sample"], value=window_df[axis]))
-            if chart_type_select.value == "Line":
-                r = plot.line(x="sample", y="value", source=src, legend_label=axis)
-            else:
-                r = plot.circle(x="sample", y="value", source=src, legend_label=axis, size=5)
-            active_renderers.append(r)
+    rastered = chart in ("Line", "Scatter") and end - start > RASTER_THRESHOLD and stats is not None and axes
+    # histograms and the summary come from the stats index; rows are only loaded for Line/Scatter
+    window_df = window_data(start, end) if chart in ("Line", "Scatter") and not rastered else None
+
+    line_sources.clear()
+    for axis in axes:
+        g = glyphs_for(axis)
+        if rastered:
+            g["line_src"].data = dict(sample=[], value=[])
+        elif chart in ("Line", "Scatter"):
+            g["line_src"].data = dict(sample=window_df["sample"].values, value=window_df[axis].values)
+            line_sources[axis] = g["line_src"]
+        else:
+            hist, edges = stats.histogram(axis, start, end) if stats is not None else ([], np.array([]))
+            g["hist_src"].data = dict(top=hist, left=edges[:-1], right=edges[1:])
+
+    # Only visibility flips for axes / chart types that are not shown
+    for axis, g in axis_glyphs.items():
+        shown = axis in axes
+        for kind in ("Line", "Scatter", "Histogram"):
+            g[kind].visible = shown and kind == chart and not rastered
+        g["legend"].visible = shown
+    raster.visible = bool(rastered)
+    if rastered:
+        draw_raster(start, end, axes)
+    else:
+        raster_src.data = dict(image=[], x=[], y=[], dw=[], dh=[])
+
+    if chart in ("Line", "Scatter"):
         plot.xaxis.axis_label = "Sample"
         plot.yaxis.axis_label = "Reading"
-    else:  # Histogram
-        for axis in axes:
-            vals = window_df[axis].dropna().values
-            if len(vals) == 0:
-                continue
-            hist, edges = np.histogram(vals, bins=30)
-            src = ColumnDataSource(dict(top=hist, left=edges[:-1], right=edges[1:]))
-            r = plot.quad(top="top", bottom=0, left="left", right="right", alpha=0.5, source=src, legend_label=axis)
-            active_renderers.append(r)
+    else:
         plot.xaxis.axis_label = "Reading bins"
         plot.yaxis.axis_label = "Count"
 
     plot.legend.visible = True
-    update_summary_table(window_df, axes)
+    update_summary_table(start, end, axes)
 
 def prev_window():
     global start_index
@@ -176,7 +258,7 @@ def prev_window():
 def next_window():
     global start_index
     n = get_window_size()
-    L = len(data_df)
+    L = row_count()
     start_index = min(max(0, L - n), start_index + n)
     draw_chart()
 
@@ -184,40 +266,165 @@ btn_prev.on_click(prev_window)
 btn_next.on_click(next_window)
 
 def controls_updated(attr, old, new):
-    draw_chart()
+    redraw()
 
 chart_type_select.on_change("value", controls_updated)
 axes_select.on_change("value", controls_updated)
 sample_input.on_change("value", controls_updated)
 
+# ---------- Overview + detail ----------
+def envelope_for(axis):
+    """Band (min..max) + mean line per axis in both figures, created once."""
+    if axis not in envelopes:
+        color = Category10[10][len(envelopes) % 10]
+        e = {"detail": ColumnDataSource(dict(x=[], lo=[], hi=[], mean=[])),
+             "overview": ColumnDataSource(dict(x=[], lo=[], hi=[], mean=[]))}
+        e["renderers"] = [
+            detail.varea(x="x", y1="lo", y2="hi", source=e["detail"], color=color, alpha=0.25),
+            detail.line(x="x", y="mean", source=e["detail"], color=color, legend_label=axis),
+            overview.varea(x="x", y1="lo", y2="hi", source=e["overview"], color=color, alpha=0.35),
+            overview.line(x="x", y="mean", source=e["overview"], color=color),
+        ]
+        e["legend"] = next(item for item in detail.legend.items if e["renderers"][1] in item.renderers)
+        envelopes[axis] = e
+    return envelopes[axis]
+
+def envelope_data(axis, start, stop, width):
+    """Pyramid buckets for [start, stop) at ~2 per pixel; raw samples once zoomed in that far."""
+    level = pyramid.level_for(start, stop, width)
+    if level:
+        x, lo, hi, mean = pyramid.envelope(axis, start, stop, level)
+        return dict(x=x, lo=lo, hi=hi, mean=mean)
+    raw = window_data(start, stop)
+    values = raw[axis].values if axis in raw.columns else np.array([])
+    return dict(x=raw["sample"].values if len(raw) else [], lo=values, hi=values, mean=values)
+
+def draw_detail():
+    if pyramid is None:
+        return
+    axes = list(axes_select.value)
+    start = max(0, int(detail.x_range.start))
+    stop = min(row_count(), int(np.ceil(detail.x_range.end)) + 1)
+    for axis in axes:
+        envelope_for(axis)["detail"].data = envelope_data(axis, start, stop, pixel_size(detail, "inner_width", DETAIL_PX))
+    update_summary_table(start, stop, axes)
+
+def draw_overview():
+    if pyramid is None:
+        return
+    axes = list(axes_select.value)
+    overview.x_range.update(start=0, end=max(row_count(), 1))
+    for axis in axes:
+        envelope_for(axis)["overview"].data = envelope_data(axis, 0, row_count(), pixel_size(overview, "inner_width", OVERVIEW_PX))
+    for axis, e in envelopes.items():
+        for r in e["renderers"]:
+            r.visible = axis in axes
+        e["legend"].visible = axis in axes
+
+detail_pending = False
+
+def detail_range_changed(attr, old, new):
+    # pans fire start and end separately; redraw once per tick
+    global detail_pending
+    if view_select.value != "Window" and not detail_pending:
+        detail_pending = True
+        curdoc().add_next_tick_callback(redraw_detail_once)
+
+def redraw_detail_once():
+    global detail_pending
+    detail_pending = False
+    draw_detail()
+
+detail.x_range.on_change("start", detail_range_changed)
+detail.x_range.on_change("end", detail_range_changed)
+
+def view_changed(attr, old, new):
+    overview_mode = new != "Window"
+    detail_view.visible = overview_mode
+    plot.visible = not overview_mode
+    for w in (chart_type_select, sample_input, btn_prev, btn_next):
+        w.disabled = overview_mode
+    if overview_mode:
+        start, end = get_window_indices()
+        detail.x_range.update(start=start, end=max(end, start + 1))
+        draw_overview()
+        draw_detail()
+    else:
+        draw_chart()
+
+view_select.on_change("value", view_changed)
+
+def redraw():
+    if view_select.value == "Window":
+        draw_chart()
+    else:
+        draw_overview()
+        draw_detail()
+
+def following_end(rows):
+    return start_index + get_window_size() >= rows
+
+def stream_rows(new_df: pd.DataFrame, old_rows: int):
+    """Tailed rows arrived: if the window was following the end of the data, move it along."""
+    global start_index
+    if not following_end(old_rows):
+        return                            # an older window is on screen; nothing in it changed
+    n = get_window_size()
+    start_index = max(0, row_count() - n)
+    if chart_type_select.value not in ("Line", "Scatter") or not line_sources:
+        draw_chart()                      # histogram / density raster: redrawn from the stats index
+        return
+    for axis, src in line_sources.items():
+        if axis in new_df.columns:
+            src.stream(dict(sample=new_df["sample"].values, value=new_df[axis].values), rollover=n)
+    update_summary_table(start_index, row_count(), list(line_sources))
+
 def check_for_new_data():
-    global data_df, status_info, start_index
-    if csv_file:
+    global status_info, start_index
+    if dataset is None:
         return
-    latest = newest_csv(folder_watch)
-    if not latest:
+    old_rows = row_count()
+    new_df = dataset.refresh()
+    if dataset.restarted:
+        refresh_axes_options()
+        start_index = max(0, row_count() - get_window_size())
+        redraw()
+    elif not new_df.empty and view_select.value != "Window":
+        if detail.x_range.end >= old_rows - 1:       # detail range follows the end of the data
+            shift = row_count() - old_rows
+            detail.x_range.update(start=detail.x_range.start + shift, end=detail.x_range.end + shift)
+        draw_overview()
+    elif not new_df.empty:
+        stream_rows(new_df, old_rows)     # a fresh chunk just continues the sample index
+    else:
         return
-    last_name = getattr(curdoc(), "_last_file", None)
-    last_mtime = getattr(curdoc(), "_last_mtime", 0.0)
-    if latest.name != last_name or latest.stat().st_mtime > last_mtime:
-        new_df, info = read_csv_file(latest)
-        if not new_df.empty:
-            data_df = new_df
-            status_info = info
-            curdoc()._last_file = latest.name
-            curdoc()._last_mtime = latest.stat().st_mtime
-            refresh_axes_options()
-            start_index = max(0, len(data_df) - get_window_size())
-            data_label.text = f"<b>Data source:</b> {status_info}"
-            draw_chart()
+    status_info = f"{len(dataset.paths)} chunks, {row_count()} rows, tailing {dataset.newest.name} (+{len(new_df)})"
+    data_label.text = f"<b>Data source:</b> {status_info}"
 
 # ---------- Initial Rendering ----------
 refresh_axes_options()
 draw_chart()
 
-controls_layout = column(chart_type_select, axes_select, sample_input, row(btn_prev, btn_next), width=350)
-main_layout = row(controls_layout, column(data_label, plot, Div(text="<b>Summary (current window)</b>"), summary_table),
+controls_layout = column(view_select, chart_type_select, axes_select, sample_input, row(btn_prev, btn_next), width=350)
+main_layout = row(controls_layout, column(data_label, plot, detail_view, Div(text="<b>Summary (current window)</b>"), summary_table),
                   sizing_mode="stretch_width")
 curdoc().add_root(column(title_div, main_layout))
 
-curdoc().add_periodic_callback(check_for_new_data, 10_000)
+# Push: a filesystem event schedules one check on the document's own thread
+doc = curdoc()
+check_pending = False
+
+def on_file_event(kind, path):
+    global check_pending
+    if not check_pending:
+        check_pending = True
+        doc.add_next_tick_callback(run_pending_check)
+
+def run_pending_check():
+    global check_pending
+    check_pending = False
+    check_for_new_data()
+
+watcher.subscribe(on_file_event)
+doc.on_session_destroyed(lambda ctx: watcher.stop())
+doc.add_periodic_callback(check_for_new_data, POLL_MS)
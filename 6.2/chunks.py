@@ -0,0 +1,311 @@
+# chunks.py
+"""
+SIT225 — One continuous dataset over the rotated gyro CSV chunks.
+
+writer.py starts a new gyro_data_YYYYmmdd_HHMMSS.csv every 500 rows. This
+module indexes every chunk in a folder by filename timestamp and row count
+(newlines are counted, values are not parsed) and serves any window
+[start, stop) of the combined sample index, loading only the chunks that
+overlap it and keeping a few in an LRU cache. The newest chunk is tailed by
+byte offset, so refresh() only parses lines appended since the last call.
+
+    ds = ChunkedDataset(Path("6.2 HD csv's"))
+    len(ds)                   # total rows across all chunks
+    ds.window(1000, 1200)     # DataFrame, "sample" = global row index
+    ds.refresh()              # rows appended since last call (new chunks included)
+    ds.subscribe(fn)          # fn(new_rows, restarted) after every refresh that changed something
+
+With a FolderWatcher (watcher.py) the chunk list comes from filesystem events
+and refresh() returns at once, without touching the disk, until one arrives.
+
+Row counts are kept in .chunks.json next to the data, keyed by size and
+mtime, so reopening a folder of hundreds of chunks does not re-read them;
+the parsed chunks themselves are cached by csvcache.py.
+"""
+
+import bisect
+import io
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csvcache import load_csv, parse_times
+
+INDEX_FILE = ".chunks.json"
+STAMP_RE = re.compile(r"(\d{8})_(\d{6})")
+
+
+class CsvTail:
+    """Follows one CSV by byte offset; read_new() parses only complete lines added since the last call."""
+    def __init__(self, path: Path, offset=0, columns=None):
+        self.path = path
+        self.offset = offset
+        self.columns = columns
+        self.rows = 0
+        self.restarted = False
+
+    def read_new(self):
+        self.restarted = False
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return pd.DataFrame()
+        if size < self.offset:            # truncated or rewritten: start over
+            self.offset, self.columns, self.rows = 0, None, 0
+            self.restarted = True
+        if size == self.offset:
+            return pd.DataFrame()
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:                      # writer is mid-line; wait for the newline
+            return pd.DataFrame()
+        self.offset += end
+        chunk = chunk[:end]
+        if self.columns is None:
+            header, _, chunk = chunk.partition(b"\n")
+            self.columns = [c.strip() for c in header.decode("utf-8").split(",")]
+        if not chunk.strip():
+            return pd.DataFrame(columns=self.columns)
+        df = pd.read_csv(io.BytesIO(chunk), header=None, names=self.columns)
+        parse_times(df)                   # same dtypes as chunks served by load_csv
+        if "sample" not in df.columns:
+            df["sample"] = np.arange(self.rows, self.rows + len(df))
+        self.rows += len(df)
+        return df
+
+
+def read_chunk(path):
+    """Default chunk loader: a whole CSV with stripped column names, from its .csvcache sidecar once parsed."""
+    return load_csv(path)
+
+
+def _chunk_stamp(path: Path):
+    m = STAMP_RE.search(path.stem)
+    if m:
+        try:
+            return datetime.strptime("".join(m.groups()), "%Y%m%d%H%M%S").timestamp()
+        except ValueError:
+            pass
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def chunk_order(path: Path):
+    """Sort key for chunks: filename timestamp (mtime if there is none), then name."""
+    return (_chunk_stamp(path), path.name)
+
+
+def _scan(path: Path):
+    """(header columns, complete data rows, bytes up to the last newline) without parsing values."""
+    data = path.read_bytes()
+    end = data.rfind(b"\n") + 1
+    header = data.split(b"\n", 1)[0].decode("utf-8", errors="ignore")
+    columns = [c.strip() for c in header.split(",")] if header else None
+    rows = max(0, data.count(b"\n", 0, end) - 1)
+    return columns, rows, end
+
+
+class ChunkedDataset:
+    def __init__(self, source: Path, max_loaded=8, loader=read_chunk, pattern="*.csv", watcher=None):
+        self.source = Path(source)
+        self.watcher = watcher     # started FolderWatcher (key=chunk_order); None = glob on refresh
+        self.pattern = pattern
+        self.max_loaded = max_loaded
+        self.loader = loader
+        self.paths = []            # chunk files in time order
+        self.rows = []             # complete rows per chunk
+        self.starts = [0]          # global index of each chunk's first row (+ total at the end)
+        self.columns = None
+        self.restarted = False
+        self._meta = {}            # name -> [size, mtime_ns, rows, bytes]
+        self._loaded = OrderedDict()
+        self._tail = None
+        self._empty_frame = None
+        self._listeners = []       # fn(new_rows, restarted) called from refresh()
+        self._lock = threading.RLock()
+        self._load_index()
+        self._seen_version = watcher.version if watcher is not None else None
+        self._build()
+
+    # ---------- Index ----------
+    def sidecar(self, name):
+        """Path for an index file kept next to the data (pyramids, row counts)."""
+        if self.source.is_dir():
+            return self.source / name
+        return self.source.parent / f"{self.source.stem}{name}"
+
+    def _index_path(self):
+        return self.sidecar(INDEX_FILE)
+
+    def _load_index(self):
+        try:
+            self._meta = json.loads(self._index_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._meta = {}
+
+    def _save_index(self):
+        if not self.paths:
+            return
+        try:
+            self._index_path().write_text(json.dumps(self._meta), encoding="utf-8")
+        except OSError:
+            pass                   # read-only folder: index is rebuilt next time
+
+    def _list(self):
+        if self.watcher is not None:
+            return self.watcher.files()          # kept current by filesystem events, no scan
+        if self.source.is_file():
+            return [self.source]
+        if not self.source.exists():
+            return []
+        return sorted(self.source.glob(self.pattern), key=chunk_order)
+
+    def _meta_for(self, path: Path):
+        st = path.stat()
+        meta = self._meta.get(path.name)
+        if not meta or meta[0] != st.st_size or meta[1] != st.st_mtime_ns:
+            columns, rows, end = _scan(path)
+            if self.columns is None:
+                self.columns = columns
+            meta = self._meta[path.name] = [st.st_size, st.st_mtime_ns, rows, end]
+        return meta
+
+    def _build(self):
+        paths = self._list()
+        metas = [self._meta_for(p) for p in paths]
+        self._meta = {p.name: m for p, m in zip(paths, metas)}
+        if self.columns is None and paths:
+            self.columns = _scan(paths[0])[0]
+        self.paths = paths
+        self.rows = [m[2] for m in metas]
+        self.starts = [0, *np.cumsum(self.rows).tolist()]
+        self._loaded.clear()
+        self._tail = None
+        if paths:
+            last = self._meta[paths[-1].name]
+            self._tail = CsvTail(paths[-1], offset=last[3], columns=self.columns)
+        self._save_index()
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def _empty(self):
+        # reused: an idle refresh() should not build a DataFrame every poll
+        cols = tuple(self.columns or ())
+        if self._empty_frame is None or tuple(self._empty_frame.columns) != cols:
+            self._empty_frame = pd.DataFrame(columns=list(cols))
+        return self._empty_frame
+
+    @property
+    def newest(self):
+        return self.paths[-1] if self.paths else None
+
+    # ---------- Loading ----------
+    def _chunk(self, i):
+        path = self.paths[i]
+        df = self._loaded.get(path)
+        if df is None:
+            df = self.loader(path).iloc[: self.rows[i]]   # ignore a half-written last line
+            self._loaded[path] = df
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        else:
+            self._loaded.move_to_end(path)
+        return df
+
+    def window(self, start, stop):
+        """Rows [start, stop) of the combined dataset; "sample" is the global row index."""
+        with self._lock:
+            start, stop = max(0, int(start)), min(int(stop), len(self))
+            if stop <= start:
+                return self._empty()
+            pieces = []
+            i = bisect.bisect_right(self.starts, start) - 1
+            while i < len(self.paths) and self.starts[i] < stop:
+                lo = max(start, self.starts[i]) - self.starts[i]
+                hi = min(stop, self.starts[i + 1]) - self.starts[i]
+                pieces.append(self._chunk(i).iloc[lo:hi])
+                i += 1
+            df = pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else pieces[0].reset_index(drop=True)
+            df = df.copy()
+            df["sample"] = np.arange(start, start + len(df))
+            return df
+
+    def iter_chunks(self):
+        """Every chunk in order as a window (one full pass, LRU-bounded memory)."""
+        for i in range(len(self.paths)):
+            yield self.window(self.starts[i], self.starts[i + 1])
+
+    # ---------- Live updates ----------
+    def subscribe(self, fn):
+        """fn(new_rows, restarted) runs inside refresh(), so indexes stay in step with len(self)."""
+        self._listeners.append(fn)
+
+    def refresh(self):
+        """Pick up appended lines and new chunks; returns the new rows (global "sample")."""
+        with self._lock:
+            if self.watcher is not None:
+                if self.watcher.version == self._seen_version:
+                    self.restarted = False               # no events since last time: nothing to read
+                    return self._empty()
+                self._seen_version = self.watcher.version
+            df = self._refresh()
+            if len(df) or self.restarted:
+                for fn in self._listeners:
+                    fn(df, self.restarted)
+            return df
+
+    def _refresh(self):
+        self.restarted = False
+        paths = self._list()
+        if paths[: len(self.paths)] != self.paths:
+            self._build()              # chunks deleted or reordered: re-index
+            self.restarted = True
+            return self._empty()
+        old_len = len(self)
+        new = []
+        if self._tail:
+            grown = self._tail.read_new()
+            if self._tail.restarted:
+                self._build()
+                self.restarted = True
+                return self._empty()
+            if len(grown):
+                self._extend_last(grown)
+                new.append(grown)
+        for path in paths[len(self.paths):]:
+            self._tail = CsvTail(path, columns=None)
+            df = self._tail.read_new()
+            self.paths.append(path)
+            self.rows.append(len(df))
+            self.starts.append(self.starts[-1] + len(df))
+            if self.columns is None:
+                self.columns = self._tail.columns
+            self._loaded[path] = df
+            new.append(df)
+        if self._tail and self.paths:
+            st = self.paths[-1].stat()
+            self._meta[self.paths[-1].name] = [st.st_size, st.st_mtime_ns, self.rows[-1], self._tail.offset]
+        if not new:
+            return self._empty()
+        self._save_index()
+        df = pd.concat(new, ignore_index=True)
+        df["sample"] = np.arange(old_len, old_len + len(df))
+        return df
+
+    def _extend_last(self, grown):
+        self.rows[-1] += len(grown)
+        self.starts[-1] += len(grown)
+        path = self.paths[-1]
+        if path in self._loaded:
+            self._loaded[path] = pd.concat([self._loaded[path], grown], ignore_index=True)
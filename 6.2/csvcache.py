@@ -0,0 +1,122 @@
+# csvcache.py
+"""
+SIT225 — Parse a sensor CSV once, reload it from a binary sidecar after that.
+
+pd.read_csv + pd.to_datetime on every start is the slow part of opening a log:
+the timestamps mix "2025-09-08 18:34:27.177" and "2025-09-19T18:14:57.233",
+and format inference runs per row. load_csv() parses with the ISO8601 fast
+path once, then saves every column as a NumPy array (timestamps as int64
+epoch nanoseconds) in .csvcache/<name>.npz next to the CSV:
+
+    df = load_csv(Path("gyro_data_20250812_153117.csv"))   # "timestamp" is datetime64
+    df = load_csv(path)                                    # second call: no parsing
+
+The sidecar records the source path, size and mtime_ns; any change to the CSV
+(appended rows, rewrite) makes it stale and the next load re-parses it. A
+read-only folder simply gets no sidecar.
+"""
+
+import json
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIRNAME = ".csvcache"
+CACHE_VERSION = 1                    # bump when the sidecar layout changes
+TIME_COLUMNS = ("timestamp", "time")
+
+
+def cache_path(csv_path: Path, cache_dir: Path = None):
+    csv_path = Path(csv_path)
+    folder = Path(cache_dir) if cache_dir else csv_path.parent / CACHE_DIRNAME
+    return folder / f"{csv_path.name}.npz"
+
+
+def _source_key(csv_path: Path):
+    st = csv_path.stat()
+    return {"path": str(csv_path.resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "version": CACHE_VERSION}
+
+
+def parse_times(df, time_columns=TIME_COLUMNS):
+    """Convert timestamp columns to datetime64[ns] in place; a column that does not parse is left alone."""
+    for c in df.columns:
+        if c.lower() not in time_columns or pd.api.types.is_datetime64_any_dtype(df[c]):
+            continue
+        try:
+            t = pd.to_datetime(df[c], format="ISO8601")
+        except (ValueError, TypeError):
+            continue
+        if getattr(t.dt, "tz", None) is None:
+            df[c] = t.astype("datetime64[ns]")
+    return df
+
+
+# ---------- Sidecar ----------
+def _save(df, path: Path, key):
+    arrays, kinds = {}, []
+    for i, c in enumerate(df.columns):
+        s = df[c]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            arrays[f"c{i}"] = s.to_numpy().view("int64")
+            kinds.append("time")
+        elif pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+            arrays[f"c{i}"] = s.to_numpy()
+            kinds.append("num")
+        else:
+            na = s.isna().to_numpy()
+            arrays[f"c{i}"] = s.astype(str).to_numpy(dtype=str)
+            if na.any():
+                arrays[f"c{i}_na"] = na
+            kinds.append("str")
+    meta = dict(key, columns=[str(c) for c in df.columns], kinds=kinds)
+    arrays["meta"] = np.array(json.dumps(meta))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.savez(f, **arrays)
+    tmp.replace(path)
+
+
+def _load(path: Path, key):
+    """DataFrame from the sidecar, or None if it is missing, unreadable or for another version of the CSV."""
+    try:
+        with np.load(path) as z:
+            meta = json.loads(str(z["meta"]))
+            if any(meta.get(k) != v for k, v in key.items()):
+                return None
+            cols = {}
+            for i, (name, kind) in enumerate(zip(meta["columns"], meta["kinds"])):
+                a = z[f"c{i}"]
+                if kind == "time":
+                    cols[name] = a.view("datetime64[ns]")
+                elif kind == "str":
+                    s = pd.Series(a.astype(object))
+                    if f"c{i}_na" in z:
+                        s[z[f"c{i}_na"]] = None
+                    cols[name] = s
+                else:
+                    cols[name] = a
+            return pd.DataFrame(cols)
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):   # truncated or corrupt .npz
+        return None
+
+
+def load_csv(csv_path, time_columns=TIME_COLUMNS, cache_dir: Path = None):
+    """read_csv with stripped column names and parsed timestamps, served from the sidecar when it is current."""
+    csv_path = Path(csv_path)
+    key = _source_key(csv_path)
+    sidecar = cache_path(csv_path, cache_dir)
+    df = _load(sidecar, key)
+    if df is not None:
+        return df
+    df = pd.read_csv(csv_path)
+    df.columns = [c.strip() for c in df.columns]
+    parse_times(df, time_columns)
+    try:
+        _save(df, sidecar, key)
+    except OSError:
+        pass                         # read-only folder: parse again next time
+    return df
@@ -0,0 +1,199 @@
+# pyramid.py
+"""
+SIT225 — Min/max/mean pyramid for zooming long gyro recordings.
+
+Level k holds one (min, max, mean) per channel for every 2**k consecutive
+samples (k >= 1; level 0 is the raw data). A view of [start, stop) drawn
+w pixels wide uses the finest level with no more than ~2 buckets per pixel,
+so the payload stays about 2*w points per channel whether the span is an
+hour or a few milliseconds:
+
+    pyr = Pyramid.for_dataset(dataset, ["gyro_x", "gyro_y", "gyro_z"])
+    level = pyr.level_for(start, stop, width=1000)     # 0 -> use raw rows
+    x, lo, hi, mean = pyr.envelope("gyro_x", start, stop, level)
+
+Levels are built incrementally (appended rows only touch the last bucket of
+each level) and saved as .pyramid.npz next to the data. On the next start the
+saved pyramid is reused if the chunks it covered are unchanged, and only the
+rows added since are folded in. Buckets are whole, so up to 2**k - 1 of the
+newest samples (less than one pixel) are not shown until their bucket fills.
+"""
+
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+PYRAMID_FILE = ".pyramid.npz"
+SAVE_EVERY = 5000          # rows between re-saves while following a live folder
+
+
+def _combine(lo, hi, mean):
+    """Pair up consecutive buckets of one level into the next level."""
+    n = lo.size // 2 * 2
+    return (np.fmin(lo[:n:2], lo[1:n:2]),
+            np.fmax(hi[:n:2], hi[1:n:2]),
+            (mean[:n:2] + mean[1:n:2]) / 2)
+
+
+class _Levels:
+    """Pyramid of one channel; levels[k - 1] = (min, max, mean) arrays of level k."""
+
+    def __init__(self):
+        self.levels = []
+        self.pending = []      # per level k-1: leftover entry (0 or 1) waiting for its pair
+
+    def extend(self, values):
+        v = np.asarray(values, dtype=np.float32)
+        cur = (v, v, v)
+        k = 0
+        while cur[0].size or (k < len(self.pending) and self.pending[k][0].size):
+            if k == len(self.pending):
+                empty = np.empty(0, np.float32)
+                self.pending.append((empty, empty, empty))
+            cur = tuple(np.r_[p, c] for p, c in zip(self.pending[k], cur))
+            nxt = _combine(*cur)
+            self.pending[k] = tuple(a[nxt[0].size * 2:] for a in cur)
+            if not nxt[0].size:
+                break
+            if k == len(self.levels):
+                self.levels.append(nxt)
+            else:
+                self.levels[k] = tuple(np.r_[a, b] for a, b in zip(self.levels[k], nxt))
+            cur = nxt
+            k += 1
+
+    def envelope(self, start, stop, level):
+        lo, hi, mean = self.levels[level - 1]
+        size = 1 << level
+        b0, b1 = start // size, min(-(-stop // size), lo.size)
+        x = (np.arange(b0, b1) * size + size / 2).astype(float)
+        return x, lo[b0:b1], hi[b0:b1], mean[b0:b1]
+
+
+class Pyramid:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.channels = {c: _Levels() for c in self.columns}
+
+    @property
+    def depth(self):
+        return max((len(ch.levels) for ch in self.channels.values()), default=0)
+
+    def extend(self, df):
+        if not len(df):
+            return
+        for c, ch in self.channels.items():
+            ch.extend(df[c].to_numpy(dtype=np.float32) if c in df.columns else np.full(len(df), np.nan, np.float32))
+        self.rows += len(df)
+
+    def level_for(self, start, stop, width):
+        """Finest level with at most ~2 buckets per pixel (0 = raw samples)."""
+        per_px = (stop - start) / max(int(width), 1)
+        level = int(np.floor(np.log2(per_px / 2))) + 1 if per_px > 2 else 0
+        return min(level, self.depth)
+
+    def envelope(self, column, start, stop, level):
+        """(x, min, max, mean) of the level-`level` buckets overlapping [start, stop)."""
+        start, stop = max(0, int(start)), min(int(stop), self.rows)
+        return self.channels[column].envelope(start, stop, level)
+
+    # ---------- Persistence ----------
+    def save(self, path, chunks=()):
+        """chunks: (name, rows) of the files covered, so a later load can tell what changed."""
+        arrays = {"columns": np.array(self.columns), "rows": np.array(self.rows),
+                  "chunk_names": np.array([n for n, _ in chunks], dtype=str),
+                  "chunk_rows": np.array([r for _, r in chunks], dtype=np.int64)}
+        for i, (c, ch) in enumerate(self.channels.items()):
+            for k, level in enumerate(ch.levels):
+                for part, a in zip(("lo", "hi", "mean"), level):
+                    arrays[f"c{i}_l{k}_{part}"] = a
+            for k, pend in enumerate(ch.pending):
+                for part, a in zip(("lo", "hi", "mean"), pend):
+                    arrays[f"c{i}_p{k}_{part}"] = a
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        """(pyramid, [(name, rows), ...]) or (None, []) if missing/unreadable."""
+        try:
+            with np.load(path) as z:
+                pyr = cls(z["columns"].tolist())
+                pyr.rows = int(z["rows"])
+                chunks = list(zip(z["chunk_names"].tolist(), z["chunk_rows"].tolist()))
+                for i, ch in enumerate(pyr.channels.values()):
+                    for store, tag in ((ch.levels, "l"), (ch.pending, "p")):
+                        k = 0
+                        while f"c{i}_{tag}{k}_lo" in z:
+                            store.append(tuple(z[f"c{i}_{tag}{k}_{p}"] for p in ("lo", "hi", "mean")))
+                            k += 1
+            return pyr, chunks
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):   # truncated or corrupt .npz
+            return None, []
+
+    @classmethod
+    def for_dataset(cls, dataset, columns):
+        """Load or build the pyramid of a ChunkedDataset and keep it in step with refresh()."""
+        path = dataset.sidecar(PYRAMID_FILE)
+        pyr = cls(columns)
+        saved_rows = [0]
+
+        def chunk_list():
+            return [(p.name, r) for p, r in zip(dataset.paths, dataset.rows)]
+
+        def save():
+            try:
+                pyr.save(path, chunk_list())
+                saved_rows[0] = pyr.rows
+            except OSError:
+                pass           # read-only data folder: rebuilt next time
+
+        def rebuild():
+            saved, chunks = cls.load(path)
+            if saved is not None and saved.columns == pyr.columns and _still_valid(chunks, chunk_list()):
+                pyr.rows, pyr.channels = saved.rows, saved.channels
+            else:
+                pyr.reset()
+            if pyr.rows < len(dataset):
+                for start in range(pyr.rows, len(dataset), SAVE_EVERY):
+                    pyr.extend(dataset.window(start, min(start + SAVE_EVERY, len(dataset))))
+                save()
+
+        def follow(new_df, restarted):
+            if restarted:
+                rebuild()
+                return
+            pyr.extend(new_df)
+            if pyr.rows - saved_rows[0] >= SAVE_EVERY:
+                save()
+
+        rebuild()
+        dataset.subscribe(follow)
+        return pyr
+
+
+def _still_valid(saved_chunks, current_chunks):
+    """Saved chunks must be the same files with the same rows; only the last may have grown."""
+    if not saved_chunks or len(saved_chunks) > len(current_chunks):
+        return False
+    for i, ((name, rows), (cur_name, cur_rows)) in enumerate(zip(saved_chunks, current_chunks)):
+        last = i == len(saved_chunks) - 1
+        if name != cur_name or (rows != cur_rows if not last else rows > cur_rows):
+            return False
+    return True
+
+
+def envelope_frame(pyr, columns, start, stop, level):
+    """Long-format envelope rows (axis, x, lo, hi, mean) for plotting libraries that want a DataFrame."""
+    parts = []
+    for c in columns:
+        x, lo, hi, mean = pyr.envelope(c, start, stop, level)
+        parts.append(pd.DataFrame({"axis": c, "x": x, "lo": lo, "hi": hi, "mean": mean}))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["axis", "x", "lo", "hi", "mean"])
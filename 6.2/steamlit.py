@@ -1,30 +1,86 @@
 # streamlit_gyro_dashboard.py
 # Streamlit-based Gyroscope Dashboard with robust folder/file watch
+# In watch-folder mode every CSV chunk in the folder is one continuous sample
+# index (chunks.py): windows anywhere in hours of data load only the chunks
+# they overlap. "Overview + detail" draws min/max/mean envelopes from the
+# pyramid (pyramid.py) at the level matching the chart width, so any span,
+# from the whole recording to a few samples, ships about the same payload.
+# Line/Scatter windows longer than RASTER_THRESHOLD are binned server-side
+# into a density grid (raster.py) and sent as a single PNG image (mark_image).
 from pathlib import Path
-import time
 import numpy as np
 import pandas as pd
 import altair as alt
 import streamlit as st
 
+from csvcache import parse_times
+from chunks import ChunkedDataset, chunk_order
+from winstats import WindowStats
+from pyramid import Pyramid, envelope_frame
+from raster import composite, density_grids, png_data_url
+from watcher import FolderWatcher
+
 st.set_page_config(page_title="Gyroscope Dashboard", layout="wide")
 st.write("✅ Dashboard initialized")
 
+REFRESH_SEC = 10         # live section re-run period (watch folder mode)
+MAX_LOADED_CHUNKS = 8    # parsed chunks kept in memory per watched folder
+HIST_BINS = 40           # histogram bars (fixed edges over the whole dataset)
+OVERVIEW_PX = 800        # assumed chart widths when picking a pyramid level
+DETAIL_PX = 1000
+RASTER_THRESHOLD = 20000 # Line/Scatter windows longer than this become a density raster
+RASTER_SHAPE = (350, DETAIL_PX)  # raster pixels (rows, columns) = chart size; bounds the PNG payload
+RASTER_COLORS = ["#4c78a8", "#f58518", "#e45756", "#72b7b2", "#54a24b", "#eeca3b"]  # Vega category colors
+RASTER_STEP = 20000      # rows loaded at a time while binning
+
+# st.fragment is Streamlit ≥ 1.37; older releases ship it as experimental_fragment
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
 # ---------- Utility Functions ----------
-def get_csv_files(folder: Path):
-    try:
-        return sorted(folder.glob("*.csv"), key=lambda f: f.stat().st_mtime)
-    except Exception:
-        return []
+@st.cache_resource(show_spinner=False)
+def open_watcher(folder: str):
+    """inotify/watchdog index of the folder; reruns read it instead of globbing."""
+    watcher = FolderWatcher(Path(folder), key=chunk_order)
+    watcher.start()
+    return watcher
+
+@st.cache_resource(show_spinner=False)
+def open_dataset(folder: str):
+    """One chunk index per folder, shared by every session; refresh() is free until a file event."""
+    return ChunkedDataset(Path(folder), max_loaded=MAX_LOADED_CHUNKS, watcher=open_watcher(folder))
+
+@st.cache_resource(show_spinner=False)
+def open_stats(folder: str, columns: tuple):
+    """Prefix-sum / sparse-table index for the folder, kept in step by dataset.refresh()."""
+    return WindowStats.for_dataset(open_dataset(folder), columns, bins=HIST_BINS)
 
-def newest_csv(folder: Path):
-    files = get_csv_files(folder)
-    return files[-1] if files else None
+@st.cache_resource(show_spinner=False)
+def open_pyramid(folder: str, columns: tuple):
+    """Min/max/mean pyramid, loaded from (and saved to) .pyramid.npz in the folder."""
+    return Pyramid.for_dataset(open_dataset(folder), columns)
 
-def read_csv(path):
+@st.cache_resource(show_spinner=False)
+def open_upload(name: str, size: int, _file):
+    """Parsed upload keyed on name and size (the file object itself is not hashed)."""
+    return read_csv(_file)
+
+@st.cache_resource(show_spinner=False)
+def open_upload_stats(name: str, size: int, columns: tuple):
+    """Window-stats index of the upload, built once rather than on every rerun and fragment tick."""
+    return WindowStats.from_frame(open_upload(name, size, None), list(columns), bins=HIST_BINS)
+
+@st.cache_resource(show_spinner=False)
+def open_upload_pyramid(name: str, size: int, columns: tuple):
+    """Min/max/mean pyramid of the upload, built once."""
+    pyramid = Pyramid(list(columns))
+    pyramid.extend(open_upload(name, size, None))
+    return pyramid
+
+def read_csv(src):
     try:
-        df = pd.read_csv(path)
+        df = pd.read_csv(src)
         df.columns = [c.strip() for c in df.columns]
+        parse_times(df)
         if "sample" not in df.columns:
             df["sample"] = np.arange(len(df))
         return df
@@ -46,14 +102,15 @@ st.sidebar.title("Controls")
 source_mode = st.sidebar.radio("Data source", ["Upload CSV file", "Watch folder"], index=1)
 
 uploaded_df = pd.DataFrame()
-watched_df = pd.DataFrame()
+dataset = None
 file_info_text = ""
 
 # --- Upload CSV mode ---
 if source_mode == "Upload CSV file":
     uploaded_file = st.sidebar.file_uploader("Upload CSV", type=["csv"])
     if uploaded_file:
-        uploaded_df = read_csv(uploaded_file)
+        upload_key = (uploaded_file.name, uploaded_file.size)
+        uploaded_df = open_upload(*upload_key, uploaded_file)
         file_info_text = f"Uploaded: {uploaded_file.name}"
 
 # --- Watch folder mode ---
@@ -62,28 +119,36 @@ else:
     folder_input = st.sidebar.text_input("Folder to monitor", value=default_path)
     folder_path = Path(folder_input.strip().strip('"').strip("'"))
     st.sidebar.caption(f"Monitoring: {folder_path}")
-    st.write({
-        "folder_exists": folder_path.exists(),
-        "csv_count": len(list(folder_path.glob("*.csv")))
-    })
 
     if not folder_path.exists():
         st.warning("Folder not found. Check path above.")
-    latest_file = newest_csv(folder_path)
-    if latest_file:
-        file_info_text = f"Watching: {folder_path} • Latest: {latest_file.name}"
-        watched_df = read_csv(latest_file)
+    else:
+        folder_key = str(folder_path.resolve())
+        dataset = open_dataset(folder_key)
+        dataset.refresh()
+    st.write({
+        "folder_exists": folder_path.exists(),
+        "csv_count": len(dataset.paths) if dataset is not None else 0
+    })
+    if dataset is not None and len(dataset):
+        mode = "inotify" if dataset.watcher.event_driven else "polling"
+        file_info_text = f"Watching ({mode}): {folder_path} • {len(dataset.paths)} chunks • Latest: {dataset.newest.name}"
     else:
         st.warning("No CSV files detected yet.")
-        watched_df = pd.DataFrame()
 
-# Determine which dataframe to use
-df = uploaded_df if source_mode == "Upload CSV file" else watched_df
+def total_rows():
+    return len(dataset) if dataset is not None else len(uploaded_df)
+
+def get_window(start, end):
+    return dataset.window(start, end) if dataset is not None else uploaded_df.iloc[start:end]
+
+# Determine which dataframe to use (watch mode: only the first rows for preview/axes)
+df = get_window(0, 10)
 
 # Preview / Debug section
 with st.expander("Data preview / status", expanded=True):
     st.write("File info:", file_info_text or "(none)")
-    st.write("Data shape:", df.shape)
+    st.write("Data shape:", (total_rows(), df.shape[1]))
     if not df.empty:
         st.dataframe(df.head(10))
     else:
@@ -93,6 +158,7 @@ if df.empty:
     st.stop()
 
 # ---------- Plotting Controls ----------
+view_choice = st.sidebar.radio("View", ["Window", "Overview + detail"], index=0)
 chart_choice = st.sidebar.selectbox("Chart type", ["Line", "Scatter", "Histogram"], index=0)
 
 axes_list = numeric_columns(df)
@@ -100,87 +166,194 @@ if not axes_list:
     st.error("No numeric columns found for plotting.")
     st.stop()
 
+# window summaries and histograms come from this index in O(1) / O(bins)
+if dataset is not None:
+    stats = open_stats(folder_key, tuple(axes_list))
+    pyramid = open_pyramid(folder_key, tuple(axes_list))
+else:
+    stats = open_upload_stats(*upload_key, tuple(axes_list))
+    pyramid = open_upload_pyramid(*upload_key, tuple(axes_list))
+
 selected_axes = st.sidebar.multiselect("Axes to display", axes_list, default=axes_list)
 if not selected_axes:
     st.warning("Select at least one axis.")
     st.stop()
 
 # ---------- Windowing ----------
-if "start_index" not in st.session_state:
-    st.session_state.start_index = 0
 if "window_size" not in st.session_state:
-    st.session_state.window_size = min(200, len(df))
+    st.session_state.window_size = min(200, total_rows())
 
 win_size = st.sidebar.number_input(
     "Number of samples (N)",
     min_value=10,
-    max_value=int(len(df)),
-    value=min(200, len(df)),
+    max_value=max(10, total_rows()),
+    value=min(200, max(10, total_rows())),
     step=10
 )
 st.session_state.window_size = int(win_size)
+if "start_index" not in st.session_state:
+    # a watched folder opens on its newest rows and keeps following them
+    watching = dataset is not None
+    st.session_state.start_index = max(0, total_rows() - st.session_state.window_size) if watching else 0
+    st.session_state.follow_end = watching
 
 col_prev, col_next = st.sidebar.columns(2)
 if col_prev.button("Previous"):
     st.session_state.start_index = max(0, st.session_state.start_index - st.session_state.window_size)
+    st.session_state.follow_end = False
 if col_next.button("Next"):
-    st.session_state.start_index = min(max(0, len(df) - st.session_state.window_size),
+    st.session_state.start_index = min(max(0, total_rows() - st.session_state.window_size),
                                        st.session_state.start_index + st.session_state.window_size)
+    st.session_state.follow_end = (dataset is not None and
+                                   st.session_state.start_index + st.session_state.window_size >= total_rows())
 
-start_idx = clamp_value(st.session_state.start_index, 0, max(0, len(df) - 1))
-end_idx = clamp_value(start_idx + st.session_state.window_size, 1, len(df))
-window_df = df.iloc[start_idx:end_idx].copy()
+if view_choice == "Overview + detail":
+    default_end = min(total_rows(), st.session_state.start_index + st.session_state.window_size)
+    detail_range = st.sidebar.slider("Detail range (samples)", 0, max(total_rows(), 1),
+                                     (min(st.session_state.start_index, default_end), default_end))
+
+auto_refresh = source_mode == "Watch folder" and st.sidebar.checkbox(f"Auto-refresh every {REFRESH_SEC}s", value=True)
+if auto_refresh:
+    st.sidebar.caption("Auto-refresh enabled")
 
 # ---------- Layout ----------
 st.title("Gyroscope Dashboard — Streamlit")
-st.caption("Navigate through N-sample windows or watch a folder for new CSV files.")
-
-col_metrics = st.columns(3)
-col_metrics[0].metric("Total rows", len(df))
-col_metrics[1].metric("Window size", st.session_state.window_size)
-col_metrics[2].metric("Window range", f"{start_idx}–{end_idx-1}")
+st.caption("Navigate through N-sample windows across every CSV chunk, or watch a folder for new ones.")
 
 if file_info_text:
     st.markdown(f"**Data source:** {file_info_text}")
 
-# Prepare data for Altair (long format)
-plot_df = window_df.reset_index(drop=True).reset_index().rename(columns={"index": "sample_idx"})
-plot_df = plot_df.melt(id_vars=["sample_idx"], value_vars=selected_axes, var_name="axis", value_name="value")
-
-# ---------- Plot ----------
-if chart_choice == "Line":
-    chart = alt.Chart(plot_df).mark_line().encode(
-        x="sample_idx:Q",
-        y="value:Q",
-        color="axis:N",
-        tooltip=["axis:N", "sample_idx:Q", "value:Q"]
-    ).properties(height=350)
-elif chart_choice == "Scatter":
-    chart = alt.Chart(plot_df).mark_circle(size=30).encode(
-        x="sample_idx:Q",
-        y="value:Q",
-        color="axis:N",
-        tooltip=["axis:N", "sample_idx:Q", "value:Q"]
-    ).properties(height=350)
-else:  # Histogram
-    chart = alt.Chart(plot_df).mark_bar(opacity=0.7).encode(
-        x=alt.X("value:Q", bin=alt.Bin(maxbins=40), title="Reading bins"),
-        y=alt.Y("count():Q", title="Count"),
-        color="axis:N",
-        tooltip=["axis:N", "count():Q"]
-    ).properties(height=350)
-
-st.altair_chart(chart, use_container_width=True)
-
-# ---------- Summary Table ----------
-st.subheader("Summary for current window")
-summary_df = window_df[selected_axes].agg(["count", "mean", "std", "min", "max"]).T.reset_index().rename(columns={"index": "axis"})
-summary_df["mean"] = summary_df["mean"].round(4)
-summary_df["std"] = summary_df["std"].round(4)
-st.dataframe(summary_df, hide_index=True)
-
-# ---------- Auto-refresh (watch folder mode) ----------
-if source_mode == "Watch folder" and st.sidebar.checkbox("Auto-refresh every 10s", value=True):
-    st.sidebar.caption("Auto-refresh enabled")
-    time.sleep(10)
-    st.experimental_rerun()
+
+# ---------- Overview + detail ----------
+def envelope_df(start, stop, width):
+    """Pyramid buckets at ~2 per pixel, or the raw rows once zoomed in that far."""
+    level = pyramid.level_for(start, stop, width)
+    if level:
+        return envelope_frame(pyramid, selected_axes, start, stop, level)
+    raw = get_window(start, stop)
+    raw = raw.assign(x=raw["sample"] if "sample" in raw.columns else np.arange(start, start + len(raw)))
+    long_df = raw.melt(id_vars=["x"], value_vars=selected_axes, var_name="axis", value_name="mean")
+    return long_df.assign(lo=long_df["mean"], hi=long_df["mean"])
+
+def envelope_chart(env, height, highlight=None):
+    base = alt.Chart(env).encode(x=alt.X("x:Q", title="Sample"), color="axis:N")
+    chart = base.mark_area(opacity=0.3).encode(y=alt.Y("lo:Q", title="Reading"), y2="hi:Q") + base.mark_line().encode(y="mean:Q")
+    if highlight:
+        box = alt.Chart(pd.DataFrame({"x": [highlight[0]], "x2": [highlight[1]]})).mark_rect(opacity=0.15, color="gray")
+        chart = chart + box.encode(x="x:Q", x2="x2:Q")
+    return chart.properties(height=height)
+
+
+def raster_chart(start, stop):
+    """Density grid composited into one PNG image; payload is bounded by RASTER_SHAPE, not by stop - start."""
+    summary = stats.summary(start, stop, selected_axes)
+    y_range = (min(summary[a]["min"] for a in selected_axes), max(summary[a]["max"] for a in selected_axes))
+    frames = (get_window(lo, min(lo + RASTER_STEP, stop)) for lo in range(start, stop, RASTER_STEP))
+    grids = density_grids(frames, selected_axes, (start, stop), y_range, RASTER_SHAPE)
+    colors = [RASTER_COLORS[i % len(RASTER_COLORS)] for i in range(len(selected_axes))]
+    image = alt.Chart(pd.DataFrame({
+        "x": [start], "x2": [stop], "y": [y_range[0]], "y2": [y_range[1]],
+        "url": [png_data_url(composite(grids, colors))],
+    })).mark_image(aspect=False).encode(
+        x=alt.X("x:Q", title="Sample", scale=alt.Scale(domain=[start, stop], nice=False)), x2="x2:Q",
+        y=alt.Y("y:Q", title="Reading", scale=alt.Scale(domain=list(y_range), nice=False)), y2="y2:Q",
+        url="url:N"
+    )
+    # invisible marks, only so the axis colors get a legend
+    legend = alt.Chart(pd.DataFrame({"axis": selected_axes, "x": start, "y": y_range[0]})).mark_point(opacity=0).encode(
+        x="x:Q", y="y:Q",
+        color=alt.Color("axis:N", scale=alt.Scale(domain=selected_axes, range=colors),
+                        legend=alt.Legend(symbolOpacity=1))
+    )
+    return (image + legend).properties(height=RASTER_SHAPE[0])
+
+
+# ---------- Live section ----------
+# Re-runs on its own every REFRESH_SEC without a full script rerun; refresh()
+# only parses lines appended to the newest chunk since the previous run.
+@fragment(run_every=REFRESH_SEC if auto_refresh else None)
+def live_section():
+    if dataset is not None:
+        dataset.refresh()
+    rows = total_rows()
+    if not rows:
+        st.info("No data available.")
+        return
+    if st.session_state.get("follow_end"):
+        st.session_state.start_index = max(0, rows - st.session_state.window_size)
+
+    if view_choice == "Overview + detail":
+        start_idx = clamp_value(detail_range[0], 0, max(0, rows - 1))
+        end_idx = clamp_value(max(detail_range[1], start_idx + 1), 1, rows)
+    else:
+        start_idx = clamp_value(st.session_state.start_index, 0, max(0, rows - 1))
+        end_idx = clamp_value(start_idx + st.session_state.window_size, 1, rows)
+
+    col_metrics = st.columns(3)
+    col_metrics[0].metric("Total rows", rows)
+    col_metrics[1].metric("Window size", end_idx - start_idx)
+    col_metrics[2].metric("Window range", f"{start_idx}–{end_idx-1}")
+
+    if view_choice == "Overview + detail":
+        st.altair_chart(envelope_chart(envelope_df(0, rows, OVERVIEW_PX), 120, (start_idx, end_idx)),
+                        use_container_width=True)
+        st.altair_chart(envelope_chart(envelope_df(start_idx, end_idx, DETAIL_PX), 350), use_container_width=True)
+        summary_section(start_idx, end_idx)
+        return
+
+    if chart_choice != "Histogram" and end_idx - start_idx > RASTER_THRESHOLD:
+        st.caption(f"{end_idx - start_idx} samples: drawn as a density raster")
+        st.altair_chart(raster_chart(start_idx, end_idx), use_container_width=True)
+        summary_section(start_idx, end_idx)
+        return
+
+    # Prepare data for Altair (long format); histograms need no rows at all
+    if chart_choice != "Histogram":
+        window_df = get_window(start_idx, end_idx)
+        plot_df = window_df.reset_index(drop=True).reset_index().rename(columns={"index": "sample_idx"})
+        plot_df = plot_df.melt(id_vars=["sample_idx"], value_vars=selected_axes, var_name="axis", value_name="value")
+
+    # ---------- Plot ----------
+    if chart_choice == "Line":
+        chart = alt.Chart(plot_df).mark_line().encode(
+            x="sample_idx:Q",
+            y="value:Q",
+            color="axis:N",
+            tooltip=["axis:N", "sample_idx:Q", "value:Q"]
+        ).properties(height=350)
+    elif chart_choice == "Scatter":
+        chart = alt.Chart(plot_df).mark_circle(size=30).encode(
+            x="sample_idx:Q",
+            y="value:Q",
+            color="axis:N",
+            tooltip=["axis:N", "sample_idx:Q", "value:Q"]
+        ).properties(height=350)
+    else:  # Histogram
+        bars = []
+        for axis in selected_axes:
+            counts, edges = stats.histogram(axis, start_idx, end_idx)
+            bars.append(pd.DataFrame({"axis": axis, "left": edges[:-1], "right": edges[1:], "count": counts}))
+        hist_df = pd.concat(bars, ignore_index=True)
+        chart = alt.Chart(hist_df).mark_bar(opacity=0.7).encode(
+            x=alt.X("left:Q", title="Reading bins"),
+            x2="right:Q",
+            y=alt.Y("count:Q", title="Count"),
+            color="axis:N",
+            tooltip=["axis:N", "left:Q", "right:Q", "count:Q"]
+        ).properties(height=350)
+
+    st.altair_chart(chart, use_container_width=True)
+    summary_section(start_idx, end_idx)
+
+
+def summary_section(start_idx, end_idx):
+    # ---------- Summary Table ----------
+    st.subheader("Summary for current window")
+    summary = stats.summary(start_idx, end_idx, selected_axes)
+    summary_df = pd.DataFrame([{"axis": a, **summary[a]} for a in selected_axes])
+    summary_df["mean"] = summary_df["mean"].round(4)
+    summary_df["std"] = summary_df["std"].round(4)
+    st.dataframe(summary_df, hide_index=True)
+
+
+live_section()
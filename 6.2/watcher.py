@@ -0,0 +1,164 @@
+# watcher.py
+"""
+SIT225 — Event-driven index of the CSV files in a folder.
+
+FolderWatcher keeps the matching files in memory, ordered by mtime (or any
+key), and updates that index from filesystem events: inotify through
+watchdog when it is installed, otherwise one background thread that rescans
+every `poll_sec`. Readers never scan the folder themselves:
+
+    w = FolderWatcher(Path("data")); w.start()
+    w.files()                 # ordered list, no glob/stat
+    w.version                 # bumped on every create/modify/delete/move
+    w.subscribe(fn)           # fn(kind, path) from the watcher thread
+
+A dashboard compares `version` with the last one it handled, so a poll with
+nothing new costs nothing, and a subscriber can react to a new chunk within
+milliseconds.
+"""
+
+import fnmatch
+import threading
+from pathlib import Path
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_OK = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_OK = False
+
+
+def mtime_order(path: Path):
+    try:
+        return (path.stat().st_mtime, path.name)
+    except OSError:
+        return (0.0, path.name)
+
+
+def _signatures(folder: Path, pattern):
+    out = {}
+    for p in folder.glob(pattern) if folder.is_dir() else ():
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        out[p] = (st.st_size, st.st_mtime_ns)
+    return out
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        kind = event.event_type
+        if kind == "moved":
+            self.watcher._apply("deleted", Path(event.src_path))
+            self.watcher._apply("created", Path(event.dest_path))
+        elif kind in ("created", "modified", "deleted", "closed"):
+            self.watcher._apply("modified" if kind == "closed" else kind, Path(event.src_path))
+
+
+class FolderWatcher:
+    def __init__(self, folder: Path, pattern="*.csv", key=mtime_order, poll_sec=1.0):
+        self.folder = Path(folder)
+        self.pattern = pattern
+        self.key = key
+        self.poll_sec = poll_sec
+        self.version = 0
+        self.event_driven = False
+        self._files = {}          # path -> sort key
+        self._order = []
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._observer = None
+        self._stop = threading.Event()
+
+    # ---------- Index ----------
+    def _scan(self):
+        if not self.folder.is_dir():
+            return {}
+        return {p: self.key(p) for p in self.folder.glob(self.pattern)}
+
+    def _reorder(self):
+        self._order = sorted(self._files, key=self._files.get)
+
+    def files(self):
+        with self._lock:
+            return list(self._order)
+
+    def newest(self):
+        with self._lock:
+            return self._order[-1] if self._order else None
+
+    def __len__(self):
+        return len(self._order)
+
+    # ---------- Events ----------
+    def subscribe(self, fn):
+        """fn(kind, path) for "created" / "modified" / "deleted"; runs on the watcher thread."""
+        self._listeners.append(fn)
+
+    def _apply(self, kind, path):
+        if not fnmatch.fnmatch(path.name, self.pattern):
+            return
+        path = self.folder / path.name       # the watch is not recursive: direct children only
+        with self._lock:
+            if kind == "deleted":
+                if self._files.pop(path, None) is None:
+                    return
+                self._order.remove(path)
+            else:
+                key = self.key(path)
+                if self._files.get(path) != key:
+                    is_new = path not in self._files
+                    self._files[path] = key
+                    # common case: the newest file grows or a newer one appears -> no re-sort
+                    if is_new and (not self._order or key >= self._files[self._order[-1]]):
+                        self._order.append(path)
+                    elif is_new or path != self._order[-1]:
+                        self._reorder()
+            self.version += 1
+        for fn in self._listeners:
+            fn(kind, path)
+
+    # ---------- Lifecycle ----------
+    def start(self):
+        """Follow events, then take the initial scan. Returns True when inotify/watchdog is in use."""
+        if WATCHDOG_OK and self.folder.is_dir():
+            # observer first: a file created during the scan is then seen by one or the other
+            self._observer = Observer()
+            self._observer.schedule(_Handler(self), str(self.folder), recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+            self.event_driven = True
+        with self._lock:
+            self._files = self._scan()
+            self._reorder()
+            self.version += 1
+        if not self.event_driven:
+            threading.Thread(target=self._poll_loop, daemon=True).start()
+        return self.event_driven
+
+    def _poll_loop(self):
+        # fallback: one shared scan per poll_sec, diffed into the same events
+        seen = _signatures(self.folder, self.pattern)
+        while not self._stop.wait(self.poll_sec):
+            current = _signatures(self.folder, self.pattern)
+            for path in seen.keys() - current.keys():
+                self._apply("deleted", path)
+            for path, sig in current.items():
+                if seen.get(path) != sig:
+                    self._apply("created" if path not in seen else "modified", path)
+            seen = current
+
+    def stop(self):
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
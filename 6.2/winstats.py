@@ -0,0 +1,319 @@
+# winstats.py
+"""
+SIT225 — Window statistics in constant time.
+
+WindowStats is built once per dataset (and extended as rows arrive). Any
+window [start, stop) then gets count/mean/std/min/max and a histogram while
+touching at most the ragged rows at its two ends:
+
+    prefix sums of x, x² and the row count -> count, mean, std (ddof=1, like pandas)
+    at every BLOCK boundary
+    sparse table over BLOCK-row blocks     -> min / max (two table lookups)
+    one fine-bin id per row (uint16) and   -> histogram on fixed edges in O(FINE_BINS + COARSE)
+    cumulative bin counts every COARSE rows   (4095 fine bins, the occupied span merged
+                                              down to `bins` bars)
+
+The values themselves are not kept: the partial blocks at either end of a
+window (fewer than 2 * BLOCK rows) are read back through `reader(start, stop)`
+— dataset.window for a ChunkedDataset, a DataFrame slice otherwise. Every
+array grows by doubling its capacity, so appending k rows costs O(k) however
+long the recording is, and the index takes about 5 bytes per row per column
+(the float64 data itself is 8).
+
+    stats = WindowStats.from_frame(df, ["gyro_x", "gyro_y", "gyro_z"])
+    stats.summary(1000, 5000)          # {"gyro_x": {"count":..., "mean":..., ...}}
+    counts, edges = stats.histogram("gyro_x", 1000, 5000)
+
+Bin edges are fixed when the first rows arrive (0.5–99.5 percentile range
+split into 4095 bins); values outside that range land in the end bins.
+Windows of up to EXACT_ROWS rows are read whole instead: their histogram is
+np.histogram over the window's own min..max, and quantiles are exact.
+"""
+
+import numpy as np
+import pandas as pd
+
+BLOCK = 256                      # rows per block for the sums and the min/max table
+COARSE = 16384                   # rows between stored cumulative histograms
+FINE_BINS = 4095                 # fixed bins per column; merged down to `bins` per query
+NO_BIN = 4095                    # bin id of a NaN row
+EXACT_ROWS = 20000               # windows up to this long get histograms/quantiles from their own rows
+EDGE_PERCENTILES = (0.5, 99.5)   # bin edges ignore the rare spikes; those land in the end bins
+
+
+class _Grow:
+    """Append-only array (1-D, or rows of `width`) that doubles its capacity when full."""
+
+    def __init__(self, dtype, width=None, first=None):
+        self._buf = np.zeros((16,) if width is None else (16, width), dtype=dtype)
+        self.n = 0
+        if first is not None:
+            self.extend([first])
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=self._buf.dtype)
+        need = self.n + len(rows)
+        if need > len(self._buf):
+            buf = np.zeros((max(need, 2 * len(self._buf)),) + self._buf.shape[1:], dtype=self._buf.dtype)
+            buf[: self.n] = self._buf[: self.n]
+            self._buf = buf
+        self._buf[self.n: need] = rows
+        self.n = need
+
+    @property
+    def a(self):
+        return self._buf[: self.n]
+
+    @property
+    def nbytes(self):
+        return self._buf.nbytes
+
+
+class _Channel:
+    def __init__(self, bins, edges=None):
+        self.bins = bins
+        self.edges = edges
+        self.rows = 0
+        self.shift = None                         # subtracted before squaring (less cancellation)
+        self.ids = _Grow(np.uint16)               # fine bin per row, NO_BIN for NaN
+        self.tail = np.empty(0)                   # values of the unfinished last block
+        self.bsum = _Grow(float, first=0.0)       # sums over rows [0, j*BLOCK)
+        self.bsq = _Grow(float, first=0.0)
+        self.bcnt = _Grow(np.int64, first=0)
+        self.mins = []                            # sparse table levels over full blocks
+        self.maxs = []
+        self.cum_bins = _Grow(np.int64, bins, first=np.zeros(bins))   # counts over rows [0, j*COARSE)
+
+    @property
+    def nbytes(self):
+        grows = [self.ids, self.bsum, self.bsq, self.bcnt, self.cum_bins, *self.mins, *self.maxs]
+        return sum(g.nbytes for g in grows) + self.tail.nbytes
+
+    def extend(self, v):
+        v = np.asarray(v, dtype=float)
+        if not v.size:
+            return
+        ok = ~np.isnan(v)
+        if self.shift is None and ok.any():
+            self.shift = float(v[ok].mean())
+        if self.edges is None and ok.any():
+            lo, hi = (float(q) for q in np.percentile(v[ok], EDGE_PERCENTILES))
+            if hi <= lo:
+                lo, hi = lo - 0.5, hi + 0.5
+            self.edges = np.linspace(lo, hi, self.bins + 1)
+        ids = np.full(v.size, NO_BIN, dtype=np.uint16)
+        if self.edges is not None:
+            ids[ok] = np.clip(np.searchsorted(self.edges, v[ok], side="right") - 1, 0, self.bins - 1)
+        self.ids.extend(ids)
+        self.rows += v.size
+
+        self.tail = np.concatenate((self.tail, v))
+        full = self.tail.size // BLOCK
+        if full:
+            self._add_blocks(self.tail[: full * BLOCK].reshape(full, BLOCK))
+            self.tail = self.tail[full * BLOCK:].copy()
+        self._add_coarse()
+
+    def _add_blocks(self, body):
+        ok = ~np.isnan(body)
+        d = np.where(ok, body - (self.shift or 0.0), 0.0)
+        self.bsum.extend(self.bsum.a[-1] + np.cumsum(d.sum(axis=1)))
+        self.bsq.extend(self.bsq.a[-1] + np.cumsum((d * d).sum(axis=1)))
+        self.bcnt.extend(self.bcnt.a[-1] + np.cumsum(ok.sum(axis=1)))
+        with np.errstate(invalid="ignore"):
+            new_min, new_max = np.fmin.reduce(body, axis=1), np.fmax.reduce(body, axis=1)
+
+        # level k covers blocks [i, i + 2**k); only entries reaching the new blocks are added
+        n_blocks = self.bcnt.n - 1
+        for table, new, op in ((self.mins, new_min, np.fmin), (self.maxs, new_max, np.fmax)):
+            if not table:
+                table.append(_Grow(float))
+            table[0].extend(new)
+            k = 1
+            while (1 << k) <= n_blocks:
+                if k == len(table):
+                    table.append(_Grow(float))
+                half = 1 << (k - 1)
+                prev = table[k - 1].a
+                first, last = table[k].n, n_blocks - (1 << k) + 1
+                table[k].extend(op(prev[first:last], prev[first + half:last + half]))
+                k += 1
+
+    def _add_coarse(self):
+        done, total = self.cum_bins.n - 1, self.rows // COARSE
+        if total == done:
+            return
+        ids = self.ids.a[done * COARSE: total * COARSE].reshape(-1, COARSE).astype(np.int64)
+        m = ids.shape[0]
+        ids += (np.arange(m) * (NO_BIN + 1))[:, None]          # one bincount for all new blocks
+        counts = np.bincount(ids.ravel(), minlength=m * (NO_BIN + 1)).reshape(m, NO_BIN + 1)[:, : self.bins]
+        self.cum_bins.extend(self.cum_bins.a[-1] + np.cumsum(counts, axis=0))
+
+    def _block_range(self, table, op, b0, b1):
+        k = int(b1 - b0).bit_length() - 1
+        return op(table[k].a[b0], table[k].a[b1 - (1 << k)])
+
+    def summary(self, b0, b1, ends):
+        """(count, mean, std, min, max) of full blocks [b0, b1) plus the raw values in `ends`."""
+        ends = ends[~np.isnan(ends)]
+        shift = self.shift or 0.0
+        d = ends - shift
+        n = int(self.bcnt.a[b1] - self.bcnt.a[b0]) + ends.size if b1 > b0 else ends.size
+        if not n:
+            return 0, np.nan, np.nan, np.nan, np.nan
+        s, sq = d.sum(), (d * d).sum()
+        lo = hi = np.nan
+        if b1 > b0:
+            s += self.bsum.a[b1] - self.bsum.a[b0]
+            sq += self.bsq.a[b1] - self.bsq.a[b0]
+            lo = self._block_range(self.mins, np.fmin, b0, b1)
+            hi = self._block_range(self.maxs, np.fmax, b0, b1)
+        if ends.size:
+            lo, hi = np.fmin(lo, ends.min()), np.fmax(hi, ends.max())
+        mean = s / n
+        var = max(sq - s * mean, 0.0) / (n - 1) if n > 1 else np.nan
+        return n, float(mean + shift), float(np.sqrt(var)), float(lo), float(hi)
+
+    def histogram(self, start, stop):
+        if self.edges is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        c0, c1 = -(-start // COARSE), stop // COARSE
+        if c1 <= c0:
+            return _bincount(self.ids.a[start:stop], self.bins), self.edges
+        counts = (self.cum_bins.a[c1] - self.cum_bins.a[c0]
+                  + _bincount(self.ids.a[start: c0 * COARSE], self.bins)
+                  + _bincount(self.ids.a[c1 * COARSE: stop], self.bins))
+        return counts, self.edges
+
+
+def _bincount(ids, bins):
+    return np.bincount(ids, minlength=NO_BIN + 1)[:bins]
+
+
+class WindowStats:
+    def __init__(self, columns, bins=30, edges=None, reader=None):
+        """reader(start, stop) -> DataFrame of those rows; used for the partial blocks of a window."""
+        self.columns = list(columns)
+        self.bins = bins
+        self.reader = reader
+        self._edges = edges or {}
+        self.reset()
+
+    def reset(self):
+        self.channels = {c: _Channel(FINE_BINS, self._edges.get(c)) for c in self.columns}
+
+    def __len__(self):
+        first = next(iter(self.channels.values()), None)
+        return first.rows if first else 0
+
+    @property
+    def nbytes(self):
+        return sum(ch.nbytes for ch in self.channels.values())
+
+    @classmethod
+    def from_frame(cls, df, columns, bins=30):
+        stats = cls(columns, bins, reader=lambda start, stop: df.iloc[start:stop])
+        stats.extend(df)
+        return stats
+
+    @classmethod
+    def for_dataset(cls, dataset, columns, bins=30):
+        """Index every chunk of a ChunkedDataset once and follow its refresh() from then on."""
+        stats = cls(columns, bins, reader=dataset.window)
+
+        def follow(new_df, restarted):
+            if restarted:
+                # one extend over every chunk so the bin edges span the whole recording
+                stats.reset()
+                parts = [df.reindex(columns=stats.columns) for df in dataset.iter_chunks()]
+                if parts:
+                    stats.extend(pd.concat(parts, ignore_index=True))
+            else:
+                stats.extend(new_df)
+
+        follow(None, True)
+        dataset.subscribe(follow)
+        return stats
+
+    def extend(self, df):
+        for c, ch in self.channels.items():
+            ch.extend(df[c].to_numpy(dtype=float) if c in df.columns else np.full(len(df), np.nan))
+
+    def _clamp(self, start, stop):
+        n = len(self)
+        start = max(0, min(int(start), n))
+        return start, max(start, min(int(stop), n))
+
+    def _read(self, start, stop, columns):
+        if stop <= start:
+            return {c: np.empty(0) for c in columns}
+        df = self.reader(start, stop)
+        return {c: df[c].to_numpy(dtype=float) if c in df.columns else np.full(len(df), np.nan)
+                for c in columns}
+
+    def summary(self, start, stop, columns=None):
+        """{column: {"count", "mean", "std", "min", "max"}} for rows [start, stop)."""
+        start, stop = self._clamp(start, stop)
+        columns = list(columns or self.columns)
+        b0, b1 = -(-start // BLOCK), stop // BLOCK
+        if stop - start < 2 * BLOCK:              # short window: read it whole (exact)
+            b0 = b1 = 0
+            ends = self._read(start, stop, columns)
+        else:                                     # full blocks from the index, ragged ends from the rows
+            head = self._read(start, b0 * BLOCK, columns)
+            tail = self._read(b1 * BLOCK, stop, columns)
+            ends = {c: np.concatenate((head[c], tail[c])) for c in columns}
+        out = {}
+        for c in columns:
+            n, mean, std, lo, hi = self.channels[c].summary(b0, b1, ends[c])
+            out[c] = {"count": n, "mean": mean, "std": std, "min": lo, "max": hi}
+        return out
+
+    def _values(self, column, start, stop):
+        v = self._read(start, stop, [column])[column]
+        return v[~np.isnan(v)]
+
+    def histogram(self, column, start, stop, trim=True):
+        """(counts, edges) with `bins` bars over the window's values.
+
+        Up to EXACT_ROWS rows: np.histogram over the window's own min..max.
+        Longer: the fixed fine bins, the occupied span merged into `bins` bars
+        (trim=False returns the raw fine bins instead).
+        """
+        start, stop = self._clamp(start, stop)
+        if trim and stop - start <= EXACT_ROWS:
+            v = self._values(column, start, stop)
+            if not v.size:
+                return np.zeros(0, dtype=np.int64), np.zeros(0)
+            lo, hi = float(v.min()), float(v.max())
+            if hi <= lo:
+                lo, hi = lo - 0.5, hi + 0.5
+            return np.histogram(v, self.bins, (lo, hi))
+        counts, edges = self.channels[column].histogram(start, stop)
+        if not trim:
+            return counts, edges
+        if not counts.any():
+            return counts[:0], edges[:0]
+        nz = np.flatnonzero(counts)
+        span = nz[-1] - nz[0] + 1
+        group = -(-span // self.bins)
+        width = group * self.bins                 # centre the span in exactly `bins` groups of fine bins
+        first = max(0, min(nz[0] - (width - span) // 2, counts.size - width))
+        merged = np.zeros(width, dtype=counts.dtype)
+        part = counts[first: first + width]
+        merged[: part.size] = part
+        step = edges[1] - edges[0]
+        return merged.reshape(self.bins, group).sum(axis=1), edges[0] + step * (first + group * np.arange(self.bins + 1))
+
+    def quantiles(self, column, start, stop, qs=(0.25, 0.5, 0.75)):
+        """Quantiles of rows [start, stop): exact up to EXACT_ROWS rows, else interpolated inside the fine bins."""
+        start, stop = self._clamp(start, stop)
+        if stop - start <= EXACT_ROWS:
+            v = self._values(column, start, stop)
+            return [float(q) for q in np.quantile(v, qs)] if v.size else [np.nan] * len(qs)
+        counts, edges = self.histogram(column, start, stop, trim=False)
+        total = counts.sum()
+        if not total:
+            return [np.nan] * len(qs)
+        cum = np.r_[0, np.cumsum(counts)] / total
+        return [float(np.interp(q, cum, edges)) for q in qs]
@@ -21,6 +21,20 @@ FILE_PREFIX = "gyro"
 PRINT_INTERVAL = 50
 # -----------------------------------
 
+# Monotonic clock: perf_counter_ns anchored to one wall-clock reading.
+# Samples are stamped with integer ns; ISO strings are made per chunk on save.
+EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+def format_ns(stamps, fmt="%Y-%m-%dT%H:%M:%S"):
+    """Epoch-ns stamps → ISO strings with ms, one strftime per distinct second."""
+    out, last_sec, prefix = [], None, ""
+    for ns in stamps:
+        sec, frac = divmod(ns, 1_000_000_000)
+        if sec != last_sec:
+            last_sec, prefix = sec, time.strftime(fmt, time.localtime(sec))
+        out.append(f"{prefix}.{frac // 1_000_000:03d}")
+    return out
+
 output_path = Path(OUTPUT_DIR)
 output_path.mkdir(parents=True, exist_ok=True)
 
@@ -49,6 +63,9 @@ def write_csv_chunk():
     global buffered_rows
     if not buffered_rows:
         return
+    stamps = format_ns(row[1] for row in buffered_rows)
+    for row, ts in zip(buffered_rows, stamps):
+        row[1] = ts
     df = pd.DataFrame(buffered_rows, columns=["sample", "timestamp", axis_cols["x"], axis_cols["y"], axis_cols["z"]])
     timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
     file_name = f"{FILE_PREFIX}_data_{timestamp_str}.csv"
@@ -73,8 +90,8 @@ try:
         except ValueError:
             continue
 
-        timestamp = datetime.now().isoformat(timespec="milliseconds")
-        buffered_rows.append([sample_counter, timestamp, x_val, y_val, z_val])
+        t_ns = EPOCH_NS + time.perf_counter_ns()
+        buffered_rows.append([sample_counter, t_ns, x_val, y_val, z_val])
         sample_counter += 1
 
         if sample_counter % PRINT_INTERVAL == 0:
@@ -7,31 +7,228 @@ Normally, Dash redraws the entire figure each update, causing visible jumps.
 This module uses Graph.extendData to append small batches of points, keeping
 a sliding window for each channel, producing smooth real-time updates.
 
+Transports:
+    "interval" — dcc.Interval polls the server every refresh_ms (default)
+    "sse"      — Server-Sent Events on app.server push each batch as it
+                 arrives; the browser applies it with Plotly.extendTraces.
+
+Assembly:
+    "server"   — Python builds the extendData lists for every viewer
+    "client"   — the server sends the raw rows [[t, v1, ...], ...] into a
+                 dcc.Store and a clientside_callback builds extendData. Each
+                 row range is encoded once and the JSON text is reused by
+                 every viewer that reads it.
+
+Encoding:
+    "json"     — plain JSON lists (default)
+    "binary"   — base64 float32 per channel plus float64 epoch-ms time on a
+                 date axis, in Plotly's {dtype, bdata} typed-array format and
+                 decoded in the browser (implies client assembly). push()
+                 then takes epoch milliseconds or a datetime as timestamp;
+                 batches are shifted to local time to match json mode.
+
+Clock:
+    clock_ns=True — push() takes integer nanosecond stamps from now_ns()
+                 (perf_counter_ns anchored to one epoch reading). Strings are
+                 produced per batch for json and epoch ms for binary, so the
+                 producer does no formatting and ordering is monotonic.
+
+All viewers read one shared append-only ring buffer of `history` rows, each
+with its own cursor (a dcc.Store per tab, or the SSE connection), so every
+open tab sees the full stream and a new tab starts with the current window.
+
 Usage:
     app, state = create_smooth_dash(
         channels=["X","Y","Z"],
         window_size=600,   # visible points per series
         step_size=20,      # max points appended per interval
-        refresh_ms=200     # update period in ms
+        refresh_ms=200,    # update period in ms
+        transport="sse",   # or "interval"
+        history=2400,      # rows kept in the shared ring buffer
+        assemble="client", # or "server"
+        encoding="binary", # or "json"
     )
-    state["push"](timestamp, *values)  # thread-safe insertion
+    state["push"](timestamp, *values)  # thread-safe insertion (now_ns() if clock_ns)
+    state["stats"]()                   # deliveries/s + push→send latency
+    state["update"](n, cursor)         # interval callback, callable directly
+
+Background PNG export:
+    renderer = RenderPool()            # kaleido worker process(es)
+    renderer.start()                   # warm them up (from the main block)
+    renderer.submit(fig, path)         # returns at once; Future of (kind, path)
+    renderer.status_text()             # "render backlog=N last=..."
 """
 from __future__ import annotations
 
-from collections import deque
+import base64
+import json
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from threading import Lock
+from pathlib import Path
+from threading import Condition, Lock
 from typing import List
 
 import plotly.graph_objects as go
-from dash import Dash, dcc, html, Output, Input, no_update
+from dash import Dash, dcc, html, Output, Input, State, no_update
+from flask import Response
+from plotly.io.json import to_json_plotly
 
 
 @dataclass
 class _StreamBuffer:
-    queue: deque       # tuples of (timestamp, val1, val2, ...)
+    ring: list         # tuples of (timestamp, val1, val2, ...)
+    pushed_at: list    # perf_counter push time per ring slot
     lock: Lock
     num_channels: int
+    written: int = 0   # total rows appended; row k is ring[k % len(ring)]
+
+    def append(self, row, pushed_at):
+        slot = self.written % len(self.ring)
+        self.ring[slot] = row
+        self.pushed_at[slot] = pushed_at
+        self.written += 1
+
+    def read_from(self, cursor, limit):
+        """Return (rows, push_times, next_cursor) for up to `limit` rows from cursor."""
+        size = len(self.ring)
+        cursor = max(cursor, self.written - size, 0)
+        stop = min(self.written, cursor + limit)
+        lo = cursor % size
+        hi = lo + (stop - cursor)
+        if hi <= size:      # no wrap-around: two slices instead of per-row lookups
+            return self.ring[lo:hi], self.pushed_at[lo:hi], stop
+        hi -= size
+        return self.ring[lo:] + self.ring[:hi], self.pushed_at[lo:] + self.pushed_at[:hi], stop
+
+
+# {dtype, bdata} typed-array spec → plain array of numbers
+_DECODE_JS = """
+    const decode = function(spec) {
+        const raw = atob(spec.bdata);
+        const bytes = new Uint8Array(raw.length);
+        for (let i = 0; i < raw.length; i++) { bytes[i] = raw.charCodeAt(i); }
+        const typed = spec.dtype === "f8" ? new Float64Array(bytes.buffer) : new Float32Array(bytes.buffer);
+        return Array.from(typed);   // extendTraces nests a typed array inside a plain trace array
+    };
+"""
+
+# Browser side of the SSE transport (one EventSource per tab). Messages hold
+# x/y lists (server assembly), raw rows (client assembly) or binary columns.
+_SSE_JS = """
+function(_id) {
+    if (window._smoothSSE) { return window.dash_clientside.no_update; }
+""" + _DECODE_JS + """
+    const es = new EventSource(%(path)s);
+    window._smoothSSE = es;
+    es.onmessage = function(ev) {
+        const b = JSON.parse(ev.data);
+        const gd = document.querySelector("#graph .js-plotly-plot");
+        if (!gd) { return; }
+        let x = b.x, y = b.y, traces = b.traces;
+        if (b.rows) {
+            const t = b.rows.map(r => r[0]);
+            y = [];
+            for (let i = 1; i < b.rows[0].length; i++) { y.push(b.rows.map(r => r[i])); }
+            x = y.map(() => t);
+            traces = y.map((_, i) => i);
+        } else if (b.bin) {
+            const t = decode(b.bin.t);
+            y = b.bin.y.map(decode);
+            x = y.map(() => t);
+            traces = y.map((_, i) => i);
+        }
+        Plotly.extendTraces(gd, {x: x, y: y}, traces, %(window)d);
+        document.getElementById("info").textContent =
+            "Appended " + x[0].length + " | via SSE | lag=" + (Date.now() - b.sent_ms) + " ms";
+    };
+    return "sse";
+}
+"""
+
+# Client assembly for the interval transport: raw rows → extendData
+_ASSEMBLE_JS = """
+function(batch) {
+    const nu = window.dash_clientside.no_update;
+    if (!batch) { return [nu, "Waiting… pending=0"]; }
+    const rows = JSON.parse(batch.p);
+    const t = rows.map(r => r[0]);
+    const y = [];
+    for (let i = 1; i < rows[0].length; i++) { y.push(rows.map(r => r[i])); }
+    return [
+        [{x: y.map(() => t), y: y}, y.map((_, i) => i), %(window)d],
+        "Appended " + rows.length + " | pending=" + batch.pending
+    ];
+}
+"""
+
+
+# Binary batches: decode and extend the graph directly with typed arrays
+_BINARY_JS = """
+function(batch) {
+    const nu = window.dash_clientside.no_update;
+    if (!batch) { return [nu, "Waiting… pending=0"]; }
+""" + _DECODE_JS + """
+    const gd = document.querySelector("#graph .js-plotly-plot");
+    const bin = JSON.parse(batch.p);
+    const t = decode(bin.t);
+    const y = bin.y.map(decode);
+    if (gd) { Plotly.extendTraces(gd, {x: y.map(() => t), y: y}, y.map((_, i) => i), %(window)d); }
+    return [nu, "Appended " + t.length + " | pending=" + batch.pending];
+}
+"""
+
+
+# --- Monotonic clock ---
+_EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+
+def now_ns() -> int:
+    """Monotonic timestamp in epoch nanoseconds."""
+    return _EPOCH_NS + time.perf_counter_ns()
+
+
+def format_ns(stamps, fmt="%H:%M:%S", digits=3):
+    """Epoch-ns stamps → local time strings, one strftime per distinct second."""
+    out, last_sec, prefix = [], None, ""
+    scale = 10 ** (9 - digits)
+    for ns in stamps:
+        sec, frac = divmod(ns, 1_000_000_000)
+        if sec != last_sec:
+            last_sec, prefix = sec, time.strftime(fmt, time.localtime(sec))
+        out.append(f"{prefix}.{frac // scale:0{digits}d}")
+    return out
+
+
+def _typed_spec(values, typecode):
+    """Numbers → Plotly typed-array spec (little-endian bytes, base64)."""
+    arr = array(typecode, values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return {"dtype": "f8" if typecode == "d" else "f4",
+            "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+
+
+def _to_binary(batch):
+    cols = list(zip(*batch))
+    return {"t": _typed_spec(_local_ms(cols[0]), "d"), "y": [_typed_spec(c, "f") for c in cols[1:]]}
+
+
+def _local_ms(stamps):
+    # Plotly draws epoch ms on a date axis as UTC; add the local UTC offset so
+    # binary mode shows the same clock time as the json-mode strings.
+    shift = time.localtime(stamps[0] / 1000.0).tm_gmtoff * 1000.0
+    return [t + shift for t in stamps]
+
+
+def _epoch_ms(timestamp):
+    if isinstance(timestamp, (int, float)):
+        return timestamp
+    if hasattr(timestamp, "timestamp"):
+        return timestamp.timestamp() * 1000.0
+    raise ValueError(f"encoding='binary' needs epoch ms or a datetime, got {timestamp!r}")
 
 
 def create_smooth_dash(
@@ -39,13 +236,31 @@ def create_smooth_dash(
     window_size: int = 600,
     step_size: int = 20,
     refresh_ms: int = 200,
+    transport: str = "interval",
+    sse_path: str = "/smooth-stream",
+    history: int = None,
+    assemble: str = "server",
+    encoding: str = "json",
+    clock_ns: bool = False,
 ):
     """
     Builds a Dash app configured for smooth streaming using extendData.
     Returns (app, state) where state["push"] appends a sample to the internal queue.
     """
+    if transport not in ("interval", "sse"):
+        raise ValueError(f"Unknown transport {transport!r} (use 'interval' or 'sse')")
+    if assemble not in ("server", "client"):
+        raise ValueError(f"Unknown assemble mode {assemble!r} (use 'server' or 'client')")
+    if encoding not in ("json", "binary"):
+        raise ValueError(f"Unknown encoding {encoding!r} (use 'json' or 'binary')")
+    if encoding == "binary":
+        assemble = "client"     # typed arrays are decoded in the browser
     num_ch = len(channels)
-    buf = _StreamBuffer(deque(), Lock(), num_ch)
+    size = max(history or 4 * window_size, window_size)
+    buf = _StreamBuffer([None] * size, [0.0] * size, Lock(), num_ch)
+    ready = Condition(buf.lock)     # notified on every push (SSE viewers wait on it)
+    stats = {"deliveries": 0, "samples": 0, "lag_ms": 0.0, "since": time.perf_counter()}
+    encoded = {}                    # (first, stop) row range → client payload JSON text
 
     # --- Initialize figure ---
     fig = go.Figure()
@@ -60,6 +275,8 @@ def create_smooth_dash(
         uirevision=True,  # maintain zoom/axis while updating
         title="Live Stream (Smooth)",
     )
+    if encoding == "binary":
+        fig.update_xaxes(type="date")   # epoch-ms x values
 
     # --- Dash layout ---
     app = Dash(__name__)
@@ -69,45 +286,245 @@ def create_smooth_dash(
             html.H2("Smooth Live Stream"),
             html.Div(id="info", style={"marginBottom": "8px"}),
             dcc.Graph(id="graph", figure=fig),
-            dcc.Interval(id="interval", interval=refresh_ms, n_intervals=0),
+            dcc.Interval(id="interval", interval=refresh_ms, n_intervals=0,
+                         disabled=transport != "interval"),
+            dcc.Store(id="transport"),
+            dcc.Store(id="cursor"),     # per-tab read position in the ring
+            dcc.Store(id="batch"),      # raw rows when assemble="client"
         ],
     )
 
-    # --- Callback for updating graph ---
-    @app.callback(
-        Output("graph", "extendData"),
-        Output("info", "children"),
-        Input("interval", "n_intervals"),
-        prevent_initial_call=False,
-    )
-    def _update(_):
+    def _account(push_times):
+        # Delivery accounting; caller holds buf.lock
+        now = time.perf_counter()
+        stats["deliveries"] += 1
+        stats["samples"] += len(push_times)
+        stats["lag_ms"] += (now * len(push_times) - sum(push_times)) * 1000.0
+
+    def _split(batch):
+        cols = list(zip(*batch))
+        return list(cols[0]), [list(c) for c in cols[1:]]
+
+    def _stamped(batch):
+        # clock_ns + json: format the whole batch's timestamps at once
+        if not (clock_ns and encoding == "json" and batch):
+            return batch
+        return [(ts, *row[1:]) for ts, row in zip(format_ns(row[0] for row in batch), batch)]
+
+    def _next_batch(cursor):
         with buf.lock:
-            if not buf.queue:
-                return no_update, "Waiting… inbox=0"
-            batch = [buf.queue.popleft() for _ in range(min(len(buf.queue), step_size))]
+            if cursor is None:   # first tick of a new tab → current window
+                batch, push_times, cursor = buf.read_from(buf.written - window_size, window_size)
+            else:
+                batch, push_times, cursor = buf.read_from(cursor, step_size)
+            _account(push_times)
+            pending = buf.written - cursor
+        return batch, cursor, pending
 
-        timestamps = [row[0] for row in batch]
-        per_channel = [[] for _ in range(buf.num_channels)]
-        for _, *vals in batch:
-            for idx, val in enumerate(vals):
-                per_channel[idx].append(val)
+    def _client_json(batch, stop):
+        # A written row range never changes: encode it once, share it between viewers
+        key = (stop - len(batch), stop)
+        text = encoded.get(key)
+        if text is None:
+            batch = _stamped(batch)
+            text = to_json_plotly(_to_binary(batch) if encoding == "binary" else batch)
+            if len(encoded) >= 64:
+                encoded.clear()
+            encoded[key] = text
+        return text
+
+    # --- Callback for updating graph ---
+    def _update(_, cursor):
+        batch, cursor, pending = _next_batch(cursor)
+        if not batch:
+            return no_update, "Waiting… pending=0", cursor
 
+        timestamps, per_channel = _split(_stamped(batch))
         extend_data = {"x": [timestamps]*buf.num_channels, "y": per_channel}
         trace_ids = list(range(buf.num_channels))
-        return (extend_data, trace_ids, window_size), f"Appended {len(timestamps)} | inbox={len(buf.queue)}"
+        return (extend_data, trace_ids, window_size), f"Appended {len(timestamps)} | pending={pending}", cursor
+
+    def _update_raw(_, cursor):
+        batch, cursor, pending = _next_batch(cursor)
+        if not batch:
+            return no_update, cursor
+        return {"p": _client_json(batch, cursor), "pending": pending}, cursor
+
+    update = _update if assemble == "server" else _update_raw
+    # SSE seeds the current window itself; a page-load poll would send it twice
+    if transport == "interval":
+        if assemble == "server":
+            outputs = [Output("graph", "extendData"), Output("info", "children")]
+        else:
+            outputs = [Output("batch", "data")]
+            app.clientside_callback(
+                (_BINARY_JS if encoding == "binary" else _ASSEMBLE_JS) % {"window": window_size},
+                Output("graph", "extendData"),
+                Output("info", "children"),
+                Input("batch", "data"),
+            )
+        app.callback(
+            *outputs,
+            Output("cursor", "data"),
+            Input("interval", "n_intervals"),
+            State("cursor", "data"),
+            prevent_initial_call=False,
+        )(update)
+
+    # --- Server-Sent Events endpoint ---
+    if transport == "sse":
+        @app.server.route(sse_path)
+        def _sse():
+            with buf.lock:
+                cursor = max(0, buf.written - window_size)   # start with the current window
+
+            def stream():
+                nonlocal cursor
+                yield ": connected\n\n"   # flush headers to the browser right away
+                while True:
+                    with ready:
+                        if cursor >= buf.written:
+                            ready.wait(timeout=15)
+                        batch, push_times, cursor = buf.read_from(cursor, len(buf.ring))
+                        if batch:
+                            _account(push_times)
+                    if not batch:
+                        yield ": keep-alive\n\n"
+                        continue
+                    sent_ms = int(time.time() * 1000)
+                    if assemble == "client":
+                        key = "bin" if encoding == "binary" else "rows"
+                        yield f'data: {{"{key}": {_client_json(batch, cursor)}, "sent_ms": {sent_ms}}}\n\n'
+                        continue
+                    timestamps, per_channel = _split(_stamped(batch))
+                    payload = {
+                        "x": [timestamps]*buf.num_channels,
+                        "y": per_channel,
+                        "traces": list(range(buf.num_channels)),
+                        "sent_ms": sent_ms,
+                    }
+                    yield f"data: {json.dumps(payload)}\n\n"
+
+            return Response(stream(), mimetype="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+        app.clientside_callback(
+            _SSE_JS % {"path": json.dumps(sse_path), "window": window_size},
+            Output("transport", "data"),
+            Input("graph", "id"),
+        )
 
     # --- Thread-safe push method ---
     def _push(timestamp, *vals):
         if len(vals) != num_ch:
             raise ValueError(f"Expected {num_ch} values, got {len(vals)}")
+        if encoding == "binary":
+            timestamp = timestamp / 1e6 if clock_ns else _epoch_ms(timestamp)
+        pushed_at = time.perf_counter()
+        with ready:
+            buf.append((timestamp, *vals), pushed_at)
+            ready.notify_all()
+
+    def _stats():
         with buf.lock:
-            buf.queue.append((timestamp, *vals))
+            s = dict(stats)
+        elapsed = max(time.perf_counter() - s.pop("since"), 1e-9)
+        s["deliveries_per_s"] = s["deliveries"] / elapsed
+        s["mean_lag_ms"] = s.pop("lag_ms") / s["samples"] if s["samples"] else 0.0
+        return s
 
     state = {
         "push": _push,
+        "stats": _stats,
+        "update": update,
         "channels": channels,
         "window_size": window_size,
         "step_size": step_size,
         "refresh_ms": refresh_ms,
+        "transport": transport,
+        "history": len(buf.ring),
+        "assemble": assemble,
+        "encoding": encoding,
+        "clock_ns": clock_ns,
     }
     return app, state
+
+
+# --- Background PNG export ---
+def _warm_renderer():
+    # Runs once in each worker: pay kaleido's start-up before the first real job
+    try:
+        go.Figure().to_image(format="png", width=16, height=16)
+    except Exception:
+        pass    # no kaleido → jobs fall back to HTML
+
+
+def _render_job(spec, png_path, width, height, scale):
+    import plotly.io as pio
+    try:
+        pio.write_image(spec, png_path, width=width, height=height, scale=scale)
+        return "png", png_path
+    except Exception:
+        html_path = str(Path(png_path).with_suffix(".html"))
+        pio.write_html(spec, html_path, include_plotlyjs="cdn")
+        return "html", html_path
+
+
+class RenderPool:
+    """
+    Writes figure PNGs in warm worker processes so Dash callbacks and save
+    threads never wait on kaleido. submit() queues a figure and returns a
+    Future of (kind, path); status() reports the backlog.
+    """
+
+    def __init__(self, workers: int = 1):
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_renderer)
+        self._lock = Lock()
+        self.stats = {"queued": 0, "done": 0, "failed": 0, "render_s": 0.0, "last": None}
+
+    def start(self):
+        # Launch and warm the workers before the first save. Called from the
+        # script's main block, not at import, so spawn-based platforms don't
+        # start processes while the main module is being re-imported.
+        self._pool.submit(int)
+        return self
+
+    def submit(self, fig, png_path, width=1200, height=500, scale=2, on_done=None):
+        spec = fig.to_dict() if hasattr(fig, "to_dict") else fig
+        with self._lock:
+            self.stats["queued"] += 1
+        t0 = time.perf_counter()
+        future = self._pool.submit(_render_job, spec, str(png_path), width, height, scale)
+
+        def _finished(f):
+            try:
+                kind, path = f.result()
+            except Exception as exc:
+                with self._lock:
+                    self.stats["failed"] += 1
+                print(f"[Render] {Path(png_path).name} failed: {exc}")
+                return
+            with self._lock:
+                self.stats["done"] += 1
+                self.stats["render_s"] += time.perf_counter() - t0
+                self.stats["last"] = Path(path).name
+            if on_done:
+                on_done(kind, Path(path))
+
+        future.add_done_callback(_finished)
+        return future
+
+    def status(self):
+        with self._lock:
+            s = dict(self.stats)
+        finished = s["done"] + s["failed"]
+        s["backlog"] = s["queued"] - finished
+        s["mean_render_s"] = s.pop("render_s") / s["done"] if s["done"] else 0.0
+        return s
+
+    def status_text(self):
+        s = self.status()
+        return f"render backlog={s['backlog']} last={s['last'] or '—'}"
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
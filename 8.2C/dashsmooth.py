@@ -11,7 +11,7 @@ import csv
 
 from arduino_iot_cloud import ArduinoCloudClient
 from iot_secrets import DEVICE_ID, SECRET_KEY
-from smoothdash_rewrite import create_smooth_dash
+from smoothdash_rewrite import RenderPool, create_smooth_dash, format_ns, now_ns
 
 import plotly.graph_objects as go
 from dash import html, dcc, Output, Input
@@ -22,10 +22,13 @@ VAR_X, VAR_Y, VAR_Z = "accelerometer_x", "accelerometer_y", "accelerometer_z"
 WINDOW_SIZE = 600
 MAX_STEP    = 15
 REFRESH_MS  = 150
+TRANSPORT   = "interval"  # "interval" = dcc.Interval polling, "sse" = server push
+ENCODING    = "binary"    # "binary" = float32 typed arrays + epoch-ms time, "json" = lists
 
 SAVE_INTERVAL_SEC   = 5
 MIN_POINTS_TO_SAVE  = 30
 OUTPUT_PREFIX       = "accel"
+RENDER_WORKERS      = 1     # background kaleido processes for PNG export
 
 DATA_DIR = Path(__file__).resolve().parent / "data_2"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -37,8 +40,12 @@ app, state = create_smooth_dash(
     window_size=WINDOW_SIZE,
     step_size=MAX_STEP,
     refresh_ms=REFRESH_MS,
+    transport=TRANSPORT,
+    encoding=ENCODING,
+    clock_ns=True,       # samples carry now_ns(); strings are made per batch
 )
 push_sample = state["push"]
+renderer = RenderPool(RENDER_WORKERS)   # PNGs render off the callback/autosave threads
 
 # --- Add Force Save button and status ---
 def append_control_bar(app):
@@ -62,18 +69,17 @@ seen   = {"x": False, "y": False, "z": False}
 data_lock = threading.Lock()
 
 log_lock = threading.Lock()
-log_buffer = []  # tuples: (iso_ts, x, y, z)
+log_buffer = []  # tuples: (t_ns, x, y, z) — formatted when saved
 
 def _current_stamp(): return datetime.now().strftime("%Y%m%d_%H%M%S")
 
 def _emit_if_complete():
     if seen["x"] and seen["y"] and seen["z"]:
         x, y, z = latest["x"], latest["y"], latest["z"]
-        ts_ui = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        push_sample(ts_ui, x, y, z)
-        ts_iso = datetime.now().isoformat(timespec="milliseconds")
+        t_ns = now_ns()
+        push_sample(t_ns, x, y, z)
         with log_lock:
-            log_buffer.append((ts_iso, x, y, z))
+            log_buffer.append((t_ns, x, y, z))
         for k in seen: seen[k] = False
 
 def _on_x(_client, val):
@@ -129,20 +135,18 @@ def _write_plot(rows, base_path: Path):
         template="plotly_white"
     )
     png_path = base_path.with_suffix(".png")
-    html_path = base_path.with_suffix(".html")
-    try:
-        fig.write_image(str(png_path), width=1200, height=500, scale=2)
-        return "png", png_path
-    except Exception:
-        fig.write_html(str(html_path), include_plotlyjs="cdn")
-        return "html", html_path
+    renderer.submit(fig, png_path, width=1200, height=500, scale=2,
+                    on_done=lambda kind, path: print(f"[Render] {kind.upper()} -> {path.name}"))
+    return png_path
 
 def _save_rows(rows):
+    iso = format_ns((r[0] for r in rows), "%Y-%m-%dT%H:%M:%S")
+    rows = [(ts, *r[1:]) for ts, r in zip(iso, rows)]
     base = DATA_DIR / f"{OUTPUT_PREFIX}_{_current_stamp()}"
     csv_file = _write_csv(rows, base)
-    kind, plot_file = _write_plot(rows, base)
-    print(f"[Save] {len(rows)} samples | CSV -> {csv_file.name} | {kind.upper()} -> {plot_file.name}")
-    return f"Saved {len(rows)} samples: {csv_file.name} + {plot_file.name}"
+    plot_file = _write_plot(rows, base)
+    print(f"[Save] {len(rows)} samples | CSV -> {csv_file.name} | PNG queued -> {plot_file.name}")
+    return f"Saved {len(rows)} samples: {csv_file.name} + {plot_file.name} (queued, {renderer.status_text()})"
 
 # --- Autosave background thread ---
 def start_autosave():
@@ -181,11 +185,12 @@ def manual_save(_):
 )
 def show_buffer(_):
     with log_lock: n = len(log_buffer)
-    print(f"[Buffer] {n} samples buffered")
-    return f"Buffered: {n} samples"
+    print(f"[Buffer] {n} samples buffered | {renderer.status_text()}")
+    return f"Buffered: {n} samples | {renderer.status_text()}"
 
 # --- Main ---
 if __name__ == "__main__":
+    renderer.start()
     start_cloud()
     start_autosave()
     print(f"Saving data to: {DATA_DIR}")
@@ -0,0 +1,141 @@
+# camera.py
+"""
+SIT225 Task 8.3D — Webcam grabbed continuously in a subprocess.
+
+The child process owns cv2.VideoCapture and writes every frame into a small
+ring of slots in shared memory, each stamped with the same monotonic epoch-ns
+clock the sensor samples use. snap() in the main process is then just a copy
+of the slot closest to the requested time (normally the window end); JPEG
+encoding runs on a separate thread, so neither the Dash server nor the
+sensor callbacks ever wait on OpenCV or on stale driver buffers.
+
+Shared memory layout:
+    int64[slots, 2]            per slot: (seq, t_ns); seq is odd while written
+    uint8[slots, H, W, 3]      BGR frames, resized to `size` if needed
+"""
+
+import multiprocessing as mp
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+try:
+    import cv2
+    import numpy as np
+    OPENCV_OK = True
+except ImportError:
+    OPENCV_OK = False
+
+
+def _views(buf, slots, size):
+    w, h = size
+    header = np.ndarray((slots, 2), dtype=np.int64, buffer=buf)
+    frames = np.ndarray((slots, h, w, 3), dtype=np.uint8, buffer=buf, offset=header.nbytes)
+    return header, frames
+
+
+def _grab_loop(shm_name, device, size, slots, epoch_ns, stop):
+    # Child process: grab as fast as the camera delivers, never block the parent
+    shm = shared_memory.SharedMemory(name=shm_name)
+    header, frames = _views(shm.buf, slots, size)
+    cam = cv2.VideoCapture(device)
+    cam.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+    cam.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    n = 0
+    try:
+        while not stop.is_set():
+            ok, frame = cam.read()
+            if not ok:
+                time.sleep(0.05)
+                continue
+            t_ns = epoch_ns + time.perf_counter_ns()
+            if frame.shape[1::-1] != tuple(size):
+                frame = cv2.resize(frame, tuple(size))
+            slot = n % slots
+            header[slot, 0] += 1          # odd: slot being written
+            frames[slot] = frame
+            header[slot, 1] = t_ns
+            header[slot, 0] += 1          # even: slot consistent
+            n += 1
+    finally:
+        cam.release()
+        del header, frames
+        shm.close()
+
+
+class Camera:
+    def __init__(self, device=0, size=(640, 480), slots=8, epoch_ns=None):
+        self.device = device
+        self.size = tuple(size)
+        self.slots = slots
+        # offset that turns perf_counter_ns into the parent's epoch ns
+        self.epoch_ns = epoch_ns if epoch_ns is not None else time.time_ns() - time.perf_counter_ns()
+        self.shm = None
+        self.proc = None
+        self._stop = None
+        self._encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jpeg")
+
+    def start(self):
+        if not OPENCV_OK:
+            return False
+        if self.proc:
+            return True
+        w, h = self.size
+        nbytes = self.slots * (2 * 8 + w * h * 3)
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._header, self._frames = _views(self.shm.buf, self.slots, self.size)
+        self._header[:] = 0
+        self._stop = mp.Event()
+        self.proc = mp.Process(
+            target=_grab_loop,
+            args=(self.shm.name, self.device, self.size, self.slots, self.epoch_ns, self._stop),
+            daemon=True,
+        )
+        self.proc.start()
+        return True
+
+    def frame_near(self, t_ns=None):
+        """(t_ns, copy of frame) for the slot closest to t_ns (latest if None)."""
+        if not self.proc:
+            return None, None
+        for _ in range(3):                # retry if the grabber overwrote the slot mid-copy
+            seqs, stamps = self._header[:, 0].copy(), self._header[:, 1].copy()
+            ready = [i for i in range(self.slots) if seqs[i] and seqs[i] % 2 == 0]
+            if not ready:
+                return None, None
+            if t_ns is None:
+                slot = max(ready, key=lambda i: stamps[i])
+            else:
+                slot = min(ready, key=lambda i: abs(int(stamps[i]) - t_ns))
+            frame = self._frames[slot].copy()
+            if self._header[slot, 0] == seqs[slot]:
+                return int(stamps[slot]), frame
+        return None, None
+
+    def snap(self, out: Path, t_ns=None, on_saved=None):
+        """Copy the nearest frame now; write out.jpg in the background. Returns the path or None."""
+        stamp, frame = self.frame_near(t_ns)
+        if frame is None:
+            return None
+        path = out.with_suffix(".jpg")
+
+        def _write():
+            if cv2.imwrite(str(path), frame) and on_saved:
+                on_saved(path, stamp)
+            return path
+
+        self._encoder.submit(_write)
+        return path
+
+    def close(self):
+        if self.proc:
+            self._stop.set()
+            self.proc.join(timeout=2)
+            self.proc = None
+        if self.shm:
+            del self._header, self._frames
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        self._encoder.shutdown(wait=True)
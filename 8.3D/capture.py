@@ -5,40 +5,40 @@ SIT225 Task 8.3D — Real-time Dash stream with 10s segmented saving + webcam sn
 Features:
 - Streams accelerometer data from Arduino IoT Cloud into a smooth Plotly Dash graph.
 - Buffers values into 10-second windows; saves each window as CSV + chart + webcam photo.
-- Maintains an annotations.csv for labeling later.
+- Records every window in a SQLite manifest (manifest.py) for labeling later.
 """
 
 import csv
-import re
 import threading
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
 from dash import Dash, dcc, html, Output, Input, no_update
 import plotly.graph_objects as go
-from smoothdash import make_smooth_app
+from smoothdash import RenderPool, make_smooth_app, format_ns, now_ns
+from manifest import Manifest
+from camera import Camera
 from arduino_iot_cloud import ArduinoCloudClient
 from iot_secrets import DEVICE_ID, SECRET_KEY
 
-# Webcam support (optional)
-try:
-    import cv2
-    OPENCV_OK = True
-except ImportError:
-    OPENCV_OK = False
-
-
 # ---------- Config ----------
 VAR_X, VAR_Y, VAR_Z = "accelerometer_x", "accelerometer_y", "accelerometer_z"
 WINDOW_DURATION = 10           # seconds per saved chunk
 MIN_ROWS = 15                  # ensure enough samples before saving
 HOST, PORT = "127.0.0.1", 8050
+TRANSPORT = "interval"         # "interval" polls, "sse" pushes samples to the chart
+ENCODING = "binary"            # "binary" typed arrays + epoch-ms time, "json" lists
+RENDER_WORKERS = 1             # background kaleido processes for chart PNGs
+CAM_DEVICE = 0
+CAM_SIZE = (640, 480)          # frames are resized to this in shared memory
+CAM_SLOTS = 8                  # recent frames kept for nearest-to-boundary lookup
 
 ROOT = Path(__file__).parent
 DATA_DIR = ROOT / "data2"
 DATA_DIR.mkdir(exist_ok=True)
-ANNOT_FILE = DATA_DIR / "annotations.csv"
+ANNOT_FILE = DATA_DIR / "annotations.csv"     # pre-manifest labels, imported once
+MANIFEST_DB = DATA_DIR / "manifest.db"
 
 # ---------- Smooth Dash base ----------
 app, state = make_smooth_app(
@@ -46,8 +46,12 @@ app, state = make_smooth_app(
     window_points=700,
     max_append=25,
     poll_ms=150,
+    transport=TRANSPORT,
+    encoding=ENCODING,
+    clock_ns=True,             # points carry now_ns(); formatted per batch
 )
 append_point = state["push"]
+renderer = RenderPool(RENDER_WORKERS)   # chart export never blocks save_window
 
 from flask import send_from_directory
 
@@ -76,100 +80,52 @@ latest_vals = {"x": None, "y": None, "z": None}
 got_flag = {"x": False, "y": False, "z": False}
 lock = threading.Lock()
 
-buf = []
+buf = []                       # (t_ns, x, y, z), formatted when saved
 buf_lock = threading.Lock()
 buf_start = None
 
+manifest = Manifest(MANIFEST_DB)
+next_seq = None                # handed out under buf_lock; seeded from the manifest
 
-# ---------- Camera helper ----------
-class Camera:
-    def __init__(self):
-        self.cam = None
-        self.lock = threading.Lock()
-
-    def open(self):
-        if not OPENCV_OK:
-            return False
-        if self.cam:
-            return True
-        try:
-            cam = cv2.VideoCapture(0)
-            ok, _ = cam.read()
-            if not ok:
-                cam.release()
-                return False
-            self.cam = cam
-            return True
-        except Exception:
-            return False
-
-    def snap(self, out: Path):
-        if not self.open():
-            return None
-        with self.lock:
-            ok, frame = self.cam.read()
-            if not ok:
-                return None
-            path = out.with_suffix(".jpg")
-            cv2.imwrite(str(path), frame)
-            return path
-
-    def close(self):
-        if self.cam:
-            self.cam.release()
-            self.cam = None
-
-
-camera = Camera()
 
-# ---------- Helpers ----------
-def _iso_now():
-    return datetime.now().isoformat(timespec="milliseconds")
-
-def _seq_number():
-    pat = re.compile(r"^(\d{3})_\d{14}\.csv$")
-    highest = 0
-    for f in DATA_DIR.glob("*.csv"):
-        m = pat.match(f.name)
-        if m:
-            highest = max(highest, int(m.group(1)))
-    return highest + 1
+# ---------- Camera ----------
+# Frames are grabbed continuously in a subprocess (camera.py); a snapshot is a
+# copy of the frame nearest the window end, stamped with the same clock.
+camera = Camera(CAM_DEVICE, CAM_SIZE, CAM_SLOTS, epoch_ns=now_ns() - time.perf_counter_ns())
 
+# ---------- Helpers ----------
 def _emit_if_ready():
     with lock:
         if got_flag["x"] and got_flag["y"] and got_flag["z"]:
             x, y, z = latest_vals["x"], latest_vals["y"], latest_vals["z"]
-            append_point(datetime.now().strftime("%H:%M:%S.%f")[:-3], x, y, z)
-            row = (_iso_now(), x, y, z)
+            t_ns = now_ns()
+            append_point(t_ns, x, y, z)
+            row = (t_ns, x, y, z)
             global buf_start
             with buf_lock:
                 if buf_start is None:
-                    buf_start = datetime.now()
+                    buf_start = t_ns
                 buf.append(row)
             got_flag.update({"x": False, "y": False, "z": False})
 
-def _append_annotation(stem: str, label=""):
-    first_write = not ANNOT_FILE.exists()
-    with ANNOT_FILE.open("a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if first_write:
-            w.writerow(["filename", "label"])
-        w.writerow([stem, label])
-
 def save_window(reason="auto"):
     with buf_lock:
         n = len(buf)
         if n < MIN_ROWS:
             return f"[{reason}] skipped: only {n} samples", None
-        rows = buf[:]
+        raw = buf[:]
         buf.clear()
-        global buf_start
+        global buf_start, next_seq
         buf_start = None
+        if next_seq is None:
+            next_seq = manifest.next_seq()
+        seq, next_seq = next_seq, next_seq + 1
 
-    seq = _seq_number()
     stamp = datetime.now().strftime("%Y%m%d%H%M%S")
     stem = f"{seq:03d}_{stamp}"
     base = DATA_DIR / stem
+    iso = format_ns((r[0] for r in raw), "%Y-%m-%dT%H:%M:%S")
+    rows = [(ts, *r[1:]) for ts, r in zip(iso, raw)]
 
     # CSV
     csv_path = base.with_suffix(".csv")
@@ -185,22 +141,19 @@ def save_window(reason="auto"):
     fig.add_scatter(x=ts, y=ys, mode="lines", name="Y")
     fig.add_scatter(x=ts, y=zs, mode="lines", name="Z")
     fig.update_layout(template="plotly_white", title=stem, margin=dict(l=40,r=20,t=40,b=40))
-    try:
-        png = base.with_suffix(".png")
-        fig.write_image(str(png))
-        art_path = png
-    except Exception:
-        html_path = base.with_suffix(".html")
-        fig.write_html(str(html_path))
-        art_path = html_path
+    art_path = base.with_suffix(".png")     # HTML instead if kaleido is missing
 
-    # Webcam
-    img = camera.snap(base)
+    # Manifest row (chart and image paths are filled in once written)
+    manifest.add_window(seq, stem, raw, (iso[0], iso[-1]), reason=reason, csv_path=csv_path)
 
-    # Annotation row
-    _append_annotation(stem)
+    # Webcam: frame nearest the last sample, JPEG written in the background
+    img = camera.snap(base, t_ns=raw[-1][0],
+                      on_saved=lambda path, _t: manifest.set_image(seq, path))
+    renderer.submit(fig, art_path, width=700, height=500, scale=1,
+                    on_done=lambda _kind, path: manifest.set_chart(seq, path))
 
-    msg = f"[{reason}] {len(rows)} rows saved as {csv_path.name}, chart={art_path.name}, img={'yes' if img else 'no'}"
+    msg = (f"[{reason}] {len(rows)} rows saved as {csv_path.name}, chart={art_path.name} (queued), "
+           f"img={'yes' if img else 'no'}")
     print(msg)
     return msg, img
 
@@ -238,7 +191,7 @@ def start_autosave():
             time.sleep(1)
             with buf_lock:
                 start, n = buf_start, len(buf)
-            if start and n > 0 and datetime.now() - start >= timedelta(seconds=WINDOW_DURATION):
+            if start and n > 0 and now_ns() - start >= WINDOW_DURATION * 1_000_000_000:
                 save_window("timer")
     th = threading.Thread(target=run, daemon=True)
     th.start()
@@ -262,28 +215,29 @@ def cb_peek(_i):
     with buf_lock:
         n, start = len(buf), buf_start
     if start:
-        elapsed = (datetime.now() - start).total_seconds()
+        elapsed = (now_ns() - start) / 1e9
         status = f"{n} rows buffered | {elapsed:.1f}s elapsed"
     else:
         status = f"{n} rows buffered"
+    status += f" | {renderer.status_text()}"
 
-    # newest jpg
-    try:
-        latest_img = max(DATA_DIR.glob("*.jpg"), key=lambda p: p.stat().st_mtime, default=None)
-    except Exception:
-        latest_img = None
-    if latest_img:
-        v = int(latest_img.stat().st_mtime)
-        src = f"/data2/{latest_img.name}?v={v}"
-    else:
-        src = no_update
+    # newest jpg (file names are unique per window, so no cache-busting needed)
+    latest_img = manifest.latest_image()
+    src = f"/data2/{latest_img}" if latest_img else no_update
     return status, src
 
 # ---------- Main ----------
 if __name__ == "__main__":
     print(f"[Init] Saving in {DATA_DIR}")
-    if not OPENCV_OK:
+    imported = manifest.backfill(DATA_DIR, ANNOT_FILE)
+    if imported:
+        print(f"[Init] Manifest: imported {imported} existing windows")
+    if not camera.start():
         print("[Note] OpenCV missing → webcam capture disabled")
+    renderer.start()
     start_cloud()
     start_autosave()
-    app.run(host=HOST, port=PORT, debug=False)
+    try:
+        app.run(host=HOST, port=PORT, debug=False)
+    finally:
+        camera.close()             # stops the grabber and unlinks its shared-memory segment
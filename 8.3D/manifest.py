@@ -0,0 +1,168 @@
+# manifest.py
+"""
+SIT225 Task 8.3D — SQLite manifest of saved capture windows.
+
+One row per window saved by capture.py: sequence number, time range, row
+count, per-axis min/max/mean/std, artifact paths (CSV, chart, webcam JPG)
+and a label. capture.py asks it for the next sequence number and the latest
+snapshot instead of globbing DATA_DIR, and labeling scripts can query or
+label windows directly:
+
+    m = Manifest(DATA_DIR / "manifest.db")
+    m.set_label("007_20250915103000", "walking")
+    for row in m.windows(unlabeled=True): ...
+
+The database runs in WAL mode so a labeling tool can read while capture.py
+keeps writing.
+"""
+
+import csv
+import re
+import sqlite3
+import statistics
+import threading
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS windows (
+    seq         INTEGER PRIMARY KEY,
+    stem        TEXT NOT NULL UNIQUE,
+    reason      TEXT,
+    t_start     TEXT,
+    t_end       TEXT,
+    t_start_ns  INTEGER,
+    t_end_ns    INTEGER,
+    n_rows      INTEGER,
+    x_min REAL, x_max REAL, x_mean REAL, x_std REAL,
+    y_min REAL, y_max REAL, y_mean REAL, y_std REAL,
+    z_min REAL, z_max REAL, z_mean REAL, z_std REAL,
+    csv_path    TEXT,
+    chart_path  TEXT,
+    image_path  TEXT,
+    label       TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS windows_with_image ON windows (seq) WHERE image_path IS NOT NULL;
+"""
+
+AXES = ("x", "y", "z")
+STEM_RE = re.compile(r"^(\d{3,})_(\d{14})$")
+
+
+def axis_stats(values):
+    """min, max, mean, std of the non-missing values (all None when empty)."""
+    vals = [v for v in values if v is not None]
+    if not vals:
+        return None, None, None, None
+    return min(vals), max(vals), statistics.fmean(vals), statistics.pstdev(vals)
+
+
+class Manifest:
+    """Thread-safe wrapper around the windows table."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    # ---------- Writes ----------
+    def add_window(self, seq, stem, rows, t_iso=(None, None), reason="auto",
+                   csv_path=None, chart_path=None, image_path=None, label=""):
+        """Record a saved window; rows are (t_ns, x, y, z)."""
+        stats = []
+        for i, _axis in enumerate(AXES, start=1):
+            stats.extend(axis_stats(r[i] for r in rows))
+        params = (seq, stem, reason, t_iso[0], t_iso[1],
+                  rows[0][0] if rows else None, rows[-1][0] if rows else None, len(rows),
+                  *stats, _name(csv_path), _name(chart_path), _name(image_path), label)
+        with self._lock, self._db:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO windows VALUES ({', '.join('?' * len(params))})", params)
+
+    def set_chart(self, seq, chart_path):
+        """Chart renders finish later (and may fall back to HTML)."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE windows SET chart_path = ? WHERE seq = ?", (_name(chart_path), seq))
+
+    def set_image(self, seq, image_path):
+        """Webcam JPGs are encoded in the background and recorded when written."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE windows SET image_path = ? WHERE seq = ?", (_name(image_path), seq))
+
+    def set_label(self, stem, label):
+        with self._lock, self._db:
+            cur = self._db.execute("UPDATE windows SET label = ? WHERE stem = ?", (label, stem))
+        return cur.rowcount > 0
+
+    # ---------- Lookups ----------
+    def next_seq(self):
+        # MAX over the INTEGER PRIMARY KEY is a single b-tree seek
+        with self._lock:
+            (last,) = self._db.execute("SELECT MAX(seq) FROM windows").fetchone()
+        return (last or 0) + 1
+
+    def latest_image(self):
+        """File name of the newest webcam snapshot, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT image_path FROM windows WHERE image_path IS NOT NULL ORDER BY seq DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def windows(self, unlabeled=False, limit=None):
+        sql = "SELECT * FROM windows"
+        if unlabeled:
+            sql += " WHERE label = ''"
+        sql += " ORDER BY seq"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(r) for r in self._db.execute(sql)]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM windows").fetchone()[0]
+
+    # ---------- Migration ----------
+    def backfill(self, data_dir: Path, annotations: Path = None):
+        """One-off import of windows saved before the manifest existed."""
+        if len(self):
+            return 0
+        data_dir = Path(data_dir)
+        labels = {}
+        if annotations and Path(annotations).exists():
+            with Path(annotations).open(newline="", encoding="utf-8") as f:
+                labels = {r["filename"]: r.get("label", "") for r in csv.DictReader(f)}
+        added = 0
+        for csv_file in sorted(data_dir.glob("*.csv")):
+            m = STEM_RE.match(csv_file.stem)
+            if not m:
+                continue
+            rows, t_iso = _read_window(csv_file)
+            chart = next((p for p in (csv_file.with_suffix(".png"), csv_file.with_suffix(".html")) if p.exists()), None)
+            image = csv_file.with_suffix(".jpg")
+            self.add_window(int(m.group(1)), csv_file.stem, rows, t_iso, reason="backfill",
+                            csv_path=csv_file, chart_path=chart,
+                            image_path=image if image.exists() else None,
+                            label=labels.get(csv_file.stem, ""))
+            added += 1
+        return added
+
+
+def _name(path):
+    # artifacts live next to the database; store file names only
+    return Path(path).name if path else None
+
+
+def _read_window(csv_file: Path):
+    rows, times = [], []
+    with csv_file.open(newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            try:
+                rows.append((None, *(float(r[a]) if r[a] else None for a in AXES)))
+            except (KeyError, ValueError):
+                continue
+            times.append(r.get("timestamp"))
+    return rows, (times[0], times[-1]) if times else (None, None)
@@ -5,34 +5,253 @@ Smooth real-time streaming in Plotly Dash (SIT225 Task 8.2C)
 This helper creates a Dash app that updates line graphs smoothly.
 Instead of redrawing entire figures, it appends new points in small chunks
 to mimic a "video frame" effect.
+
+transport="interval" polls the server with dcc.Interval (default);
+transport="sse" pushes new samples from a Server-Sent Events endpoint on
+app.server as they arrive, and the browser applies them with
+Plotly.extendTraces — no HTTP callbacks while nothing changes.
+
+Samples go into one append-only ring buffer shared by every viewer; each tab
+keeps its own read cursor (dcc.Store, or the SSE connection itself), so many
+tabs can watch the same stream without stealing samples from each other.
+
+assemble="client" makes the server send only the raw rows [[t, v1, ...], ...]
+into a dcc.Store; a clientside_callback turns them into extendData in the
+browser. Each row range is encoded to JSON once and the text is shared by
+every viewer reading it, so tabs in step do not each pay for serialization.
+
+encoding="binary" ships every channel as base64 float32 and time as base64
+float64 epoch milliseconds (Plotly's {dtype, bdata} typed-array format) on a
+date axis; add_sample() then takes epoch ms or a datetime as t. Times are
+shifted by the local UTC offset so the axis reads like json mode.
+
+clock_ns=True makes add_sample() take integer stamps from now_ns()
+(perf_counter_ns anchored to one epoch reading); they are formatted a batch
+at a time for json and scaled to epoch ms for binary, so the producer never
+formats a timestamp and samples stay ordered across NTP adjustments.
+
+RenderPool exports figures to PNG in warm worker processes: submit() returns
+immediately with a Future of (kind, path) and status() reports the backlog,
+so save paths never block on kaleido.
 """
 
-from collections import deque
-from threading import Lock
+import base64
+import json
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from threading import Condition, Lock
 from typing import List, Tuple
 
 import plotly.graph_objs as go
-from dash import Dash, dcc, html, Input, Output, no_update
+from dash import Dash, dcc, html, Input, Output, State, no_update
+from flask import Response
+from plotly.io.json import to_json_plotly
 
 
 class SharedBuffer:
-    """Thread-safe buffer to store incoming sensor samples."""
-    def __init__(self, n_channels: int):
-        self._queue: deque[Tuple] = deque()
+    """Thread-safe ring buffer of incoming sensor samples, read via cursors."""
+    def __init__(self, n_channels: int, capacity: int):
+        self._ring: List[Tuple] = [None] * capacity
+        self._pushed_at: List[float] = [0.0] * capacity   # perf_counter per slot
+        self._written = 0          # rows ever put; row k lives at _ring[k % capacity]
         self._lock = Lock()
+        self._ready = Condition(self._lock)
         self.n_channels = n_channels
+        self.stats = {"deliveries": 0, "samples": 0, "lag_ms": 0.0, "since": time.perf_counter()}
+
+    @property
+    def capacity(self):
+        return len(self._ring)
 
     def put(self, row: Tuple):
+        now = time.perf_counter()
+        with self._ready:
+            slot = self._written % self.capacity
+            self._ring[slot] = row
+            self._pushed_at[slot] = now
+            self._written += 1
+            self._ready.notify_all()
+
+    def tail_cursor(self, n: int):
+        """Cursor that replays the newest n rows (seed for a new viewer)."""
+        with self._lock:
+            return max(0, self._written - n)
+
+    def _read(self, cursor: int, max_items: int):
+        # caller holds the lock; readers that fell off the ring skip ahead
+        cap = self.capacity
+        cursor = max(cursor, self._written - cap, 0)
+        end = min(self._written, cursor + max_items)
+        lo = cursor % cap
+        hi = lo + (end - cursor)
+        if hi <= cap:       # contiguous in the ring: slice instead of per-row lookups
+            self._account(self._pushed_at[lo:hi])
+            return self._ring[lo:hi], end
+        hi -= cap
+        self._account(self._pushed_at[lo:] + self._pushed_at[:hi])
+        return self._ring[lo:] + self._ring[:hi], end
+
+    def get_batch(self, cursor: int, max_items: int):
+        """Retrieve up to max_items after cursor → (items, new_cursor, remaining)."""
         with self._lock:
-            self._queue.append(row)
+            items, cursor = self._read(cursor, max_items)
+            return items, cursor, self._written - cursor
+
+    def wait_batch(self, cursor: int, timeout: float = 15.0):
+        """Block until rows exist past cursor (or timeout) → (items, new_cursor)."""
+        with self._ready:
+            if cursor >= self._written:
+                self._ready.wait(timeout)
+            if cursor >= self._written:
+                return [], cursor
+            return self._read(cursor, self.capacity)
 
-    def get_batch(self, max_items: int):
-        """Retrieve up to max_items from the buffer."""
+    def _account(self, push_times):
+        # caller holds the lock
+        now = time.perf_counter()
+        self.stats["deliveries"] += 1
+        self.stats["samples"] += len(push_times)
+        self.stats["lag_ms"] += (now * len(push_times) - sum(push_times)) * 1000.0
+
+    def snapshot_stats(self):
         with self._lock:
-            items = []
-            for _ in range(min(len(self._queue), max_items)):
-                items.append(self._queue.popleft())
-            return items, len(self._queue)
+            s = dict(self.stats)
+        elapsed = max(time.perf_counter() - s.pop("since"), 1e-9)
+        s["deliveries_per_s"] = s["deliveries"] / elapsed
+        s["mean_lag_ms"] = s.pop("lag_ms") / s["samples"] if s["samples"] else 0.0
+        return s
+
+
+# --- Monotonic clock ---
+_EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+
+def now_ns() -> int:
+    """Epoch nanoseconds that only move forward (perf_counter_ns + one anchor)."""
+    return _EPOCH_NS + time.perf_counter_ns()
+
+
+def format_ns(stamps, fmt="%H:%M:%S", digits=3):
+    """Format a batch of epoch-ns stamps; strftime only once per second."""
+    out, last_sec, prefix = [], None, ""
+    scale = 10 ** (9 - digits)
+    for ns in stamps:
+        sec, frac = divmod(ns, 1_000_000_000)
+        if sec != last_sec:
+            last_sec, prefix = sec, time.strftime(fmt, time.localtime(sec))
+        out.append(f"{prefix}.{frac // scale:0{digits}d}")
+    return out
+
+
+def _split(rows):
+    """Rows of (t, v1, v2, ...) → (times, per-channel lists)."""
+    cols = list(zip(*rows))
+    return list(cols[0]), [list(c) for c in cols[1:]]
+
+
+def _typed(values, typecode):
+    """Numbers → Plotly typed-array spec (little-endian, base64)."""
+    arr = array(typecode, values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return {"dtype": "f8" if typecode == "d" else "f4",
+            "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+
+
+def _pack(rows):
+    """Rows of (t_ms, v1, v2, ...) → float64 local-time ms + float32 channel specs."""
+    cols = list(zip(*rows))
+    return {"t": _typed(_local_ms(cols[0]), "d"), "y": [_typed(c, "f") for c in cols[1:]]}
+
+
+def _local_ms(stamps):
+    # date axes treat epoch ms as UTC; shift by the local offset so binary
+    # batches show the same wall-clock time as format_ns() in json mode
+    shift = time.localtime(stamps[0] / 1000.0).tm_gmtoff * 1000.0
+    return [t + shift for t in stamps]
+
+
+def _epoch_ms(t):
+    if isinstance(t, (int, float)):
+        return t
+    if hasattr(t, "timestamp"):
+        return t.timestamp() * 1000.0
+    raise ValueError(f"encoding='binary' needs epoch ms or a datetime, got {t!r}")
+
+
+_DECODE_JS = """
+    const decode = function(spec) {
+        const raw = atob(spec.bdata);
+        const bytes = new Uint8Array(raw.length);
+        for (let i = 0; i < raw.length; i++) { bytes[i] = raw.charCodeAt(i); }
+        const typed = spec.dtype === "f8" ? new Float64Array(bytes.buffer) : new Float32Array(bytes.buffer);
+        return Array.from(typed);   // extendTraces nests a typed array inside a plain trace array
+    };
+"""
+
+_SSE_JS = """
+function(_id) {
+    if (window._streamSSE) { return window.dash_clientside.no_update; }
+""" + _DECODE_JS + """
+    const es = new EventSource(%(path)s);
+    window._streamSSE = es;
+    es.onmessage = function(ev) {
+        const b = JSON.parse(ev.data);
+        const gd = document.querySelector("#live-plot .js-plotly-plot");
+        if (!gd) { return; }
+        let x = b.x, y = b.y, traces = b.traces;
+        if (b.rows) {   // raw rows (assemble="client")
+            const t = b.rows.map(r => r[0]);
+            y = [];
+            for (let i = 1; i < b.rows[0].length; i++) { y.push(b.rows.map(r => r[i])); }
+            x = y.map(() => t);
+            traces = y.map((_, i) => i);
+        } else if (b.bin) {   // typed arrays (encoding="binary")
+            const t = decode(b.bin.t);
+            y = b.bin.y.map(decode);
+            x = y.map(() => t);
+            traces = y.map((_, i) => i);
+        }
+        Plotly.extendTraces(gd, {x: x, y: y}, traces, %(window)d);
+        document.getElementById("status").textContent =
+            "Added " + x[0].length + " samples | SSE lag=" + (Date.now() - b.sent_ms) + " ms";
+    };
+    return "sse";
+}
+"""
+
+_ASSEMBLE_JS = """
+function(batch) {
+    const nu = window.dash_clientside.no_update;
+    if (!batch) { return [nu, "Waiting for data... (buffer empty)"]; }
+    const rows = JSON.parse(batch.p);
+    const t = rows.map(r => r[0]);
+    const y = [];
+    for (let i = 1; i < rows[0].length; i++) { y.push(rows.map(r => r[i])); }
+    return [
+        [{x: y.map(() => t), y: y}, y.map((_, i) => i), %(window)d],
+        "Added " + rows.length + " samples | buffer=" + batch.remaining
+    ];
+}
+"""
+
+
+_BINARY_JS = """
+function(batch) {
+    const nu = window.dash_clientside.no_update;
+    if (!batch) { return [nu, "Waiting for data... (buffer empty)"]; }
+""" + _DECODE_JS + """
+    const gd = document.querySelector("#live-plot .js-plotly-plot");
+    const bin = JSON.parse(batch.p);
+    const t = decode(bin.t);
+    const y = bin.y.map(decode);
+    if (gd) { Plotly.extendTraces(gd, {x: y.map(() => t), y: y}, y.map((_, i) => i), %(window)d); }
+    return [nu, "Added " + t.length + " samples | buffer=" + batch.remaining];
+}
+"""
 
 
 def create_stream_app(
@@ -40,13 +259,29 @@ def create_stream_app(
     window_size: int = 500,
     batch_limit: int = 15,
     refresh_ms: int = 250,
+    transport: str = "interval",
+    sse_path: str = "/stream",
+    history: int = None,
+    assemble: str = "server",
+    encoding: str = "json",
+    clock_ns: bool = False,
 ):
     """
     Build and return a Dash app for smooth live plotting.
     Returns (app, state) where state["add_sample"](t, *values) can be used
-    to push new points into the graph.
+    to push new points into the graph. `history` sizes the shared ring
+    buffer (default 4 × window_size).
     """
-    buffer = SharedBuffer(len(channels))
+    if transport not in ("interval", "sse"):
+        raise ValueError(f"Unknown transport {transport!r} (use 'interval' or 'sse')")
+    if assemble not in ("server", "client"):
+        raise ValueError(f"Unknown assemble mode {assemble!r} (use 'server' or 'client')")
+    if encoding not in ("json", "binary"):
+        raise ValueError(f"Unknown encoding {encoding!r} (use 'json' or 'binary')")
+    if encoding == "binary":
+        assemble = "client"   # typed arrays are decoded in the browser
+    buffer = SharedBuffer(len(channels), max(history or 4 * window_size, window_size))
+    encoded = {}   # (first, stop) row range -> client payload JSON text
 
     # Initial blank figure
     fig = go.Figure()
@@ -62,6 +297,8 @@ def create_stream_app(
         legend=dict(orientation="h", y=1.05, x=1, xanchor="right"),
         uirevision="fixed",  # prevent reset on zoom/pan
     )
+    if encoding == "binary":
+        fig.update_xaxes(type="date")  # x is epoch milliseconds
 
     app = Dash(__name__)
     app.layout = html.Div(
@@ -70,44 +307,215 @@ def create_stream_app(
             html.H3("Live Data Stream (Smooth Updates)"),
             html.Div(id="status"),
             dcc.Graph(id="live-plot", figure=fig),
-            dcc.Interval(id="timer", interval=refresh_ms, n_intervals=0),
+            dcc.Interval(id="timer", interval=refresh_ms, n_intervals=0,
+                         disabled=transport != "interval"),
+            dcc.Store(id="transport"),
+            dcc.Store(id="cursor"),
+            dcc.Store(id="batch"),
         ],
     )
 
-    @app.callback(
-        Output("live-plot", "extendData"),
-        Output("status", "children"),
-        Input("timer", "n_intervals"),
-        prevent_initial_call=False,
-    )
-    def update(_):
-        rows, remaining = buffer.get_batch(batch_limit)
+    def stamped(rows):
+        # clock_ns + json: format the batch's ns stamps in one pass
+        if not (clock_ns and encoding == "json" and rows):
+            return rows
+        return [(t, *r[1:]) for t, r in zip(format_ns(r[0] for r in rows), rows)]
+
+    def next_rows(cursor):
+        if cursor is None:  # new tab: replay the current window first
+            rows, cursor, remaining = buffer.get_batch(buffer.tail_cursor(window_size), window_size)
+        else:
+            rows, cursor, remaining = buffer.get_batch(cursor, batch_limit)
+        return rows, cursor, remaining
+
+    def client_json(rows, stop):
+        # rows [first, stop) are immutable once written: encode once, reuse for every viewer
+        key = (stop - len(rows), stop)
+        text = encoded.get(key)
+        if text is None:
+            rows = stamped(rows)
+            text = to_json_plotly(_pack(rows) if encoding == "binary" else rows)
+            if len(encoded) >= 64:
+                encoded.clear()
+            encoded[key] = text
+        return text
+
+    def update(_, cursor):
+        rows, cursor, remaining = next_rows(cursor)
         if not rows:
-            return no_update, f"Waiting for data... (buffer empty)"
+            return no_update, f"Waiting for data... (buffer empty)", cursor
 
         # Split timestamps and channel values
-        times = [r[0] for r in rows]
-        per_channel = [[] for _ in range(buffer.n_channels)]
-        for _, *vals in rows:
-            for i, v in enumerate(vals):
-                per_channel[i].append(v)
+        times, per_channel = _split(stamped(rows))
 
         extend_dict = {"x": [times] * buffer.n_channels, "y": per_channel}
         indices = list(range(buffer.n_channels))
 
-        return (extend_dict, indices, window_size), f"Added {len(times)} samples | buffer={remaining}"
+        return (extend_dict, indices, window_size), f"Added {len(times)} samples | buffer={remaining}", cursor
+
+    def update_raw(_, cursor):
+        rows, cursor, remaining = next_rows(cursor)
+        if not rows:
+            return no_update, cursor
+        return {"p": client_json(rows, cursor), "remaining": remaining}, cursor
+
+    callback = update if assemble == "server" else update_raw
+    # SSE seeds the current window itself; a page-load poll would send it twice
+    if transport == "interval":
+        if assemble == "server":
+            outputs = [Output("live-plot", "extendData"), Output("status", "children")]
+        else:
+            outputs = [Output("batch", "data")]
+            app.clientside_callback(
+                (_BINARY_JS if encoding == "binary" else _ASSEMBLE_JS) % {"window": window_size},
+                Output("live-plot", "extendData"),
+                Output("status", "children"),
+                Input("batch", "data"),
+            )
+        app.callback(
+            *outputs,
+            Output("cursor", "data"),
+            Input("timer", "n_intervals"),
+            State("cursor", "data"),
+            prevent_initial_call=False,
+        )(callback)
+
+    if transport == "sse":
+        @app.server.route(sse_path)
+        def sse_stream():
+            cursor = buffer.tail_cursor(window_size)
+
+            def events():
+                nonlocal cursor
+                yield ": connected\n\n"   # flush headers to the browser right away
+                while True:
+                    rows, cursor = buffer.wait_batch(cursor)
+                    if not rows:
+                        yield ": keep-alive\n\n"
+                        continue
+                    sent_ms = int(time.time() * 1000)
+                    if assemble == "client":
+                        key = "bin" if encoding == "binary" else "rows"
+                        yield f'data: {{"{key}": {client_json(rows, cursor)}, "sent_ms": {sent_ms}}}\n\n'
+                        continue
+                    times, per_channel = _split(stamped(rows))
+                    payload = {
+                        "x": [times] * buffer.n_channels,
+                        "y": per_channel,
+                        "traces": list(range(buffer.n_channels)),
+                        "sent_ms": sent_ms,
+                    }
+                    yield f"data: {json.dumps(payload)}\n\n"
+
+            return Response(events(), mimetype="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+        app.clientside_callback(
+            _SSE_JS % {"path": json.dumps(sse_path), "window": window_size},
+            Output("transport", "data"),
+            Input("live-plot", "id"),
+        )
 
     # External API for producers
     def add_sample(t, *values):
         if len(values) != buffer.n_channels:
             raise ValueError(f"Expected {buffer.n_channels} values, got {len(values)}")
+        if encoding == "binary":
+            t = t / 1e6 if clock_ns else _epoch_ms(t)
         buffer.put((t, *values))
 
     state = {
         "add_sample": add_sample,
+        "stats": buffer.snapshot_stats,
+        "update": callback,
         "channels": channels,
         "window_size": window_size,
         "batch_limit": batch_limit,
         "refresh_ms": refresh_ms,
+        "transport": transport,
+        "history": buffer.capacity,
+        "assemble": assemble,
+        "encoding": encoding,
+        "clock_ns": clock_ns,
     }
     return app, state
+
+
+# --- Background PNG export ---
+def _warm_renderer():
+    # Runs once in each worker: pay kaleido's start-up before the first real job
+    try:
+        go.Figure().to_image(format="png", width=16, height=16)
+    except Exception:
+        pass    # no kaleido → jobs fall back to HTML
+
+
+def _render_job(spec, png_path, width, height, scale):
+    import plotly.io as pio
+    try:
+        pio.write_image(spec, png_path, width=width, height=height, scale=scale)
+        return "png", png_path
+    except Exception:
+        html_path = str(Path(png_path).with_suffix(".html"))
+        pio.write_html(spec, html_path, include_plotlyjs="cdn")
+        return "html", html_path
+
+
+class RenderPool:
+    """
+    Writes figure PNGs in warm worker processes so Dash callbacks and save
+    threads never wait on kaleido. submit() queues a figure and returns a
+    Future of (kind, path); status() reports the backlog.
+    """
+
+    def __init__(self, workers: int = 1):
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_renderer)
+        self._lock = Lock()
+        self.stats = {"queued": 0, "done": 0, "failed": 0, "render_s": 0.0, "last": None}
+
+    def start(self):
+        # Launch and warm the workers before the first save. Called from the
+        # script's main block, not at import, so spawn-based platforms don't
+        # start processes while the main module is being re-imported.
+        self._pool.submit(int)
+        return self
+
+    def submit(self, fig, png_path, width=1200, height=500, scale=2, on_done=None):
+        spec = fig.to_dict() if hasattr(fig, "to_dict") else fig
+        with self._lock:
+            self.stats["queued"] += 1
+        t0 = time.perf_counter()
+        future = self._pool.submit(_render_job, spec, str(png_path), width, height, scale)
+
+        def _finished(f):
+            try:
+                kind, path = f.result()
+            except Exception as exc:
+                with self._lock:
+                    self.stats["failed"] += 1
+                print(f"[Render] {Path(png_path).name} failed: {exc}")
+                return
+            with self._lock:
+                self.stats["done"] += 1
+                self.stats["render_s"] += time.perf_counter() - t0
+                self.stats["last"] = Path(path).name
+            if on_done:
+                on_done(kind, Path(path))
+
+        future.add_done_callback(_finished)
+        return future
+
+    def status(self):
+        with self._lock:
+            s = dict(self.stats)
+        finished = s["done"] + s["failed"]
+        s["backlog"] = s["queued"] - finished
+        s["mean_render_s"] = s.pop("render_s") / s["done"] if s["done"] else 0.0
+        return s
+
+    def status_text(self):
+        s = self.status()
+        return f"render backlog={s['backlog']} last={s['last'] or '—'}"
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,179 @@
+# sparkline.py
+"""
+SIT225 Task 8.3D — Fast cached thumbnails of recorded windows.
+
+Draws X/Y/Z sparklines straight from NumPy arrays into small PNGs: no Plotly
+figure and no kaleido. Each pixel column gets the min..max of the samples
+that fall into it (so spikes survive decimation) and is joined to the
+previous column. PNGs are written with zlib and cached on disk under a key
+built from the source path, mtime and size, so a gallery of hundreds of
+windows only re-renders files that changed.
+
+Usage:
+    python sparkline.py Diagram                       # thumbnails for every CSV
+    python sparkline.py Diagram ../Week8/plots ../8.2C/data_2 --gallery gallery.html
+    python sparkline.py Diagram --size 240x64
+
+From code:
+    from sparkline import thumbnail
+    png_path = thumbnail(Path("Diagram/001_20250919181558.csv"))
+"""
+
+import argparse
+import hashlib
+import html
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+SIZE = (160, 48)                      # width, height in pixels
+COLORS = np.array([(99, 110, 250), (239, 85, 59), (0, 204, 150)], dtype=np.uint8)   # Plotly X/Y/Z
+BACKGROUND = 255
+CACHE_DIRNAME = ".thumbs"
+RENDER_VERSION = 1                    # bump to invalidate every cached thumbnail
+
+
+def read_window(csv_path: Path):
+    """Numeric columns of a window CSV → float array (n_rows, n_channels), NaN for blanks."""
+    with csv_path.open(encoding="utf-8") as f:
+        header = f.readline().strip().split(",")
+        cols = [i for i, name in enumerate(header) if name.strip().lower() not in ("timestamp", "time", "sample")]
+        lines = [ln for ln in f.read().splitlines() if ln]
+    if not lines or not cols:
+        return np.empty((0, len(cols)))
+    cells = [ln.split(",") for ln in lines]
+    out = np.full((len(cells), len(cols)), np.nan)
+    for j, c in enumerate(cols):
+        col = [row[c] if c < len(row) else "" for row in cells]
+        out[:, j] = np.array([v if v.strip() else "nan" for v in col], dtype=float)
+    return out
+
+
+def _spans(values, width, height, lo, hi):
+    """Per pixel column (top, bottom) rows covering the samples in it, joined to the previous column."""
+    idx = np.flatnonzero(~np.isnan(values))
+    if idx.size == 0:
+        return None
+    v = values[idx]
+    rows = ((hi - v) / (hi - lo) * (height - 1)).round().astype(int) if hi > lo else np.full(v.size, height // 2)
+    n = values.size
+    xs = np.minimum((idx * width) // max(n, 1), width - 1)
+    if n < width:   # fewer samples than pixels: interpolate to every column
+        xs_full = np.arange(width)
+        pos = idx * (width - 1) / max(n - 1, 1)
+        col = np.interp(xs_full, pos, rows).round().astype(int)
+        top, bot, last = col.copy(), col.copy(), col
+    else:
+        starts = np.searchsorted(xs, np.arange(width))
+        starts = np.minimum(starts, rows.size - 1)
+        top = np.minimum.reduceat(rows, starts)
+        bot = np.maximum.reduceat(rows, starts)
+        ends = np.r_[starts[1:], rows.size] - 1
+        last = rows[np.maximum(ends, starts)]
+    prev = np.r_[last[0], last[:-1]]
+    return np.minimum(top, prev), np.maximum(bot, prev)
+
+
+def render(data, size=SIZE):
+    """(n, channels) array → RGB image (height, width, 3) uint8."""
+    width, height = size
+    img = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+    if data.size == 0 or np.isnan(data).all():
+        return img
+    lo, hi = np.nanmin(data), np.nanmax(data)
+    pad = (hi - lo) * 0.05
+    lo, hi = lo - pad, hi + pad
+    rows = np.arange(height)[:, None]
+    for ch in range(data.shape[1]):
+        spans = _spans(data[:, ch], width, height, lo, hi)
+        if spans is None:
+            continue
+        top, bot = spans
+        img[(rows >= top) & (rows <= bot)] = COLORS[ch % len(COLORS)]
+    return img
+
+
+def encode_png(img):
+    """RGB uint8 array → PNG bytes (filter 0 on every row, zlib level 6)."""
+    height, width, _ = img.shape
+    raw = np.hstack([np.zeros((height, 1), np.uint8), img.reshape(height, width * 3)]).tobytes()
+
+    def chunk(tag, body):
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 6))
+            + chunk(b"IEND", b""))
+
+
+def cache_key(csv_path: Path, size=SIZE):
+    st = csv_path.stat()
+    ident = f"{csv_path.resolve()}|{st.st_mtime_ns}|{st.st_size}|{size[0]}x{size[1]}|v{RENDER_VERSION}"
+    return hashlib.blake2b(ident.encode(), digest_size=8).hexdigest()
+
+
+def thumbnail(csv_path: Path, size=SIZE, cache_dir: Path = None):
+    """Path of the cached PNG for csv_path, rendering it only if the source changed."""
+    return _thumbnail(csv_path, size, cache_dir)[0]
+
+
+def _thumbnail(csv_path, size, cache_dir):
+    csv_path = Path(csv_path)
+    cache_dir = Path(cache_dir) if cache_dir else csv_path.parent / CACHE_DIRNAME
+    png = cache_dir / f"{csv_path.stem}-{cache_key(csv_path, size)}.png"
+    if png.exists():
+        return png, True
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cache_dir.glob(f"{csv_path.stem}-*.png"):
+        stale.unlink()
+    png.write_bytes(encode_png(render(read_window(csv_path), size)))
+    return png, False
+
+
+def write_gallery(items, out: Path):
+    """One HTML page of (source csv, png) thumbnails, linked relative to `out`."""
+    cells = "\n".join(
+        f'<figure><img src="{html.escape(Path(os.path.relpath(png, out.parent)).as_posix())}">'
+        f"<figcaption>{html.escape(src.name)}</figcaption></figure>"
+        for src, png in items
+    )
+    out.write_text(
+        "<!doctype html><meta charset='utf-8'><title>Recorded windows</title>"
+        "<style>body{font-family:system-ui;display:flex;flex-wrap:wrap;gap:8px}"
+        "figure{margin:0;font-size:11px}img{border:1px solid #ddd;display:block}</style>\n"
+        + cells, encoding="utf-8")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cached sparkline thumbnails for window CSVs")
+    ap.add_argument("paths", nargs="+", type=Path, help="CSV files or folders of CSVs")
+    ap.add_argument("--size", default=f"{SIZE[0]}x{SIZE[1]}", help="WIDTHxHEIGHT in pixels")
+    ap.add_argument("--gallery", type=Path, help="also write an HTML page with every thumbnail")
+    args = ap.parse_args()
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    sources = []
+    for p in args.paths:
+        sources.extend(sorted(p.glob("*.csv")) if p.is_dir() else [p])
+
+    t0 = time.perf_counter()
+    items, hits = [], 0
+    for src in sources:
+        png, cached = _thumbnail(src, size, None)
+        hits += cached
+        items.append((src, png))
+    elapsed = time.perf_counter() - t0
+    print(f"[Thumbs] {len(items)} windows ({hits} cached, {len(items) - hits} rendered) in {elapsed * 1000:.0f} ms")
+
+    if args.gallery:
+        write_gallery(items, args.gallery)
+        print(f"[Thumbs] Gallery -> {args.gallery}")
+
+
+if __name__ == "__main__":
+    main()
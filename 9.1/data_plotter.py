@@ -1,75 +1,41 @@
+from pathlib import Path
+
 import pandas as pd
 import matplotlib.pyplot as plt
-from io import StringIO
 import numpy as np
 
+from eventindex import EventIndex
+
 # 1. DATA INPUT
-# The provided data is stored as a multi-line string.
-data = """Timestamp,Linear Acceleration,Crash Status
-2025-09-26 16:57:56,8.67,Normal
-2025-09-26 16:57:57,8.23,Normal
-2025-09-26 16:57:58,9.31,Normal
-2025-09-26 16:57:59,5.62,Normal
-2025-09-26 16:58:00,5.81,Normal
-2025-09-26 16:58:01,5.38,Normal
-2025-09-26 16:58:02,7.16,Normal
-2025-09-26 16:58:03,5.45,Normal
-2025-09-26 16:58:04,7.28,Normal
-2025-09-26 16:58:05,6.41,Normal
-2025-09-26 16:58:06,9.42,Normal
-2025-09-26 16:58:07,7.8,Normal
-2025-09-26 16:58:08,6.91,Normal
-2025-09-26 16:58:09,9.94,Normal
-2025-09-26 16:58:10,6.71,Normal
-2025-09-26 16:58:11,5.59,Normal
-2025-09-26 16:58:12,14.59,Sudden Movement
-2025-09-26 16:58:13,5.94,Normal
-2025-09-26 16:58:14,5.52,Normal
-2025-09-26 16:58:15,5.14,Normal
-2025-09-26 16:58:16,8.18,Normal
-2025-09-26 16:58:17,5.2,Normal
-2025-09-26 16:58:18,6.44,Normal
-2025-09-26 16:58:19,24.02,Crash Detected
-2025-09-26 16:58:20,6.96,Normal
-2025-09-26 16:58:21,13.83,Sudden Movement
-2025-09-26 16:58:22,9.84,Normal
-2025-09-26 16:58:23,6.65,Normal
-2025-09-26 16:58:24,5.43,Normal
-2025-09-26 16:58:25,6.79,Normal
-2025-09-26 16:58:26,6.28,Normal
-2025-09-26 16:58:27,9.42,Normal
-2025-09-26 16:58:28,9.21,Normal
-2025-09-26 16:58:29,9.11,Normal
-2025-09-26 16:58:30,7.13,Normal
-2025-09-26 16:58:31,8.2,Normal
-2025-09-26 16:58:32,7.49,Normal
-2025-09-26 16:58:33,5.4,Normal
-2025-09-26 16:58:34,6.49,Normal
-2025-09-26 16:58:35,9.81,Normal
-2025-09-26 16:58:36,18.27,Sudden Movement
-2025-09-26 16:58:37,8.86,Normal
-2025-09-26 16:58:38,6.2,Normal
-2025-09-26 16:58:39,9.24,Normal
-2025-09-26 16:58:40,21.81,Crash Detected
-2025-09-26 16:58:41,27.86,Crash Detected
-2025-09-26 16:58:42,8.92,Normal
-2025-09-26 16:58:43,5.47,Normal
-2025-09-26 16:58:44,8.05,Normal
-2025-09-26 16:58:45,8.44,Normal
-2025-09-26 16:58:46,6.63,Normal
-2025-09-26 16:58:47,7.84,Normal
-2025-09-26 16:58:48,7.13,Normal
-2025-09-26 16:58:49,8.18,Normal
-2025-09-26 16:58:50,6.98,Normal
-2025-09-26 16:58:51,5.8,Normal
-2025-09-26 16:58:52,6.09,Normal
-2025-09-26 16:58:53,8.86,Normal
-2025-09-26 16:58:54,6.34,Normal
-2025-09-26 16:58:55,8.86,Normal
-"""
-
-# Read the data into a DataFrame and parse the Timestamp column
-df = pd.read_csv(StringIO(data), parse_dates=['Timestamp'])
+# crashdata.csv (the same 60 rows that used to be pasted here) or any longer crash log.
+# The event index is built once per file and saved next to it (crashdata.events.npz).
+CSV_FILE = Path(__file__).with_name('crashdata.csv')
+VIEW = None              # (first_row, stop_row) to plot; None = the whole file
+FOCUS = None             # e.g. ('Crash Detected', 0): centre the view on the first crash
+CONTEXT = 30             # rows either side of a focused event
+MARKER_LIMIT = 2000      # draw a marker per Normal row only when the view is this short
+
+index = EventIndex.for_csv(CSV_FILE)
+for status in index.categories:
+    print(f"[Index] {status}: {index.count(status)} events")
+
+if FOCUS is not None:
+    # binary search in the index: no pass over the rows
+    status, nth = FOCUS
+    starts, ends, _ = index.runs.get(status, ((), (), ()))
+    if nth < len(starts):
+        VIEW = (max(0, starts[nth] - CONTEXT), ends[nth] + CONTEXT)
+lo, hi = VIEW or (0, index.rows)
+hi = min(hi, index.rows)
+
+# Only the rows in view are read; the Timestamp column is parsed for those alone
+df = pd.read_csv(CSV_FILE, skiprows=range(1, lo + 1), nrows=hi - lo, parse_dates=['Timestamp'])
+df.index = np.arange(lo, lo + len(df))
+
+# Neighbouring events outside the view, for choosing the next VIEW / FOCUS
+for status in index.categories:
+    before, after = index.prev(status, lo), index.next(status, hi - 1)
+    print(f"[Index] {status}: previous run at row {before and before[0]}, next at row {after and after[0]}")
 
 # 2. PLOTTING SETUP
 plt.figure(figsize=(16, 7))
@@ -92,9 +58,19 @@ markers = {
 # Plot the linear acceleration as a simple line for the overall trend
 plt.plot(df['Timestamp'], df['Linear Acceleration'], color='lightgray', linestyle='-', linewidth=1, zorder=1)
 
-# Plot the scatter points, colored by 'Crash Status'
+# Plot the scatter points, colored by 'Crash Status'. Event rows come from the index
+# (runs overlapping the view), so a long log is not rescanned once per status.
 for status, color in colors.items():
-    subset = df[df['Crash Status'] == status]
+    if status == 'Normal':
+        if len(df) > MARKER_LIMIT:
+            continue
+        rows = df.index[df['Crash Status'] == status]
+    else:
+        starts, ends, _ = index.in_view(status, lo, hi)
+        if not len(starts):
+            continue
+        rows = np.concatenate([np.arange(max(s, lo), min(e, hi)) for s, e in zip(starts, ends)])
+    subset = df.loc[rows]
     plt.scatter(
         subset['Timestamp'],
         subset['Linear Acceleration'],
@@ -0,0 +1,146 @@
+# eventindex.py
+"""
+SIT225 Task 9.1 — Event index for long crash logs.
+
+A crash log is mostly "Normal" rows with short runs of "Sudden Movement" and
+"Crash Detected". EventIndex run-length encodes the status column once
+(vectorised: one comparison of neighbouring rows) and keeps, per category,
+the sorted row offsets where its runs start and end (end exclusive) and the
+peak value in each run. Every lookup is then a binary search:
+
+    idx = EventIndex.for_csv(Path("crashdata.csv"))
+    idx.next("Crash Detected", row)          # first run starting after row, or None
+    idx.prev("Crash Detected", row)          # last run starting before row
+    idx.in_view("Sudden Movement", lo, hi)   # (starts, ends, peaks) overlapping [lo, hi)
+
+The index is saved as <name>.events.npz next to the CSV together with the
+CSV's size and mtime, and rebuilt when the CSV changes.
+"""
+
+import json
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STATUS_COLUMN = "Crash Status"
+VALUE_COLUMN = "Linear Acceleration"
+BACKGROUND = "Normal"              # not indexed: everything that is not an event
+INDEX_VERSION = 1
+
+
+class EventIndex:
+    def __init__(self, rows=0):
+        self.rows = rows
+        self.runs = {}             # category -> (starts, ends, peaks), sorted by start
+
+    @classmethod
+    def build(cls, status, values=None, background=BACKGROUND):
+        """Index a status array; values gives each run's peak (NaN without it)."""
+        codes, names = pd.factorize(np.asarray(status))   # ints compare much faster than strings
+        idx = cls(codes.size)
+        if not codes.size:
+            return idx
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], codes.size]
+        if values is not None:
+            v = np.asarray(values, dtype=float)
+            with np.errstate(invalid="ignore"):
+                peaks = np.fmax.reduceat(v, starts)
+        else:
+            peaks = np.full(starts.size, np.nan)
+        labels = codes[starts]
+        for code, name in enumerate(names):
+            if name == background:
+                continue
+            keep = labels == code
+            idx.runs[str(name)] = (starts[keep], ends[keep], peaks[keep])
+        return idx
+
+    @property
+    def categories(self):
+        return list(self.runs)
+
+    def count(self, category):
+        return self.runs[category][0].size if category in self.runs else 0
+
+    # ---------- Navigation ----------
+    def next(self, category, row):
+        """(start, end) of the first run of category starting after `row`, or None."""
+        if category not in self.runs:
+            return None
+        starts, ends, _ = self.runs[category]
+        i = np.searchsorted(starts, row, side="right")
+        return (int(starts[i]), int(ends[i])) if i < starts.size else None
+
+    def prev(self, category, row):
+        """(start, end) of the last run of category starting before `row`, or None."""
+        if category not in self.runs:
+            return None
+        starts, ends, _ = self.runs[category]
+        i = np.searchsorted(starts, row, side="left") - 1
+        return (int(starts[i]), int(ends[i])) if i >= 0 else None
+
+    def in_view(self, category, lo, hi):
+        """(starts, ends, peaks) of the runs of category overlapping rows [lo, hi)."""
+        if category not in self.runs:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+        starts, ends, peaks = self.runs[category]
+        i0 = np.searchsorted(ends, lo, side="right")      # runs are disjoint: ends are sorted too
+        i1 = np.searchsorted(starts, hi, side="left")
+        return starts[i0:i1], ends[i0:i1], peaks[i0:i1]
+
+    # ---------- Persistence ----------
+    def save(self, path: Path, key=None):
+        names = list(self.runs)
+        meta = {"rows": self.rows, "categories": names, "key": key, "version": INDEX_VERSION}
+        arrays = {"meta": np.array(json.dumps(meta))}
+        for i, name in enumerate(names):
+            for part, a in zip(("starts", "ends", "peaks"), self.runs[name]):
+                arrays[f"r{i}_{part}"] = a
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, key=None):
+        """Saved index, or None if missing, unreadable or saved for another version of the CSV."""
+        try:
+            with np.load(path) as z:
+                meta = json.loads(str(z["meta"]))
+                if meta.get("version") != INDEX_VERSION or meta.get("key") != key:
+                    return None
+                idx = cls(meta["rows"])
+                for i, name in enumerate(meta["categories"]):
+                    idx.runs[name] = tuple(z[f"r{i}_{part}"] for part in ("starts", "ends", "peaks"))
+            return idx
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):   # truncated or corrupt .npz
+            return None
+
+    @classmethod
+    def for_csv(cls, csv_path: Path, status_column=STATUS_COLUMN, value_column=VALUE_COLUMN):
+        """Load the index saved next to csv_path, or build it from the CSV and save it."""
+        csv_path = Path(csv_path)
+        st = csv_path.stat()
+        key = [st.st_size, st.st_mtime_ns, status_column, value_column]
+        sidecar = index_path(csv_path)
+        idx = cls.load(sidecar, key)
+        if idx is not None:
+            return idx
+        header = pd.read_csv(csv_path, nrows=0).columns
+        usecols = [c for c in (status_column, value_column) if c in header]
+        df = pd.read_csv(csv_path, usecols=usecols)
+        idx = cls.build(df[status_column].fillna(BACKGROUND).to_numpy(),
+                        df[value_column].to_numpy() if value_column in df.columns else None)
+        try:
+            idx.save(sidecar, key)
+        except OSError:
+            pass                   # read-only folder: rebuilt next time
+        return idx
+
+
+def index_path(csv_path: Path):
+    return csv_path.with_name(f"{csv_path.stem}.events.npz")
@@ -0,0 +1,280 @@
+# sensorgen.py
+"""
+SIT225 Task 9.1 — Synthetic accelerometer / gyro data at any volume.
+
+Formerly csv.py: 100 rows of random.uniform with time.sleep(0.1) in between
+(and, named csv.py, it shadowed the csv module for anything run in this
+folder, pandas included). SensorSim now makes whole blocks with NumPy:
+
+    sensor noise      normal, per axis
+    gravity offset    on z for the accelerometer (1 g, as IMU.readAcceleration)
+    drift             per-axis bias random walk, carried between blocks
+    events            Poisson arrivals of "Sudden Movement" and "Crash Detected"
+                      bursts along a random direction, with ground-truth labels
+
+and writes them as any of the project's CSV schemas (SCHEMAS) by building
+the text in NumPy byte arrays, or hands blocks to a callback at a target
+rate:
+
+    sim = SensorSim("accel", rate_hz=1000, seed=1)
+    block = sim.block(1_000_000)          # dict of arrays + "events" ground truth
+    write_csv(Path("big.csv"), block, "accel")
+    stream(sim, callback, seconds=10)     # paced, live
+
+Usage:
+    python sensorgen.py --schema accel --rows 5000000 --out big_accel.csv
+    python sensorgen.py --schema gyro --rows 200000 --rate 100 --out gyro_data_test.csv
+    python sensorgen.py --schema crash --rows 100 --rate 10 --live     # the old behaviour
+"""
+
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+NORMAL, SUDDEN, CRASH = 0, 1, 2
+STATUS = np.array([b"Normal", b"Sudden Movement", b"Crash Detected"])
+
+SCHEMAS = {
+    "accel": ("timestamp", "x", "y", "z"),                                   # Week8, 8.3D/Diagram
+    "gyro": ("sample", "timestamp", "gyro_x", "gyro_y", "gyro_z"),           # 6.2 writer.py chunks
+    "crash": ("Timestamp", "X", "Y", "Z", "Linear Acceleration", "Crash Status"),   # what csv.py wrote
+    "crashdata": ("Timestamp", "Linear Acceleration", "Crash Status"),       # crashdata.csv
+}
+
+# per kind: noise sd, drift (sd per sqrt(second)), gravity on z, event peak ranges (sudden, crash)
+KINDS = {
+    "accel": dict(noise=0.02, drift=0.002, gravity=1.0, peaks=((11.0, 15.0), (25.0, 40.0))),
+    "gyro": dict(noise=0.5, drift=0.05, gravity=0.0, peaks=((150.0, 400.0), (600.0, 1500.0))),
+}
+EVENT_MS = ((80, 250), (30, 120))        # burst length ranges: sudden movements last longer than impacts
+DECIMALS = 4
+
+
+class SensorSim:
+    def __init__(self, kind="accel", rate_hz=1000.0, seed=None, events_per_min=6.0, crash_share=0.3,
+                 start=None, **overrides):
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {sorted(KINDS)}")
+        self.kind = kind
+        self.rate_hz = float(rate_hz)
+        self.params = dict(KINDS[kind], **overrides)
+        self.events_per_min = events_per_min
+        self.crash_share = crash_share
+        self.rng = np.random.default_rng(seed)
+        self.start = np.datetime64(start or datetime.now(), "ns")
+        self.count = 0                       # samples generated so far
+        self.bias = np.zeros(3)
+        self._pending = []                   # bursts that run past the end of the last block
+
+    def _new_events(self, n):
+        """Bursts starting in the next n samples: (start, length, label, peak, unit direction)."""
+        expected = self.events_per_min * n / self.rate_hz / 60.0
+        k = self.rng.poisson(expected)
+        starts = np.sort(self.rng.integers(self.count, self.count + n, size=k))
+        out = []
+        for s in starts:
+            label = CRASH if self.rng.random() < self.crash_share else SUDDEN
+            lo_ms, hi_ms = EVENT_MS[label - 1]
+            length = max(3, int(self.rng.uniform(lo_ms, hi_ms) * self.rate_hz / 1000))
+            peak = self.rng.uniform(*self.params["peaks"][label - 1])
+            direction = self.rng.normal(size=3)
+            out.append((int(s), length, label, peak, direction / np.linalg.norm(direction)))
+        return out
+
+    def block(self, n):
+        """Next n samples as {"t", "sample", "rate_hz", "x", "y", "z", "mag", "label", "events"}."""
+        p = self.params
+        lo = self.count
+        noise = self.rng.normal(0.0, p["noise"], size=(n, 3))
+        steps = self.rng.normal(0.0, p["drift"] / np.sqrt(self.rate_hz), size=(n, 3))
+        drift = self.bias + np.cumsum(steps, axis=0)
+        self.bias = drift[-1].copy()
+        xyz = noise + drift
+        xyz[:, 2] += p["gravity"]
+        label = np.zeros(n, dtype=np.int8)
+
+        fresh = self._new_events(n)
+        carry = []
+        for s, length, lab, peak, direction in self._pending + fresh:
+            a, b = max(s, lo), min(s + length, lo + n)
+            if a < b:
+                shape = np.sin(np.pi * (np.arange(a, b) - s + 0.5) / length)       # half-sine burst
+                xyz[a - lo:b - lo] += (peak * shape)[:, None] * direction
+                label[a - lo:b - lo] = np.maximum(label[a - lo:b - lo], lab)
+            if s + length > lo + n:
+                carry.append((s, length, lab, peak, direction))
+        self._pending = carry
+
+        sample = np.arange(lo, lo + n)
+        t = self.start + (sample * (1e9 / self.rate_hz)).astype("timedelta64[ns]")
+        self.count += n
+        x, y, z = xyz.T
+        return {"t": t, "sample": sample, "rate_hz": self.rate_hz, "x": x, "y": y, "z": z,
+                "mag": np.sqrt(x * x + y * y + z * z), "label": label,
+                "events": [(s, s + length, STATUS[lab].decode(), peak) for s, length, lab, peak, _ in fresh]}
+
+
+# ---------- CSV text in NumPy ----------
+def _fixed(values, decimals):
+    """Floats → (n, width) uint8 text, "-12.3456" style; 0 bytes are padding (removed on join)."""
+    v = np.asarray(values, dtype=float)
+    ok = np.isfinite(v)
+    scaled = np.rint(np.abs(np.where(ok, v, 0.0)) * 10 ** decimals).astype(np.int64)
+    int_digits = len(str(int(scaled.max()) // 10 ** decimals)) if scaled.size else 1
+    width = 1 + int_digits + (decimals + 1 if decimals else 0)
+    out = np.empty((v.size, width), dtype=np.uint8)
+    rest = scaled
+    col = width - 1
+    for j in range(decimals + int_digits):       # digits right to left
+        rest, digit = np.divmod(rest, 10)
+        out[:, col] = digit
+        out[:, col] += 48
+        if j >= decimals + 1:                     # no leading zeros in the integer part
+            out[:, col] *= (rest > 0) | (digit > 0)
+        col -= 1
+        if decimals and j == decimals - 1:
+            out[:, col] = 46                      # "."
+            col -= 1
+    out[:, 0] = np.where((v < 0) & (scaled > 0), 45, 0)   # "-"
+    out[~ok] = 0
+    return out
+
+
+def _stamps(t, unit):
+    """datetime64 → (n, width) uint8 "YYYY-mm-dd HH:MM:SS[.fff]" (space, like the loggers)."""
+    ns = t.astype("datetime64[ns]").astype(np.int64)
+    day, tod = np.divmod(ns, 86_400_000_000_000)
+    days, inverse = np.unique(day, return_inverse=True)     # a handful of dates: format those only
+    dates = np.datetime_as_string(days.astype("datetime64[D]"), unit="D").astype("S10")
+    ms = tod // 1_000_000
+    out = np.full((ns.size, 23 if unit == "ms" else 19), 0, dtype=np.uint8)
+    out[:, :10] = dates.view(np.uint8).reshape(-1, 10)[inverse]
+    out[:, 10] = ord(" ")
+    out[:, 13] = out[:, 16] = ord(":")
+    for col, value in ((11, ms // 3_600_000), (14, ms // 60_000 % 60), (17, ms // 1000 % 60)):
+        out[:, col] = value // 10 + 48
+        out[:, col + 1] = value % 10 + 48
+    if unit == "ms":
+        frac = ms % 1000
+        out[:, 19] = ord(".")
+        out[:, 20], out[:, 21], out[:, 22] = frac // 100 + 48, frac // 10 % 10 + 48, frac % 10 + 48
+    return out
+
+
+def _fields(block, schema, decimals, unit):
+    n = block["sample"].size
+    columns = {
+        "timestamp": lambda: _stamps(block["t"], unit),
+        "sample": lambda: _fixed(block["sample"], 0),
+        "linear acceleration": lambda: _fixed(block["mag"], 2),
+        "crash status": lambda: STATUS.astype("S15")[block["label"]].view(np.uint8).reshape(n, -1),
+    }
+    fields = []
+    for name in SCHEMAS[schema]:
+        key = name.lower()
+        if key in columns:
+            part = columns[key]()
+            if key == "timestamp" and schema == "gyro":
+                part[:, 10] = ord("T")        # writer.py stamps are ISO with a "T"
+            fields.append(part)
+        else:
+            axis = key.split("_")[-1]
+            fields.append(_fixed(block[axis], 2 if schema.startswith("crash") else decimals))
+    return fields
+
+
+def encode(block, schema, decimals=DECIMALS, header=True):
+    """CSV bytes for a block in one of SCHEMAS; numbers and stamps are formatted without a Python loop."""
+    unit = "s" if schema.startswith("crash") and block["rate_hz"] <= 1 else "ms"   # csv.py wrote whole seconds
+    fields = _fields(block, schema, decimals, unit)
+    n = block["sample"].size
+    comma = np.full((n, 1), ord(","), np.uint8)
+    parts = []
+    for i, f in enumerate(fields):
+        if i:
+            parts.append(comma)
+        parts.append(f)
+    parts.append(np.full((n, 1), ord("\n"), np.uint8))
+    text = np.concatenate(parts, axis=1).ravel()
+    body = text[text != 0].tobytes()
+    return (",".join(SCHEMAS[schema]) + "\n").encode() + body if header else body
+
+
+def write_csv(path: Path, block, schema, decimals=DECIMALS):
+    """Append a block to path (header only when the file is new or empty)."""
+    path = Path(path)
+    new = not path.exists() or path.stat().st_size == 0
+    with path.open("ab") as f:
+        f.write(encode(block, schema, decimals, header=new))
+
+
+def write_events(path: Path, events):
+    with Path(path).open("w", encoding="utf-8") as f:
+        f.write("start_sample,end_sample,status,peak\n")
+        f.writelines(f"{s},{e},{status},{peak:.2f}\n" for s, e, status, peak in events)
+
+
+# ---------- Live ----------
+def stream(sim, callback, seconds=None, rows=None, block_ms=10):
+    """Call callback(block) every block_ms with the samples due by then, paced to sim.rate_hz."""
+    t0 = time.perf_counter()
+    sent = 0
+    while (rows is None or sent < rows) and (seconds is None or time.perf_counter() - t0 < seconds):
+        due = int((time.perf_counter() - t0) * sim.rate_hz) + 1
+        n = due - sent if rows is None else min(due, rows) - sent
+        if n > 0:
+            callback(sim.block(n))
+            sent += n
+        next_at = t0 + sent / sim.rate_hz + block_ms / 1000
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+    return sent
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Synthetic accelerometer/gyro CSVs with labelled events")
+    ap.add_argument("--schema", choices=sorted(SCHEMAS), default="crash")
+    ap.add_argument("--rows", type=int, default=100)
+    ap.add_argument("--rate", type=float, default=None, help="samples/s (default 1000; 10 with --live)")
+    ap.add_argument("--events-per-min", type=float, default=6.0)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--out", type=Path, default=None, help="CSV path (default synthetic_<schema>.csv)")
+    ap.add_argument("--live", action="store_true", help="append rows in real time at --rate")
+    ap.add_argument("--block-rows", type=int, default=1_000_000, help="rows generated per block in batch mode")
+    args = ap.parse_args()
+
+    rate = args.rate or (10.0 if args.live else 1000.0)
+    kind = "gyro" if args.schema == "gyro" else "accel"
+    out = args.out or Path(f"synthetic_{args.schema}.csv")
+    out.unlink(missing_ok=True)
+    sim = SensorSim(kind, rate_hz=rate, seed=args.seed, events_per_min=args.events_per_min)
+    events = []
+
+    if args.live:
+        def on_block(block):
+            write_csv(out, block, args.schema)
+            events.extend(block["events"])
+            for line in encode(block, args.schema, header=False).decode().splitlines():
+                print("Logged:", line)
+        stream(sim, on_block, rows=args.rows)
+    else:
+        gen = write = 0.0
+        for lo in range(0, args.rows, args.block_rows):
+            t0 = time.perf_counter()
+            block = sim.block(min(args.block_rows, args.rows - lo))
+            t1 = time.perf_counter()
+            write_csv(out, block, args.schema)
+            gen, write = gen + t1 - t0, write + time.perf_counter() - t1
+            events.extend(block["events"])
+        print(f"[Gen] {args.rows} rows: generated at {args.rows / max(gen, 1e-9) / 1e6:.1f} M rows/s, "
+              f"written at {args.rows / max(write, 1e-9) / 1e6:.2f} M rows/s")
+
+    labels = out.with_name(out.stem + "_events.csv")
+    write_events(labels, events)
+    print(f"\n✅ Synthetic {args.schema} data saved to {out} ({len(events)} labelled events in {labels.name})")
+
+
+if __name__ == "__main__":
+    main()
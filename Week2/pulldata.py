@@ -1,12 +1,16 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "6.2"))   # shared csvcache.py
+from csvcache import load_csv
+
 DATA_FILE = "accel_log_20250807_151559.csv"
 IMG_FILE = DATA_FILE.replace(".csv", "_plot.png")
 
 try:
-    data = pd.read_csv(DATA_FILE)
-    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    data = load_csv(DATA_FILE)   # timestamps come back as datetime64; re-parsed only when the CSV changes
 
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.plot(data['timestamp'], data['x'], label='X-axis (g)', color='red', linewidth=1)
@@ -1,8 +1,17 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 from dash import Dash, dcc, html, Input, Output
-import plotly.express as px
+import plotly.graph_objects as go
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "6.2"))   # shared csvcache.py, winstats.py
+from csvcache import load_csv
+from winstats import WindowStats
 
-df = pd.read_csv("gyro_data_20250812_153117.csv")
+df = load_csv("gyro_data_20250812_153117.csv")   # parsed once, then read from .csvcache/
+# built once: every page's histogram and summary are then O(bins), not O(samples)
+stats = WindowStats.from_frame(df, ['gyro_x', 'gyro_y', 'gyro_z'], bins=30)
 
 app = Dash(__name__)
 
@@ -50,10 +59,17 @@ def update_histogram(selected_axis, sample_count, prev_clicks, next_clicks):
     page = next_clicks - prev_clicks
     start = page * sample_count
     end = start + sample_count
-    dff = df.iloc[start:end]
-    fig = px.histogram(dff, x=selected_axis, nbins=30, title=f"Histogram of {selected_axis}")
+    counts, edges = stats.histogram(selected_axis, start, end)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=edges[1:] - edges[:-1]))
+    fig.update_layout(title=f"Histogram of {selected_axis}", xaxis_title=selected_axis, yaxis_title="count")
 
-    summary_table = dff[[selected_axis]].describe().reset_index()
+    # same rows and values as describe(): quartiles are exact, from this page's rows only
+    s = stats.summary(start, end, [selected_axis])[selected_axis]
+    q1, q2, q3 = df[selected_axis].iloc[start:end].quantile([0.25, 0.5, 0.75])
+    summary_table = pd.DataFrame({
+        "index": ["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+        selected_axis: [s["count"], s["mean"], s["std"], s["min"], q1, q2, q3, s["max"]],
+    })
     summary_html = html.Table([
         html.Thead(html.Tr([html.Th(col) for col in summary_table.columns])),
         html.Tbody([
@@ -0,0 +1,230 @@
+# batch_plot.py
+"""
+SIT225 — Plot a whole archive of sensor CSVs in one go.
+
+The per-week scripts (Week2/pulldata.py, Week3/GraphPlotting.py,
+Week5/graphplot.py) each load one hard-coded CSV and draw every sample, some
+with a marker per point, at dpi=300. This CLI takes folders, files or globs,
+renders each CSV to <stem>_plot.png next to it (or into --out-dir) on a
+process pool, so the charts already in the repo are never overwritten, and:
+
+    - draws at most 2 points per pixel column per channel (the min and the
+      max of the samples in that column, in time order), so spikes survive
+      and a million-row log costs the same as a 2 000-row one;
+    - skips CSVs whose _plot.png is already newer than the CSV (--force
+      redoes them);
+    - reports files/s at the end.
+
+Any column other than timestamp/time/sample is plotted; timestamps may be
+"2025-09-08 18:34:27.177" or ISO "2025-09-19T18:14:57.233".
+
+Usage:
+    python batch_plot.py .                              # every CSV in Week8
+    python batch_plot.py "../8.3D/Diagram/*.csv" --force
+    python batch_plot.py ../Week8 ../8.2C --workers 4 --size 1600x600
+    python batch_plot.py ../8.2C --out-dir plots        # all PNGs in one folder
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure   # no pyplot: no global state, no GUI backend in workers
+
+SIZE = (1200, 500)                     # width, height in pixels
+DPI = 100
+MARGINS = dict(left=0.06, right=0.98, top=0.93, bottom=0.16)
+TIME_COLUMNS = ("timestamp", "time")
+SKIP_COLUMNS = TIME_COLUMNS + ("sample",)
+COLORS = ["red", "green", "blue", "purple", "orange", "brown"]   # x / y / z as in pulldata.py
+OUT_SUFFIX = "_plot.png"               # <stem>.png is taken by the hand-made charts next to the CSVs
+
+
+# ---------- Input ----------
+def find_csvs(specs):
+    """Folders (their *.csv), files and glob patterns → sorted unique CSV paths."""
+    out = set()
+    for spec in specs:
+        p = Path(spec)
+        if p.is_dir():
+            out.update(p.glob("*.csv"))
+        elif p.is_file():
+            out.add(p)
+        else:
+            out.update(Path(m) for m in glob.glob(spec, recursive=True) if m.lower().endswith(".csv"))
+    return sorted(out)
+
+
+def png_for(csv_path: Path, out_dir=None):
+    """Output path for one CSV: <stem>_plot.png beside it, or in out_dir."""
+    folder = csv_path.parent if out_dir is None else Path(out_dir)
+    return folder / f"{csv_path.stem}{OUT_SUFFIX}"
+
+
+def is_fresh(csv_path: Path, png_path: Path):
+    try:
+        return png_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns
+    except OSError:
+        return False
+
+
+def load(csv_path: Path):
+    """(x as datetime64 or row index, {column: float array}) from one CSV."""
+    df = pd.read_csv(csv_path)
+    df.columns = [c.strip() for c in df.columns]
+    time_col = next((c for c in df.columns if c.lower() in TIME_COLUMNS), None)
+    x = None
+    if time_col is not None:
+        t = pd.to_datetime(df[time_col], format="ISO8601", errors="coerce")
+        if t.notna().all():
+            x = t.to_numpy()
+    if x is None:
+        x = np.arange(len(df))
+    channels = {}
+    for c in df.columns:
+        if c.lower() in SKIP_COLUMNS:
+            continue
+        v = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+        if not np.isnan(v).all():
+            channels[c] = v
+    return x, channels
+
+
+# ---------- Decimation ----------
+def minmax_decimate(x, y, width):
+    """Keep the min and max sample of each of `width` x-columns, in original order."""
+    n = y.size
+    if n <= 2 * width:
+        return x, y
+    pos = x.astype("int64") if x.dtype.kind == "M" else x
+    pos = np.asarray(pos, dtype=float)
+    span = pos[-1] - pos[0]
+    if span <= 0:
+        cols = (np.arange(n) * width) // n
+    else:
+        cols = np.minimum(((pos - pos[0]) / span * width).astype(np.int64), width - 1)
+    starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+    filled = np.where(np.isnan(y), np.inf, y)
+    lo = starts + _arg_reduce(filled, starts, np.minimum)
+    filled = np.where(np.isnan(y), -np.inf, y)
+    hi = starts + _arg_reduce(filled, starts, np.maximum)
+    keep = np.unique(np.r_[lo, hi])
+    return x[keep], y[keep]
+
+
+def _arg_reduce(values, starts, op):
+    """Offset within each [starts[i], starts[i+1]) segment of its op-extreme (first occurrence)."""
+    best = op.reduceat(values, starts)
+    seg = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, values.size]))
+    hit = np.flatnonzero(values == best[seg])
+    first = np.r_[True, seg[hit][1:] != seg[hit][:-1]]
+    return hit[first] - starts
+
+
+# ---------- Rendering ----------
+def render(csv_path, png_path, size=SIZE, dpi=DPI):
+    """Draw one CSV to png_path. Returns (rows, points drawn); runs inside a pool worker."""
+    csv_path, png_path = Path(csv_path), Path(png_path)
+    x, channels = load(csv_path)
+    width, height = size
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    ax = fig.add_subplot()
+    drawn = 0
+    for i, (name, y) in enumerate(channels.items()):
+        xd, yd = minmax_decimate(x, y, width)
+        ax.plot(xd, yd, label=name, color=COLORS[i % len(COLORS)], linewidth=0.8)
+        drawn += yd.size
+    ax.set_title(csv_path.name)
+    ax.set_xlabel("Time" if x.dtype.kind == "M" else "Sample")
+    if channels:
+        ax.legend(loc="upper right")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    if x.dtype.kind == "M":
+        fig.autofmt_xdate(bottom=MARGINS["bottom"])
+    fig.subplots_adjust(**MARGINS)   # fixed margins: tight_layout would draw the figure an extra time
+    tmp = png_path.with_name(png_path.name + ".tmp")
+    fig.savefig(tmp, format="png")   # written whole, then renamed: a crash never leaves a "fresh" PNG
+    tmp.replace(png_path)
+    return len(x), drawn
+
+
+def _job(args):
+    csv_path, png_path, size, dpi = args
+    t0 = time.perf_counter()
+    try:
+        rows, drawn = render(csv_path, png_path, size, dpi)
+        return csv_path, rows, drawn, time.perf_counter() - t0, None
+    except Exception as err:
+        return csv_path, 0, 0, time.perf_counter() - t0, f"{type(err).__name__}: {err}"
+
+
+def plot_all(csvs, size=SIZE, dpi=DPI, workers=None, force=False, verbose=False, out_dir=None):
+    """Render every stale CSV; returns (rendered, skipped, failed) lists of paths."""
+    jobs, skipped, failed, claimed = [], [], [], {}
+    if out_dir is not None:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+    for csv_path in csvs:
+        png_path = png_for(csv_path, out_dir)
+        if png_path in claimed:          # same stem from two folders into one --out-dir
+            failed.append(csv_path)
+            print(f"[ERROR] {csv_path}: {png_path} is already the output of {claimed[png_path]}")
+            continue
+        claimed[png_path] = csv_path
+        if not force and is_fresh(csv_path, png_path):
+            skipped.append(csv_path)
+        else:
+            jobs.append((str(csv_path), str(png_path), size, dpi))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    if workers == 1:
+        results = map(_job, jobs)        # no pool start-up for one worker
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+    rendered = []
+    try:
+        for csv_path, rows, drawn, secs, err in results:
+            if err:
+                failed.append(Path(csv_path))
+                print(f"[ERROR] {csv_path}: {err}")
+                continue
+            rendered.append(Path(csv_path))
+            if verbose:
+                print(f"[Plot] {csv_path}: {rows} rows -> {drawn} points in {secs * 1000:.0f} ms")
+    finally:
+        if workers > 1:
+            pool.shutdown()
+    return rendered, skipped, failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Render <stem>_plot.png for every CSV, in parallel")
+    ap.add_argument("paths", nargs="+", help="CSV files, folders of CSVs or glob patterns")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    ap.add_argument("--size", default=f"{SIZE[0]}x{SIZE[1]}", help="WIDTHxHEIGHT in pixels")
+    ap.add_argument("--dpi", type=int, default=DPI)
+    ap.add_argument("--out-dir", default=None, help="write every PNG here instead of next to its CSV")
+    ap.add_argument("--force", action="store_true", help="re-render even if the PNG is newer than the CSV")
+    ap.add_argument("-v", "--verbose", action="store_true", help="one line per rendered file")
+    args = ap.parse_args()
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    csvs = find_csvs(args.paths)
+    if not csvs:
+        print("[Plots] No CSV files found")
+        return
+    t0 = time.perf_counter()
+    rendered, skipped, failed = plot_all(csvs, size, args.dpi, args.workers, args.force, args.verbose,
+                                         args.out_dir)
+    elapsed = time.perf_counter() - t0
+    rate = len(rendered) / elapsed if rendered and elapsed > 0 else 0.0
+    print(f"[Plots] {len(csvs)} CSVs: {len(rendered)} rendered, {len(skipped)} up to date, "
+          f"{len(failed)} failed in {elapsed:.2f} s ({rate:.1f} files/s)")
+
+
+if __name__ == "__main__":
+    main()
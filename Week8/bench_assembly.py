@@ -0,0 +1,63 @@
+# bench_assembly.py
+# SIT225 — Server time and bytes per tick for the smooth_dash payload modes
+#
+# Calls the smooth_dash interval callback directly (state["tick"]) for several
+# viewers and times callback + JSON serialization, which is the work the Dash
+# server does per viewer per tick. assemble="client" encodes each row range
+# once and hands the same JSON text to every viewer at that cursor, so its
+# per-viewer cost should fall as viewers are added; encoding="binary" ships
+# base64 float32 channels and float64 epoch-ms time instead of JSON numbers
+# and strings. Each mode runs REPEATS times and the fastest run is kept.
+#
+# Run:
+#   python bench_assembly.py
+
+import math
+import time
+
+from plotly.io.json import to_json_plotly
+
+from smooth_dash import build_smooth_dash
+
+CHANNELS = ["X", "Y", "Z"]
+STEP = 200            # samples appended per tick
+TICKS = 200
+VIEWERS = (1, 4)      # tabs reading in step
+REPEATS = 5
+
+
+MODES = [("server", "json"), ("client", "json"), ("client", "binary")]
+
+
+def run(assemble, encoding, viewers):
+    app, state = build_smooth_dash(CHANNELS, window_len=STEP, max_step=STEP,
+                                   history=STEP * TICKS, assemble=assemble, encoding=encoding)
+    t0_ms = time.time() * 1000.0
+    for i in range(STEP * TICKS):
+        t = t0_ms + i * 10.0 if encoding == "binary" else f"12:00:{i % 60:02d}.{i % 1000:03d}"
+        # full-precision floats, like the phone accelerometer readings
+        state["push"](t, math.sin(i * 0.01), math.cos(i * 0.013), 9.81 + 0.1 * math.sin(i * 0.7))
+
+    tick = state["tick"]
+    cursors = [0] * viewers
+    total = 0.0
+    nbytes = 0
+    for n in range(TICKS):
+        for v in range(viewers):
+            t0 = time.perf_counter()
+            out = tick(n, cursors[v])
+            body = to_json_plotly(out[:-1])
+            total += time.perf_counter() - t0
+            nbytes += len(body)
+            cursors[v] = out[-1]
+    calls = TICKS * viewers
+    return total / calls * 1e6, nbytes / calls
+
+
+if __name__ == "__main__":
+    print(f"{STEP} samples x {len(CHANNELS)} channels per tick, best of {REPEATS} runs")
+    print(f"{'assemble':<8} {'encoding':<8} {'viewers':>7} {'us/tick/viewer':>15} {'bytes/tick':>11} {'bytes/point':>12}")
+    for assemble, encoding in MODES:
+        for viewers in VIEWERS:
+            us, b = min(run(assemble, encoding, viewers) for _ in range(REPEATS))
+            print(f"{assemble:<8} {encoding:<8} {viewers:>7} {us:>15.1f} {b:>11.0f} {b / (STEP * len(CHANNELS)):>12.1f}")
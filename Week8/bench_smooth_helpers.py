@@ -0,0 +1,175 @@
+# bench_smooth_helpers.py
+# SIT225 — Headless comparison of the three smooth-dash streaming helpers
+#
+#   Week8/smooth_dash.py   build_smooth_dash   state["push"],       state["tick"]
+#   8.2C/dash.py           create_smooth_dash  state["push"],       state["update"]
+#   8.3D/smooth.py         create_stream_app   state["add_sample"], state["update"]
+#
+# For each helper, --producers threads push samples as fast as they can while a
+# viewer thread calls the interval callback directly every --cadence-ms. Reports
+# producer throughput and push cost (1 thread vs N threads = lock contention),
+# p50/p99 tick latency, JSON bytes per tick and traced memory growth once the
+# ring buffer is full (a bounded buffer should stay near zero).
+# With --out, each run is appended to that CSV so numbers can be compared
+# between versions; without it the table is only printed.
+#
+# Run:
+#   python bench_smooth_helpers.py
+#   python bench_smooth_helpers.py --label "$(git rev-parse --short HEAD)" --out /tmp/smooth_bench.csv
+
+import argparse
+import csv
+import gc
+import importlib.util
+import math
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from plotly.io.json import to_json_plotly
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# (name, file, factory, push key, tick key, window kwarg, step kwarg)
+HELPERS = [
+    ("Week8/smooth_dash", "Week8/smooth_dash.py", "build_smooth_dash", "push", "tick", "window_len", "max_step"),
+    ("8.2C/dash", "8.2C/dash.py", "create_smooth_dash", "push", "update", "window_size", "step_size"),
+    ("8.3D/smooth", "8.3D/smooth.py", "create_stream_app", "add_sample", "update", "window_size", "batch_limit"),
+]
+
+COLUMNS = ["label", "when", "helper", "producers", "push_per_s", "push_us_1t", "push_us_nt",
+           "tick_p50_ms", "tick_p99_ms", "bytes_per_tick", "mem_growth_kb"]
+
+
+def load_helper(name, rel_path):
+    # 8.2C/dash.py would shadow the dash package if imported by its own name
+    spec = importlib.util.spec_from_file_location(f"_bench_{name.replace('/', '_').replace('.', '_')}",
+                                                  ROOT / rel_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module          # dataclasses look the module up here
+    spec.loader.exec_module(module)
+    return module
+
+
+def _producer(push, deadline, out, idx, start):
+    start.wait()
+    t0, i = time.perf_counter(), 0
+    while time.perf_counter() < deadline[0]:
+        push(f"12:00:{i % 60:02d}.{i % 1000:03d}", math.sin(i * 0.01), math.cos(i * 0.01), 9.81)
+        i += 1
+    out[idx] = (time.perf_counter() - t0, i)
+
+
+def _push_cost(push, seconds, threads):
+    """(mean µs per push, total pushes/s) with `threads` producers for `seconds`."""
+    took = [(0.0, 0)] * threads
+    start, deadline = threading.Event(), [0.0]
+    workers = [threading.Thread(target=_producer, args=(push, deadline, took, i, start)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    t0 = time.perf_counter()
+    deadline[0] = t0 + seconds
+    start.set()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - t0
+    pushes = sum(n for _, n in took)
+    return statistics.mean(dt / n for dt, n in took) * 1e6, pushes / wall
+
+
+def bench(helper, args):
+    name, rel_path, factory, push_key, tick_key, window_kw, step_kw = helper
+    module = load_helper(name, rel_path)
+    kwargs = {window_kw: args.window, step_kw: args.step}
+
+    app, state = getattr(module, factory)(["X", "Y", "Z"], **kwargs)
+    push, tick = state[push_key], state[tick_key]
+
+    # Producer-only cost: one thread, then N threads contending for the lock
+    push_us_1t, _ = _push_cost(push, args.duration / 4, 1)
+
+    # Producers + one viewer ticking at a fixed cadence
+    stop = threading.Event()
+    tick_ms, tick_bytes = [], []
+
+    def viewer():
+        cursor, n = None, 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            out = tick(n, cursor)
+            body = to_json_plotly(out[:-1])
+            tick_ms.append((time.perf_counter() - t0) * 1000.0)
+            tick_bytes.append(len(body))
+            cursor, n = out[-1], n + 1
+            time.sleep(args.cadence_ms / 1000.0)
+
+    v = threading.Thread(target=viewer)
+    v.start()
+    push_us_nt, push_per_s = _push_cost(push, args.duration, args.producers)
+    stop.set()
+    v.join()
+
+    # Memory growth once the ring is full: traced separately so tracing
+    # overhead does not leak into the timings above
+    gc.collect()
+    tracemalloc.start()
+    mem_before = tracemalloc.get_traced_memory()[0]
+    cursor = None
+    for i in range(args.samples):
+        push("12:00:00.000", 0.1, 0.2, 9.81)
+        if i % args.step == 0:
+            cursor = tick(i, cursor)[-1]
+    gc.collect()                 # only count what is still reachable
+    mem_after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tick_ms.sort()
+    return {
+        "helper": name,
+        "producers": args.producers,
+        "push_per_s": round(push_per_s),
+        "push_us_1t": round(push_us_1t, 2),
+        "push_us_nt": round(push_us_nt, 2),
+        "tick_p50_ms": round(tick_ms[len(tick_ms) // 2], 3),
+        "tick_p99_ms": round(tick_ms[min(len(tick_ms) - 1, int(len(tick_ms) * 0.99))], 3),
+        "bytes_per_tick": round(statistics.mean(tick_bytes)),
+        "mem_growth_kb": round((mem_after - mem_before) / 1024, 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the smooth-dash streaming helpers")
+    ap.add_argument("--producers", type=int, default=4, help="concurrent producer threads")
+    ap.add_argument("--duration", type=float, default=4.0, help="seconds of producers + viewer per helper")
+    ap.add_argument("--samples", type=int, default=20_000, help="pushes in the memory-growth pass")
+    ap.add_argument("--cadence-ms", type=float, default=50, help="viewer tick period")
+    ap.add_argument("--window", type=int, default=600)
+    ap.add_argument("--step", type=int, default=20)
+    ap.add_argument("--label", default="dev", help="version label stored with the results")
+    ap.add_argument("--out", type=Path, default=None, help="CSV to append the results to (default: print only)")
+    args = ap.parse_args()
+
+    when = datetime.now().isoformat(timespec="seconds")
+    rows = [{"label": args.label, "when": when, **bench(h, args)} for h in HELPERS]
+
+    print(" ".join(f"{c:>14}" for c in COLUMNS[2:]))
+    for r in rows:
+        print(" ".join(f"{str(r[c]):>14}" for c in COLUMNS[2:]))
+
+    if args.out is None:
+        return
+    first = not args.out.exists()
+    with args.out.open("a", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=COLUMNS)
+        if first:
+            w.writeheader()
+        w.writerows(rows)
+    print(f"Appended {len(rows)} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
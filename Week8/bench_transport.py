@@ -0,0 +1,92 @@
+# bench_transport.py
+# SIT225 — Interval polling vs SSE push for smooth_dash (headless)
+#
+# Drives build_smooth_dash through Flask's test client: a producer thread
+# pushes samples at RATE_HZ while VIEWERS simulated browser tabs either poll
+# the Dash callback endpoint every refresh_ms (each with its own cursor) or
+# hold an SSE connection open. Every viewer should see every sample.
+# Reports server deliveries/s (HTTP callbacks for "interval", pushed events
+# over a single long-lived request for "sse") and mean push→send latency.
+#
+# Run:
+#   python bench_transport.py
+
+import json
+import threading
+import time
+
+from smooth_dash import build_smooth_dash
+
+RATE_HZ = 50          # producer sample rate
+DURATION_S = 5.0
+REFRESH_MS = 200
+VIEWERS = 2
+
+
+def _producer(push, stop):
+    period = 1.0 / RATE_HZ
+    i = 0
+    while not stop.is_set():
+        push(time.strftime("%H:%M:%S"), float(i), float(-i), 0.0)
+        i += 1
+        time.sleep(period)
+
+
+def _poll_body(n, cursor):
+    return {
+        "output": "..plot.extendData...info.children...cursor.data..",
+        "outputs": [{"id": "plot", "property": "extendData"},
+                    {"id": "info", "property": "children"},
+                    {"id": "cursor", "property": "data"}],
+        "inputs": [{"id": "timer", "property": "n_intervals", "value": n}],
+        "state": [{"id": "cursor", "property": "data", "value": cursor}],
+        "changedPropIds": ["timer.n_intervals"],
+    }
+
+
+def _poll_viewer(client, deadline, seen):
+    n, cursor = 0, None
+    while time.perf_counter() < deadline:
+        resp = client.post("/_dash-update-component", json=_poll_body(n, cursor)).get_json()
+        out = resp["response"]
+        cursor = out["cursor"]["data"]
+        if "plot" in out:
+            seen.append(len(out["plot"]["extendData"][0]["x"][0]))
+        n += 1
+        time.sleep(REFRESH_MS / 1000.0)
+
+
+def _sse_viewer(client, deadline, seen):
+    resp = client.get("/smooth-stream", buffered=False)
+    for chunk in resp.response:
+        if chunk.startswith(b"data:"):
+            seen.append(len(json.loads(chunk[5:])["x"][0]))
+        if time.perf_counter() >= deadline:
+            break
+    resp.close()
+
+
+def run(transport):
+    app, state = build_smooth_dash(["X", "Y", "Z"], refresh_ms=REFRESH_MS, transport=transport)
+    client = app.server.test_client()
+    stop = threading.Event()
+    threading.Thread(target=_producer, args=(state["push"], stop), daemon=True).start()
+
+    deadline = time.perf_counter() + DURATION_S
+    viewer = _poll_viewer if transport == "interval" else _sse_viewer
+    seen = [[] for _ in range(VIEWERS)]
+    threads = [threading.Thread(target=viewer, args=(client, deadline, seen[i]))
+               for i in range(VIEWERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stop.set()
+    return state["stats"](), [sum(v) for v in seen]
+
+
+if __name__ == "__main__":
+    print(f"{'transport':<10} {'deliv/s':>8} {'mean lag ms':>12}  samples per viewer")
+    for mode in ("interval", "sse"):
+        s, per_viewer = run(mode)
+        print(f"{mode:<10} {s['deliveries_per_s']:>8.1f} {s['mean_lag_ms']:>12.1f}  {per_viewer}")
@@ -9,27 +9,35 @@
 
 from pathlib import Path
 from datetime import datetime
+import json
 import threading
+import time
 from collections import deque
 
 import pandas as pd
 import plotly.graph_objects as go
-from dash import Dash, dcc, html, Output, Input
+from dash import Dash, dcc, html, Output, Input, no_update
+from flask import Response
 
 from arduino_iot_cloud import ArduinoCloudClient
 from iot_secrets import DEVICE_ID, SECRET_KEY
+from smooth_dash import RenderPool, format_ns, now_ns
 
 # ------------------ Settings ------------------
 VAR_X, VAR_Y, VAR_Z = "accelerometer_x", "accelerometer_y", "accelerometer_z"
 WINDOW_SIZE = 5            # number of samples per saved window
 UI_REFRESH_MS = 1000       # poll frequency (ms)
+TRANSPORT = "interval"     # "interval" = poll, "sse" = push samples as they arrive
+LIVE_POINTS = 600          # points kept on the live chart in SSE mode
+SSE_PATH = "/live-stream"
+RENDER_WORKERS = 1         # background kaleido processes for PNG export
 
 BASE_DIR = Path(__file__).resolve().parent
 SAVE_DIR = BASE_DIR / "plots"
 SAVE_DIR.mkdir(parents=True, exist_ok=True)
 
 # ------------------ Buffers -------------------
-data_queue = deque()        # holds (timestamp, x, y, z)
+data_queue = deque()        # holds (t_ns, x, y, z); formatted per window
 queue_lock = threading.Lock()
 
 latest_vals = {"x": None, "y": None, "z": None}
@@ -39,18 +47,30 @@ val_lock    = threading.Lock()
 last_window = []
 last_saved_file = None
 
+# PNG export runs in warm worker processes; callbacks only queue figures
+renderer = RenderPool(RENDER_WORKERS)
+
+# SSE fan-out: one inbox per open browser tab
+sse_ready = threading.Condition()
+sse_inboxes = []
+
 # ------------------ Cloud Logic ----------------
 def _push_if_ready():
     """Append one complete XYZ sample to queue if all 3 arrived."""
     if all(received.values()):
         row = (
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            now_ns(),
             latest_vals["x"],
             latest_vals["y"],
             latest_vals["z"],
         )
         with queue_lock:
             data_queue.append(row)
+        if TRANSPORT == "sse":
+            with sse_ready:
+                for inbox in sse_inboxes:
+                    inbox.append(row)
+                sse_ready.notify_all()
         for k in received:
             received[k] = False
 
@@ -84,6 +104,11 @@ def start_cloud():
     t.start()
     return t
 
+def _formatted(rows):
+    """(t_ns, x, y, z) rows → display timestamps, formatted in one pass."""
+    stamps = format_ns((r[0] for r in rows), "%Y-%m-%d %H:%M:%S")
+    return [(ts, *r[1:]) for ts, r in zip(stamps, rows)]
+
 # ------------------ Plotting -------------------
 def make_figure(batch):
     """Return a Plotly figure for given batch of samples."""
@@ -113,9 +138,28 @@ def make_figure(batch):
     )
     return fig
 
-def save_window(batch, fig):
-    """Save current batch to CSV + PNG (or HTML fallback)."""
+def make_live_figure():
+    """Empty X/Y/Z traces for the SSE chart (extended in the browser)."""
+    fig = go.Figure()
+    for name in ("X", "Y", "Z"):
+        fig.add_trace(go.Scatter(x=[], y=[], mode="lines", name=name))
+    fig.update_layout(
+        template="plotly_white",
+        title="Live stream (SSE)",
+        margin=dict(l=40, r=20, t=40, b=40),
+        xaxis_title="Time",
+        yaxis_title="Acceleration (g)",
+        uirevision=True,
+        legend=dict(orientation="h", y=1.02, x=1, xanchor="right", yanchor="bottom"),
+    )
+    return fig
+
+def _rendered(_kind, path):
     global last_saved_file
+    last_saved_file = path.name
+
+def save_window(batch, fig):
+    """Save current batch to CSV now and queue the PNG (or HTML fallback)."""
     if not batch:
         return None
     stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -125,15 +169,9 @@ def save_window(batch, fig):
     csv_path = SAVE_DIR / f"{base}.csv"
     df.to_csv(csv_path, index=False)
 
-    try:
-        png_path = SAVE_DIR / f"{base}.png"
-        fig.write_image(str(png_path), width=1200, height=500, scale=2)
-        last_saved_file = png_path.name
-    except Exception:
-        html_path = SAVE_DIR / f"{base}.html"
-        fig.write_html(str(html_path), include_plotlyjs="cdn")
-        last_saved_file = html_path.name
-    return last_saved_file
+    png_path = SAVE_DIR / f"{base}.png"
+    renderer.submit(fig, png_path, width=1200, height=500, scale=2, on_done=_rendered)
+    return csv_path.name
 
 # ------------------ Dash App ------------------
 app = Dash(__name__)
@@ -142,8 +180,10 @@ app.layout = html.Div(
     children=[
         html.H2("SIT225 8.1P — Live Accelerometer (X/Y/Z)"),
         html.Div(id="status", style={"marginBottom": "8px"}),
-        dcc.Graph(id="graph"),
-        dcc.Interval(id="timer", interval=UI_REFRESH_MS, n_intervals=0),
+        dcc.Graph(id="graph", figure=make_live_figure() if TRANSPORT == "sse" else None),
+        dcc.Interval(id="timer", interval=UI_REFRESH_MS, n_intervals=0,
+                     disabled=TRANSPORT == "sse"),
+        dcc.Store(id="transport"),
         html.Div(
             "If PNG export fails, install 'kaleido' (pip install kaleido).",
             style={"fontSize": "12px", "opacity": 0.7},
@@ -159,6 +199,9 @@ app.layout = html.Div(
 )
 def update(_tick):
     global last_window
+    if TRANSPORT == "sse":
+        # the page-load call still fires; start_window_saver is the only reader of data_queue then
+        return no_update, no_update
     with queue_lock:
         if len(data_queue) >= WINDOW_SIZE:
             window = [data_queue.popleft() for _ in range(WINDOW_SIZE)]
@@ -167,16 +210,103 @@ def update(_tick):
 
     if window is None:
         fig = make_figure(last_window)
-        return fig, f"Waiting... queue={len(data_queue)}, last_save={last_saved_file or '—'}"
+        return fig, (f"Waiting... queue={len(data_queue)}, last_save={last_saved_file or '—'} | "
+                     f"{renderer.status_text()}")
 
+    window = _formatted(window)
     last_window = window
     fig = make_figure(window)
     saved_file = save_window(window, fig)
-    return fig, f"Saved: {saved_file} | queue now {len(data_queue)}"
+    return fig, f"Saved: {saved_file} | queue now {len(data_queue)} | {renderer.status_text()}"
+
+# ------------------ Push transport (SSE) -------
+@app.server.route(SSE_PATH)
+def live_stream():
+    """Server-Sent Events: push new samples to this tab as they arrive."""
+    inbox = deque(maxlen=LIVE_POINTS)   # a stalled tab drops its oldest samples, not memory
+    with sse_ready:
+        sse_inboxes.append(inbox)
+
+    def events():
+        try:
+            yield ": connected\n\n"   # flush headers to the browser right away
+            while True:
+                with sse_ready:
+                    if not inbox:
+                        sse_ready.wait(timeout=15)
+                    rows = [inbox.popleft() for _ in range(len(inbox))]
+                if not rows:
+                    yield ": keep-alive\n\n"
+                    continue
+                ts, xs, ys, zs = zip(*_formatted(rows))
+                payload = {
+                    "x": [list(ts)] * 3,
+                    "y": [list(xs), list(ys), list(zs)],
+                    "saved": last_saved_file or "—",
+                    "render": renderer.status_text(),
+                    "sent_ms": int(time.time() * 1000),
+                }
+                yield f"data: {json.dumps(payload)}\n\n"
+        finally:
+            with sse_ready:
+                sse_inboxes.remove(inbox)
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Browser side: one EventSource per tab, samples appended with extendTraces
+_SSE_JS = """
+function(_id) {
+    if (window._liveSSE) { return window.dash_clientside.no_update; }
+    const es = new EventSource(%s);
+    window._liveSSE = es;
+    es.onmessage = function(ev) {
+        const b = JSON.parse(ev.data);
+        const gd = document.querySelector("#graph .js-plotly-plot");
+        if (!gd) { return; }
+        Plotly.extendTraces(gd, {x: b.x, y: b.y}, [0, 1, 2], %d);
+        document.getElementById("status").textContent =
+            "Live (SSE) | last_save=" + b.saved + " | " + b.render +
+            " | lag=" + (Date.now() - b.sent_ms) + " ms";
+    };
+    return "sse";
+}
+"""
+
+if TRANSPORT == "sse":
+    app.clientside_callback(
+        _SSE_JS % (json.dumps(SSE_PATH), LIVE_POINTS),
+        Output("transport", "data"),
+        Input("graph", "id"),
+    )
+
+def start_window_saver():
+    """SSE mode: save WINDOW_SIZE batches in the background instead of in the callback."""
+    def runner():
+        global last_window
+        while True:
+            with queue_lock:
+                if len(data_queue) >= WINDOW_SIZE:
+                    window = [data_queue.popleft() for _ in range(WINDOW_SIZE)]
+                else:
+                    window = None
+            if window is None:
+                time.sleep(UI_REFRESH_MS / 1000.0)
+                continue
+            window = _formatted(window)
+            last_window = window
+            save_window(window, make_figure(window))
+
+    t = threading.Thread(target=runner, daemon=True)
+    t.start()
+    return t
 
 # ------------------ Main ----------------------
 def main():
+    renderer.start()
     start_cloud()
+    if TRANSPORT == "sse":
+        start_window_saver()
     print("Dash running at http://127.0.0.1:8050")
     app.run(debug=False, host="127.0.0.1", port=8050)
 
@@ -6,31 +6,244 @@ Dash figures normally redraw completely at each update → can appear jumpy.
 This wrapper instead uses Graph.extendData, appending only small slices of new
 points (like animation frames). A sliding window keeps recent history visible.
 
+Transports:
+    "interval" — dcc.Interval polls the server every refresh_ms (default)
+    "sse"      — Server-Sent Events on app.server: each new batch is pushed as
+                 soon as it arrives and applied in the browser with
+                 Plotly.extendTraces, so idle tabs make no HTTP callbacks.
+
+Assembly:
+    "server"   — Python splits each batch into the extendData structure
+    "client"   — the server ships the raw rows [[t, v1, v2, ...], ...] into a
+                 dcc.Store and a clientside_callback builds extendData in the
+                 browser. Each row range is encoded to JSON text once and the
+                 text is shared by every viewer reading that range, so tabs in
+                 step cost one encode between them instead of one each.
+
+Encoding:
+    "json"     — plain JSON lists (timestamps as given to push)
+    "binary"   — each channel as base64 float32, time as base64 float64 epoch
+                 milliseconds on a date axis (Plotly's {dtype, bdata} typed
+                 array spec). push() then takes epoch ms (or a datetime) as t;
+                 batches are shifted to local time so the axis matches json.
+                 Decoded into typed arrays in the browser; implies client
+                 assembly.
+
+Clock:
+    clock_ns=True — push() takes integer stamps from now_ns() (monotonic
+                 perf_counter_ns anchored to one epoch reading). They are
+                 stored as-is and only turned into display strings per batch
+                 (json) or scaled to epoch ms (binary), so producers never
+                 format a timestamp and NTP steps cannot reorder samples.
+
+Samples live in one append-only ring buffer (history rows). Every viewer keeps
+its own read cursor — in a dcc.Store per tab, or in the SSE connection — so
+any number of tabs see the complete stream and a new tab is seeded with the
+current window. A viewer that falls more than `history` rows behind skips
+ahead to the oldest row still kept.
+
 Usage:
     app, state = build_smooth_dash(
         channels=["X", "Y", "Z"],
         window_len=600,   # points retained per series
         max_step=20,      # max appended points per frame
-        refresh_ms=200    # UI update rate in ms
+        refresh_ms=200,   # UI update rate in ms
+        transport="sse",  # or "interval"
+        history=2400,     # ring-buffer rows shared by all viewers
+        assemble="client",# or "server"
+        encoding="binary",# or "json"
     )
-    state["push"](timestamp_str, *values)   # thread-safe insert
+    state["push"](timestamp_str, *values)   # thread-safe insert (now_ns() if clock_ns)
+    state["stats"]()                        # deliveries/s + push→send latency
+    state["tick"](n, cursor)                # the interval callback, undecorated
+
+RenderPool moves PNG export off the request path: figures are queued to
+worker processes that keep kaleido warm, and status() reports the backlog.
+    renderer = RenderPool()
+    renderer.start()                          # from the main block
+    renderer.submit(fig, "plots/accel.png")   # Future of (kind, path)
+    renderer.status_text()                    # "render backlog=N last=..."
 """
 from __future__ import annotations
 
-from collections import deque
+import base64
+import json
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from threading import Lock
+from pathlib import Path
+from threading import Condition, Lock
 from typing import List
 
 import plotly.graph_objects as go
-from dash import Dash, dcc, html, Output, Input, no_update
+from dash import Dash, dcc, html, Output, Input, State, no_update
+from flask import Response
+from plotly.io.json import to_json_plotly
 
 
 @dataclass
 class _Buffer:
-    q: deque            # stores tuples: (t, v1, v2, ...)
+    rows: list          # ring storage: tuples (t, v1, v2, ...)
+    pushed: list        # parallel ring of perf_counter push times (latency stats)
     lock: Lock
     n_series: int
+    seq: int = 0        # rows ever written; row k sits at rows[k % len(rows)]
+
+    def append(self, row, pushed_at):
+        k = self.seq % len(self.rows)
+        self.rows[k] = row
+        self.pushed[k] = pushed_at
+        self.seq += 1
+
+    def read(self, cursor, limit):
+        """Up to `limit` rows from `cursor` on → (rows, push_times, next_cursor)."""
+        cap = len(self.rows)
+        cursor = max(cursor, self.seq - cap, 0)
+        end = min(self.seq, cursor + limit)
+        lo = cursor % cap
+        hi = lo + (end - cursor)
+        if hi <= cap:       # contiguous: plain slices, no per-row indexing
+            return self.rows[lo:hi], self.pushed[lo:hi], end
+        hi -= cap
+        return self.rows[lo:] + self.rows[:hi], self.pushed[lo:] + self.pushed[:hi], end
+
+
+# Plotly typed-array spec {dtype, bdata} → plain array of numbers
+_DECODE_JS = """
+    const decode = function(spec) {
+        const raw = atob(spec.bdata);
+        const bytes = new Uint8Array(raw.length);
+        for (let i = 0; i < raw.length; i++) { bytes[i] = raw.charCodeAt(i); }
+        const typed = spec.dtype === "f8" ? new Float64Array(bytes.buffer) : new Float32Array(bytes.buffer);
+        return Array.from(typed);   // extendTraces nests a typed array inside a plain trace array
+    };
+"""
+
+# Browser half of the SSE transport: one EventSource per tab, each message is
+# appended straight into the graph div. Messages carry ready-made x/y lists,
+# raw rows, or binary columns that are unpacked here.
+_SSE_JS = """
+function(_id) {
+    if (window._smoothSSE) { return window.dash_clientside.no_update; }
+""" + _DECODE_JS + """
+    const es = new EventSource(%(path)s);
+    window._smoothSSE = es;
+    es.onmessage = function(ev) {
+        const b = JSON.parse(ev.data);
+        const gd = document.querySelector("#plot .js-plotly-plot");
+        if (!gd) { return; }
+        let x = b.x, y = b.y, traces = b.traces;
+        if (b.rows) {
+            const t = b.rows.map(r => r[0]);
+            y = [];
+            for (let i = 1; i < b.rows[0].length; i++) { y.push(b.rows.map(r => r[i])); }
+            x = y.map(() => t);
+            traces = y.map((_, i) => i);
+        } else if (b.bin) {
+            const t = decode(b.bin.t);
+            y = b.bin.y.map(decode);
+            x = y.map(() => t);
+            traces = y.map((_, i) => i);
+        }
+        Plotly.extendTraces(gd, {x: x, y: y}, traces, %(window)d);
+        document.getElementById("info").textContent =
+            "Appended " + x[0].length + " | via SSE | lag=" + (Date.now() - b.sent_ms) + " ms";
+    };
+    return "sse";
+}
+"""
+
+# Clientside assembly for the interval transport: raw batch → extendData
+_ASSEMBLE_JS = """
+function(batch) {
+    const nu = window.dash_clientside.no_update;
+    if (!batch) { return [nu, "Waiting... behind=0"]; }
+    const rows = JSON.parse(batch.p);
+    const t = rows.map(r => r[0]);
+    const y = [];
+    for (let i = 1; i < rows[0].length; i++) { y.push(rows.map(r => r[i])); }
+    return [
+        [{x: y.map(() => t), y: y}, y.map((_, i) => i), %(window)d],
+        "Appended " + rows.length + " | behind=" + batch.behind
+    ];
+}
+"""
+
+
+# Binary batches are applied to the graph directly as typed arrays
+_BINARY_JS = """
+function(batch) {
+    const nu = window.dash_clientside.no_update;
+    if (!batch) { return [nu, "Waiting... behind=0"]; }
+""" + _DECODE_JS + """
+    const gd = document.querySelector("#plot .js-plotly-plot");
+    const bin = JSON.parse(batch.p);
+    const t = decode(bin.t);
+    const y = bin.y.map(decode);
+    if (gd) { Plotly.extendTraces(gd, {x: y.map(() => t), y: y}, y.map((_, i) => i), %(window)d); }
+    return [nu, "Appended " + t.length + " | behind=" + batch.behind];
+}
+"""
+
+
+# --- Monotonic clock ---
+_EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+
+def now_ns() -> int:
+    """Epoch nanoseconds from perf_counter_ns: monotonic, no per-sample wall-clock read."""
+    return _EPOCH_NS + time.perf_counter_ns()
+
+
+def format_ns(stamps, fmt="%H:%M:%S", digits=3):
+    """Format epoch-ns stamps in bulk (local time); strftime runs once per second."""
+    out, last_s, prefix = [], None, ""
+    scale = 10 ** (9 - digits)
+    for ns in stamps:
+        sec, frac = divmod(ns, 1_000_000_000)
+        if sec != last_s:
+            last_s, prefix = sec, time.strftime(fmt, time.localtime(sec))
+        out.append(f"{prefix}.{frac // scale:0{digits}d}")
+    return out
+
+
+def _typed(values, typecode):
+    """Pack numbers as a Plotly typed-array spec (little-endian, base64)."""
+    arr = array(typecode, values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return {"dtype": "f8" if typecode == "d" else "f4",
+            "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+
+
+def _encode_binary(rows):
+    """[(t_ms, v1, v2, ...), ...] → {"t": float64 spec, "y": [float32 spec, ...]}"""
+    cols = list(zip(*rows))
+    return {"t": _typed(_local_ms(cols[0]), "d"), "y": [_typed(c, "f") for c in cols[1:]]}
+
+
+def _local_ms(stamps):
+    # A date axis shows epoch ms as UTC; shift by this machine's UTC offset so
+    # binary batches read the same wall-clock time as format_ns() strings.
+    shift = time.localtime(stamps[0] / 1000.0).tm_gmtoff * 1000.0
+    return [t + shift for t in stamps]
+
+
+def _epoch_ms(t):
+    # binary encoding needs numeric time: epoch ms as-is, datetimes converted
+    if isinstance(t, (int, float)):
+        return t
+    if hasattr(t, "timestamp"):
+        return t.timestamp() * 1000.0
+    raise ValueError(f"encoding='binary' needs epoch ms or a datetime, got {t!r}")
+
+
+def _columns(rows, n_series):
+    """[(t, v1, v2, ...), ...] → (times, [[v1, ...], [v2, ...], ...])"""
+    cols = list(zip(*rows)) if rows else [()] * (n_series + 1)
+    return list(cols[0]), [list(c) for c in cols[1:]]
 
 
 def build_smooth_dash(
@@ -38,13 +251,31 @@ def build_smooth_dash(
     window_len: int = 600,
     max_step: int = 20,
     refresh_ms: int = 200,
+    transport: str = "interval",
+    sse_path: str = "/smooth-stream",
+    history: int = None,
+    assemble: str = "server",
+    encoding: str = "json",
+    clock_ns: bool = False,
 ):
     """
     Construct a Dash app configured for smooth streaming.
     Returns (app, state), where state["push"] is the producer entrypoint.
     """
+    if transport not in ("interval", "sse"):
+        raise ValueError(f"Unknown transport {transport!r} (use 'interval' or 'sse')")
+    if assemble not in ("server", "client"):
+        raise ValueError(f"Unknown assemble mode {assemble!r} (use 'server' or 'client')")
+    if encoding not in ("json", "binary"):
+        raise ValueError(f"Unknown encoding {encoding!r} (use 'json' or 'binary')")
+    if encoding == "binary":
+        assemble = "client"     # typed arrays are unpacked in the browser
     n = len(channels)
-    buf = _Buffer(deque(), Lock(), n)
+    cap = max(history or 4 * window_len, window_len)
+    buf = _Buffer([None] * cap, [0.0] * cap, Lock(), n)
+    ready = Condition(buf.lock)     # signalled on every push (SSE viewers wait on it)
+    stats = {"deliveries": 0, "samples": 0, "lag_ms": 0.0, "since": time.perf_counter()}
+    encoded = {}                    # (first, stop) row range -> client payload JSON text
 
     # --- Initial empty figure scaffold ---
     base_fig = go.Figure()
@@ -59,6 +290,8 @@ def build_smooth_dash(
         uirevision=True,
         legend=dict(orientation="h", y=1.02, x=1, xanchor="right", yanchor="bottom"),
     )
+    if encoding == "binary":
+        base_fig.update_xaxes(type="date")   # x arrives as epoch milliseconds
 
     # --- Dash app layout ---
     app = Dash(__name__)
@@ -68,46 +301,244 @@ def build_smooth_dash(
             html.H2("Smooth Live Stream"),
             html.Div(id="info", style={"marginBottom": "8px"}),
             dcc.Graph(id="plot", figure=base_fig),
-            dcc.Interval(id="timer", interval=refresh_ms, n_intervals=0),
+            dcc.Interval(id="timer", interval=refresh_ms, n_intervals=0,
+                         disabled=transport != "interval"),
+            dcc.Store(id="transport"),
+            dcc.Store(id="cursor"),     # this tab's read position in the ring
+            dcc.Store(id="batch"),      # raw rows for clientside assembly
         ],
     )
 
-    # --- Periodic update ---
-    @app.callback(
-        Output("plot", "extendData"),
-        Output("info", "children"),
-        Input("timer", "n_intervals"),
-        prevent_initial_call=False,
-    )
-    def _tick(_n):
-        # Pull up to max_step samples
+    def _account(pushed):
+        # Delivery + push→send latency bookkeeping (caller holds buf.lock)
+        now = time.perf_counter()
+        stats["deliveries"] += 1
+        stats["samples"] += len(pushed)
+        stats["lag_ms"] += (now * len(pushed) - sum(pushed)) * 1000.0
+
+    def _present(rows):
+        # clock_ns + json: one bulk format per batch, outside the buffer lock
+        if not (clock_ns and encoding == "json" and rows):
+            return rows
+        return [(s, *r[1:]) for s, r in zip(format_ns(r[0] for r in rows), rows)]
+
+    def _read_for(cursor):
+        # New tab: seed with the current window; afterwards up to max_step samples
         with buf.lock:
-            if not buf.q:
-                return no_update, "Waiting... inbox=0"
-            items = [buf.q.popleft() for _ in range(min(len(buf.q), max_step))]
+            if cursor is None:
+                rows, pushed, cursor = buf.read(buf.seq - window_len, window_len)
+            else:
+                rows, pushed, cursor = buf.read(cursor, max_step)
+            _account(pushed)
+            behind = buf.seq - cursor
+        return rows, cursor, behind
 
-        times = [r[0] for r in items]
-        per_series = [[] for _ in range(buf.n_series)]
-        for _, *vals in items:
-            for i, v in enumerate(vals):
-                per_series[i].append(v)
+    def _client_text(rows, stop):
+        # Rows [first, stop) never change once written, so their JSON is built
+        # once and reused by every viewer (interval or SSE) that reads them.
+        key = (stop - len(rows), stop)
+        text = encoded.get(key)
+        if text is None:
+            rows = _present(rows)
+            text = to_json_plotly(_encode_binary(rows) if encoding == "binary" else rows)
+            if len(encoded) >= 64:
+                encoded.clear()
+            encoded[key] = text
+        return text
+
+    # --- Periodic update ---
+    def _tick(_n, cursor):
+        rows, cursor, behind = _read_for(cursor)
+        if not rows:
+            return no_update, "Waiting... behind=0", cursor
 
+        rows = _present(rows)
+        times, per_series = _columns(rows, buf.n_series)
         extend_obj = {"x": [times] * buf.n_series, "y": per_series}
         traces = list(range(buf.n_series))
-        return (extend_obj, traces, window_len), f"Appended {len(times)} | inbox={len(buf.q)}"
+        return (extend_obj, traces, window_len), f"Appended {len(times)} | behind={behind}", cursor
+
+    def _tick_raw(_n, cursor):
+        rows, cursor, behind = _read_for(cursor)
+        if not rows:
+            return no_update, cursor
+        return {"p": _client_text(rows, cursor), "behind": behind}, cursor
+
+    tick = _tick if assemble == "server" else _tick_raw
+    # SSE seeds the current window itself; a page-load poll would send it twice
+    if transport == "interval":
+        if assemble == "server":
+            outputs = [Output("plot", "extendData"), Output("info", "children")]
+        else:
+            outputs = [Output("batch", "data")]
+            app.clientside_callback(
+                (_BINARY_JS if encoding == "binary" else _ASSEMBLE_JS) % {"window": window_len},
+                Output("plot", "extendData"),
+                Output("info", "children"),
+                Input("batch", "data"),
+            )
+        app.callback(
+            *outputs,
+            Output("cursor", "data"),
+            Input("timer", "n_intervals"),
+            State("cursor", "data"),
+            prevent_initial_call=False,
+        )(tick)
+
+    # --- Push transport ---
+    if transport == "sse":
+        @app.server.route(sse_path)
+        def _sse():
+            with buf.lock:
+                cursor = max(0, buf.seq - window_len)   # seed with the current window
+
+            def stream():
+                nonlocal cursor
+                yield ": connected\n\n"   # flush headers to the browser right away
+                while True:
+                    with ready:
+                        if cursor >= buf.seq:
+                            ready.wait(timeout=15)
+                        rows, pushed, cursor = buf.read(cursor, len(buf.rows))
+                        if rows:
+                            _account(pushed)
+                    if not rows:
+                        yield ": keep-alive\n\n"
+                        continue
+                    sent_ms = int(time.time() * 1000)
+                    if assemble == "client":
+                        key = "bin" if encoding == "binary" else "rows"
+                        yield f'data: {{"{key}": {_client_text(rows, cursor)}, "sent_ms": {sent_ms}}}\n\n'
+                        continue
+                    times, per_series = _columns(_present(rows), buf.n_series)
+                    payload = {
+                        "x": [times] * buf.n_series,
+                        "y": per_series,
+                        "traces": list(range(buf.n_series)),
+                        "sent_ms": sent_ms,
+                    }
+                    yield f"data: {json.dumps(payload)}\n\n"
+
+            return Response(stream(), mimetype="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+        app.clientside_callback(
+            _SSE_JS % {"path": json.dumps(sse_path), "window": window_len},
+            Output("transport", "data"),
+            Input("plot", "id"),
+        )
 
     # --- Producer method ---
     def _push(t, *vals):
         if len(vals) != n:
             raise ValueError(f"Expected {n} values, got {len(vals)}")
+        if encoding == "binary":
+            t = t / 1e6 if clock_ns else _epoch_ms(t)
+        pushed_at = time.perf_counter()
+        with ready:
+            buf.append((t, *vals), pushed_at)
+            ready.notify_all()
+
+    def _stats():
         with buf.lock:
-            buf.q.append((t, *vals))
+            s = dict(stats)
+        elapsed = max(time.perf_counter() - s.pop("since"), 1e-9)
+        s["deliveries_per_s"] = s["deliveries"] / elapsed
+        s["mean_lag_ms"] = s.pop("lag_ms") / s["samples"] if s["samples"] else 0.0
+        return s
 
     state = {
         "push": _push,
+        "stats": _stats,
+        "tick": tick,
         "channels": channels,
         "window_len": window_len,
         "max_step": max_step,
         "refresh_ms": refresh_ms,
+        "transport": transport,
+        "history": len(buf.rows),
+        "assemble": assemble,
+        "encoding": encoding,
+        "clock_ns": clock_ns,
     }
     return app, state
+
+
+# --- Background PNG export ---
+def _warm_renderer():
+    # Runs once in each worker: pay kaleido's start-up before the first real job
+    try:
+        go.Figure().to_image(format="png", width=16, height=16)
+    except Exception:
+        pass    # no kaleido → jobs fall back to HTML
+
+
+def _render_job(spec, png_path, width, height, scale):
+    import plotly.io as pio
+    try:
+        pio.write_image(spec, png_path, width=width, height=height, scale=scale)
+        return "png", png_path
+    except Exception:
+        html_path = str(Path(png_path).with_suffix(".html"))
+        pio.write_html(spec, html_path, include_plotlyjs="cdn")
+        return "html", html_path
+
+
+class RenderPool:
+    """
+    Writes figure PNGs in warm worker processes so Dash callbacks and save
+    threads never wait on kaleido. submit() queues a figure and returns a
+    Future of (kind, path); status() reports the backlog.
+    """
+
+    def __init__(self, workers: int = 1):
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_renderer)
+        self._lock = Lock()
+        self.stats = {"queued": 0, "done": 0, "failed": 0, "render_s": 0.0, "last": None}
+
+    def start(self):
+        # Launch and warm the workers before the first save. Called from the
+        # script's main block, not at import, so spawn-based platforms don't
+        # start processes while the main module is being re-imported.
+        self._pool.submit(int)
+        return self
+
+    def submit(self, fig, png_path, width=1200, height=500, scale=2, on_done=None):
+        spec = fig.to_dict() if hasattr(fig, "to_dict") else fig
+        with self._lock:
+            self.stats["queued"] += 1
+        t0 = time.perf_counter()
+        future = self._pool.submit(_render_job, spec, str(png_path), width, height, scale)
+
+        def _finished(f):
+            try:
+                kind, path = f.result()
+            except Exception as exc:
+                with self._lock:
+                    self.stats["failed"] += 1
+                print(f"[Render] {Path(png_path).name} failed: {exc}")
+                return
+            with self._lock:
+                self.stats["done"] += 1
+                self.stats["render_s"] += time.perf_counter() - t0
+                self.stats["last"] = Path(path).name
+            if on_done:
+                on_done(kind, Path(path))
+
+        future.add_done_callback(_finished)
+        return future
+
+    def status(self):
+        with self._lock:
+            s = dict(self.stats)
+        finished = s["done"] + s["failed"]
+        s["backlog"] = s["queued"] - finished
+        s["mean_render_s"] = s.pop("render_s") / s["done"] if s["done"] else 0.0
+        return s
+
+    def status_text(self):
+        s = self.status()
+        return f"render backlog={s['backlog']} last={s['last'] or '—'}"
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -52,6 +52,29 @@ df_filtered2 = df_filtered1[(df_filtered1['Temperature'] >= 21) & (df_filtered1[
 print("\nFiltered Data 2:")
 model_filtered2 = train_and_plot(df_filtered2, title="Filtered Data 2: Temperature vs Humidity")
 
+from streamreg import StreamingRegression   # upload streamreg.py alongside this notebook
+
+# Same trend line kept up to date row by row, as it would be on a live sensor stream
+stream_model = StreamingRegression()
+for temp, hum in zip(df['Temperature'], df['Humidity']):
+    stream_model.update(temp, hum)
+print("\nStreaming fit (no refit):")
+print(f"slope={stream_model.slope:.4f} (sklearn {model_original.coef_[0]:.4f}), "
+      f"intercept={stream_model.intercept:.4f} (sklearn {model_original.intercept_:.4f}), "
+      f"R²={stream_model.r2:.4f}")
+
+from rangefit import RangeSweep, best_range, grid   # upload rangefit.py alongside this notebook
+
+# Every 0.1 °C filter range at once instead of two hand-picked ones
+sweeper = RangeSweep(df['Temperature'], df['Humidity'])
+fits = sweeper.fit(*grid(np.arange(15, 25, 0.1), np.arange(25, 35, 0.1)))
+best = best_range(fits, sweeper.total, min_keep=0.8)
+if best is not None:
+    print(f"\nBest range keeping >= 80% of rows: {fits['lo'][best]:.1f}–{fits['hi'][best]:.1f} °C, "
+          f"{fits['n'][best]} rows, R²={fits['r2'][best]:.4f}")
+    df_best = df[(df['Temperature'] >= fits['lo'][best]) & (df['Temperature'] <= fits['hi'][best])]
+    model_best = train_and_plot(df_best, title="Best Filter Range: Temperature vs Humidity")
+
 print("\nInsights:")
 print("1. Original trend line may be skewed due to outliers.")
 print("2. Filtering extreme temperatures improves the model fit.")
@@ -0,0 +1,142 @@
+# rangefit.py
+"""
+SIT225 Week 7 — Evaluate every temperature filter range in one pass.
+
+plot.py removes outliers by hand: keep 20–30 °C, refit, keep 21–29 °C,
+refit. sweep() instead scores thousands of [lo, hi] ranges at once. The data
+is sorted by x once and turned into cumulative sums of x, y, x², xy and y²
+(after subtracting the overall means, so the sums stay small); the rows of
+any range are then one contiguous slice found by searchsorted, and its
+slope, intercept and R² come from five differences:
+
+    rs = RangeSweep(temp, hum)                  # sort + prefix sums, once
+    fit = rs.fit(*grid(np.arange(15, 25, 0.1), np.arange(25, 35, 0.1)))
+    best = best_range(fit, rs.total, min_keep=0.8)   # highest R² keeping >= 80% of rows
+
+Bounds are inclusive, like df[(df.T >= lo) & (df.T <= hi)].
+
+Usage:
+    python rangefit.py synthetic_sensor_data.csv
+    python rangefit.py big.csv --bounds 400 --min-keep 0.9 --top 10 --check
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def grid(lo_values, hi_values):
+    """Every (lo, hi) pair with lo < hi, as two flat arrays."""
+    lo, hi = np.meshgrid(np.asarray(lo_values, float), np.asarray(hi_values, float), indexing="ij")
+    keep = lo < hi
+    return lo[keep], hi[keep]
+
+
+class RangeSweep:
+    """x sorted once with prefix sums; fit() then costs two searchsorted calls per range."""
+
+    def __init__(self, x, y):
+        x, y = np.asarray(x, float), np.asarray(y, float)
+        ok = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[ok], y[ok]
+        order = np.argsort(x, kind="stable")
+        self.xs, ys = x[order], y[order]
+        self.total = self.xs.size
+        self.x0, self.y0 = (self.xs.mean(), ys.mean()) if self.total else (0.0, 0.0)
+        cx, cy = self.xs - self.x0, ys - self.y0
+        self.sx, self.sy = _csum(cx), _csum(cy)
+        self.sxx, self.sxy, self.syy = _csum(cx * cx), _csum(cx * cy), _csum(cy * cy)
+
+    def fit(self, lo, hi):
+        """Least-squares fit of y on x for each range; dict of arrays lo, hi, n, slope, intercept, r2."""
+        lo, hi = np.asarray(lo, float), np.asarray(hi, float)
+        i0 = np.searchsorted(self.xs, lo, side="left")
+        i1 = np.searchsorted(self.xs, hi, side="right")
+        n = np.maximum(i1 - i0, 0)
+        i1 = np.maximum(i1, i0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mx = (self.sx[i1] - self.sx[i0]) / n
+            my = (self.sy[i1] - self.sy[i0]) / n
+            vxx = (self.sxx[i1] - self.sxx[i0]) - n * mx * mx
+            vxy = (self.sxy[i1] - self.sxy[i0]) - n * mx * my
+            vyy = (self.syy[i1] - self.syy[i0]) - n * my * my
+            slope = np.where(vxx > 0, vxy / vxx, np.nan)
+            intercept = (my + self.y0) - slope * (mx + self.x0)
+            r2 = np.where((vxx > 0) & (vyy > 0), vxy * vxy / (vxx * vyy), np.nan)
+        return {"lo": lo, "hi": hi, "n": n, "slope": slope, "intercept": intercept, "r2": r2}
+
+
+def _csum(v):
+    return np.r_[0.0, np.cumsum(v)]
+
+
+def sweep(x, y, lo, hi):
+    """One-off RangeSweep(x, y).fit(lo, hi)."""
+    return RangeSweep(x, y).fit(lo, hi)
+
+
+def best_range(fit, total, min_keep=0.5):
+    """Index of the range with the highest R² among those keeping at least min_keep of `total` rows."""
+    eligible = (fit["n"] >= min_keep * total) & ~np.isnan(fit["r2"])
+    if not eligible.any():
+        return None
+    return int(np.flatnonzero(eligible)[np.argmax(fit["r2"][eligible])])
+
+
+def _check(x, y, fit, samples=20, seed=0):
+    """Refit a few ranges directly with np.polyfit and compare."""
+    rng = np.random.default_rng(seed)
+    worst = 0.0
+    for i in rng.choice(fit["n"].size, size=min(samples, fit["n"].size), replace=False):
+        keep = (x >= fit["lo"][i]) & (x <= fit["hi"][i])
+        if keep.sum() < 3:
+            continue
+        slope, intercept = np.polyfit(x[keep], y[keep], 1)
+        r2 = np.corrcoef(x[keep], y[keep])[0, 1] ** 2
+        worst = max(worst, abs(slope - fit["slope"][i]), abs(intercept - fit["intercept"][i]), abs(r2 - fit["r2"][i]))
+    return worst
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Score every [lo, hi] filter range of x for a linear fit of y")
+    ap.add_argument("csv")
+    ap.add_argument("--x", default="Temperature")
+    ap.add_argument("--y", default="Humidity")
+    ap.add_argument("--bounds", type=int, default=200, help="candidate values for each of lo and hi")
+    ap.add_argument("--min-keep", type=float, default=0.5, help="fraction of rows a range must keep")
+    ap.add_argument("--top", type=int, default=5)
+    ap.add_argument("--check", action="store_true", help="compare a sample of ranges with np.polyfit")
+    args = ap.parse_args()
+
+    df = pd.read_csv(args.csv, usecols=[args.x, args.y])
+    x, y = df[args.x].to_numpy(float), df[args.y].to_numpy(float)
+    # lo from the bottom half of x, hi from the top half
+    lo_values = np.quantile(x, np.linspace(0.0, 0.5, args.bounds))
+    hi_values = np.quantile(x, np.linspace(0.5, 1.0, args.bounds))
+    lo, hi = grid(lo_values, hi_values)
+
+    t0 = time.perf_counter()
+    rs = RangeSweep(x, y)
+    t1 = time.perf_counter()
+    fit = rs.fit(lo, hi)
+    t2 = time.perf_counter()
+    print(f"[Sweep] {rs.total} rows sorted in {(t1 - t0) * 1000:.1f} ms, "
+          f"{lo.size} ranges fitted in {(t2 - t1) * 1000:.1f} ms")
+
+    ranked = pd.DataFrame(fit)
+    ranked = ranked[ranked["n"] >= args.min_keep * rs.total].sort_values("r2", ascending=False)
+    print(f"Top {args.top} ranges keeping >= {args.min_keep:.0%} of rows:")
+    print(ranked.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    full = rs.fit([rs.xs[0]], [rs.xs[-1]]) if rs.total else None
+    if full is not None:
+        print(f"All rows: slope={full['slope'][0]:.4f} intercept={full['intercept'][0]:.4f} r2={full['r2'][0]:.4f}")
+
+    if args.check:
+        print(f"[Check] max abs difference vs np.polyfit: {_check(x, y, fit):.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# streamreg.py
+"""
+SIT225 Week 7 — Trend line kept up to date one sample at a time.
+
+StreamingRegression fits y = slope * x + intercept from running weighted
+statistics instead of refitting LinearRegression on the whole DataFrame:
+
+    W          total weight (n without forgetting)
+    mx, my     weighted means           (Σx / W, Σy / W)
+    sxx, sxy,  weighted co-moments      (Σx² - W·mx², Σxy - W·mx·my, ...)
+    syy
+
+Means and co-moments carry the same information as n, Σx, Σy, Σxy, Σx², but
+do not lose precision when the sums get large. Each update is O(1); a batch
+update is vectorised and merged the same way. With forget < 1 every older
+sample's weight is multiplied by `forget` per new sample, so the line follows
+drift (forget=0.99 ≈ the last 100 samples).
+
+    reg = StreamingRegression(forget=0.995)
+    for t, h in stream:
+        reg.update(t, h)
+    reg.slope, reg.intercept, reg.r2
+    reg.predict([20, 25, 30])
+
+Run this file to check it against sklearn on synthetic_sensor_data.csv.
+"""
+
+import numpy as np
+
+
+class StreamingRegression:
+    def __init__(self, forget=1.0):
+        if not 0 < forget <= 1:
+            raise ValueError("forget must be in (0, 1]")
+        self.forget = forget
+        self.reset()
+
+    def reset(self):
+        self.n = 0            # samples seen (unweighted)
+        self.weight = 0.0
+        self.mx = self.my = 0.0
+        self.sxx = self.sxy = self.syy = 0.0
+
+    def update(self, x, y):
+        """Add one sample; NaNs are ignored."""
+        if np.isnan(x) or np.isnan(y):
+            return
+        lam = self.forget
+        self.n += 1
+        self.weight = lam * self.weight + 1.0
+        dx, dy = x - self.mx, y - self.my
+        self.mx += dx / self.weight
+        self.my += dy / self.weight
+        self.sxx = lam * self.sxx + dx * (x - self.mx)
+        self.sxy = lam * self.sxy + dx * (y - self.my)
+        self.syy = lam * self.syy + dy * (y - self.my)
+
+    def update_many(self, xs, ys):
+        """Add samples in order; same result as update() per sample, without the Python loop."""
+        xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+        ok = ~(np.isnan(xs) | np.isnan(ys))
+        xs, ys = xs[ok], ys[ok]
+        k = xs.size
+        if not k:
+            return
+        lam = self.forget
+        # weight of each batch sample after the batch: newest 1, oldest lam**(k-1)
+        w = lam ** np.arange(k - 1, -1, -1, dtype=float) if lam < 1 else np.ones(k)
+        wb = w.sum()
+        bx, by = np.dot(w, xs) / wb, np.dot(w, ys) / wb
+        cx, cy = xs - bx, ys - by
+        bxx, bxy, byy = np.dot(w, cx * cx), np.dot(w, cx * cy), np.dot(w, cy * cy)
+        # the existing stats decay by lam**k, then the two groups are merged (Chan et al.)
+        decay = lam ** k
+        wa = self.weight * decay
+        total = wa + wb
+        dx, dy = bx - self.mx, by - self.my
+        f = wa * wb / total
+        self.sxx = self.sxx * decay + bxx + dx * dx * f
+        self.sxy = self.sxy * decay + bxy + dx * dy * f
+        self.syy = self.syy * decay + byy + dy * dy * f
+        self.mx += dx * wb / total
+        self.my += dy * wb / total
+        self.weight = total
+        self.n += k
+
+    # ---------- Fit ----------
+    @property
+    def slope(self):
+        return self.sxy / self.sxx if self.sxx > 0 else np.nan
+
+    @property
+    def intercept(self):
+        return self.my - self.slope * self.mx
+
+    @property
+    def r2(self):
+        if self.sxx <= 0 or self.syy <= 0:
+            return np.nan
+        return self.sxy * self.sxy / (self.sxx * self.syy)
+
+    def predict(self, xs):
+        return self.intercept + self.slope * np.asarray(xs, dtype=float)
+
+
+def _check(path="synthetic_sensor_data.csv"):
+    import time
+
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    df = pd.read_csv(path)
+    x, y = df["Temperature"].to_numpy(), df["Humidity"].to_numpy()
+    model = LinearRegression().fit(x.reshape(-1, 1), y)
+
+    one = StreamingRegression()
+    for a, b in zip(x, y):
+        one.update(a, b)
+    batch = StreamingRegression()
+    for part in np.array_split(np.arange(x.size), 7):
+        batch.update_many(x[part], y[part])
+    print(f"sklearn    slope={model.coef_[0]:.10f} intercept={model.intercept_:.10f} "
+          f"r2={model.score(x.reshape(-1, 1), y):.10f}")
+    for name, reg in (("per-sample", one), ("batched", batch)):
+        print(f"{name:<10} slope={reg.slope:.10f} intercept={reg.intercept:.10f} r2={reg.r2:.10f}")
+    assert np.isclose(one.slope, model.coef_[0]) and np.isclose(one.intercept, model.intercept_)
+    assert np.isclose(batch.slope, one.slope) and np.isclose(batch.intercept, one.intercept)
+
+    # forgetting: same as a weighted least-squares fit with weights forget**age
+    lam = 0.98
+    fading = StreamingRegression(forget=lam)
+    for a, b in zip(x, y):
+        fading.update(a, b)
+    weights = lam ** np.arange(x.size - 1, -1, -1)
+    wls = LinearRegression().fit(x.reshape(-1, 1), y, sample_weight=weights)
+    print(f"forget={lam} slope={fading.slope:.10f} (weighted sklearn {wls.coef_[0]:.10f})")
+    assert np.isclose(fading.slope, wls.coef_[0]) and np.isclose(fading.intercept, wls.intercept_)
+
+    big = np.random.default_rng(0).normal(25, 3, 1_000_000)
+    t0 = time.perf_counter()
+    StreamingRegression(0.999).update_many(big, 60 - 0.5 * big)
+    print(f"update_many: 1M samples in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print("OK: streaming fit matches sklearn")
+
+
+if __name__ == "__main__":
+    _check()